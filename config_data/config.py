@@ -14,6 +14,52 @@ class TgBot:
 class Stepik:
     client_id: str
     client_secret: str
+    json_decoder: str
+
+@dataclass
+class Profanity:
+    executor: str
+    workers: int
+
+@dataclass
+class Toxicity:
+    executor: str
+    workers: int
+    num_threads: int | None
+    interop_threads: int | None
+    model_dir: str | None
+    max_tokens: int
+    batch_size: int
+
+@dataclass
+class RedisPool:
+    fsm_db: int
+    data_db: int
+    max_connections: int
+    socket_timeout: float
+    connect_timeout: float
+    health_check_interval: int
+    retries: int
+
+@dataclass
+class Coordination:
+    shard_count: int
+    lease_ttl: float
+    renew_interval: float
+
+@dataclass
+class Polling:
+    tick_seconds: int
+    tick_budget: float
+    min_interval: float
+    max_interval: float
+    target_comments: float
+
+@dataclass
+class Metrics:
+    enabled: bool
+    host: str
+    port: int
 
 @dataclass
 class Config:
@@ -21,7 +67,13 @@ class Config:
     stepik: Stepik
     redis_host: str
     redis_password: str
+    redis_pool: RedisPool
     level_log: str
+    metrics: Metrics
+    coordination: Coordination
+    polling: Polling
+    toxicity: Toxicity
+    profanity: Profanity
 
 
 def load_config(path: str | None = None) -> Config:
@@ -30,15 +82,72 @@ def load_config(path: str | None = None) -> Config:
     redis_host = env.str("REDIS_HOST", "localhost")
     level_log = env.str('LOG_LEVEL', 'INFO')
     redis_password = env.str("REDIS_PASSWORD", "")
+    redis_fsm_db = env.int("REDIS_FSM_DB", 0)
+    redis_data_db = env.int("REDIS_DATA_DB", 1)
+    redis_max_connections = env.int("REDIS_MAX_CONNECTIONS", 20)
+    redis_socket_timeout = env.float("REDIS_SOCKET_TIMEOUT", 5.0)
+    redis_connect_timeout = env.float("REDIS_CONNECT_TIMEOUT", 5.0)
+    redis_health_check_interval = env.int("REDIS_HEALTH_CHECK_INTERVAL", 30)
+    redis_retries = env.int("REDIS_RETRIES", 3)
     stepik_client_id = env.str("STEPIK_CLIENT_ID", "")
     stepik_client_secret = env.str("STEPIK_CLIENT_SECRET", "")
+    stepik_json_decoder = env.str("STEPIK_JSON_DECODER", "auto")
+    metrics_enabled = env.bool("METRICS_ENABLED", False)
+    metrics_host = env.str("METRICS_HOST", "0.0.0.0")
+    metrics_port = env.int("METRICS_PORT", 9108)
+    toxicity_executor = env.str("TOXICITY_EXECUTOR", "thread")
+    toxicity_workers = env.int("TOXICITY_WORKERS", 1)
+    toxicity_model_dir = env.str("TOXICITY_MODEL_DIR", "") or None
+    toxicity_max_tokens = env.int("TOXICITY_MAX_TOKENS", 256)
+    toxicity_batch_size = env.int("TOXICITY_BATCH_SIZE", 8)
+    torch_num_threads = env.int("TORCH_NUM_THREADS", 1) or None
+    torch_interop_threads = env.int("TORCH_INTEROP_THREADS", 1) or None
+    shard_count = env.int("SHARD_COUNT", 64)
+    lease_ttl = env.float("LEASE_TTL", 90.0)
+    lease_renew_interval = env.float("LEASE_RENEW_INTERVAL", 20.0)
+    poll_tick_seconds = env.int("POLL_TICK_SECONDS", 30)
+    poll_tick_budget = env.float("POLL_TICK_BUDGET", 25.0)
+    poll_min_interval = env.float("POLL_MIN_INTERVAL", 60.0)
+    poll_max_interval = env.float("POLL_MAX_INTERVAL", 900.0)
+    poll_target_comments = env.float("POLL_TARGET_COMMENTS", 20.0)
+    profanity_executor = env.str("PROFANITY_EXECUTOR", "thread")
+    profanity_workers = env.int("PROFANITY_WORKERS", 1)
     
     return Config(
         tg_bot=TgBot(
             token=env('BOT_TOKEN'),
             id_owners=[*map(int, env('TG_IDS_OWNERS').split())]),
         stepik=Stepik(client_id=stepik_client_id,
-                      client_secret=stepik_client_secret),
+                      client_secret=stepik_client_secret,
+                      json_decoder=stepik_json_decoder),
         redis_host=redis_host,
         redis_password=redis_password,
-        level_log=level_log)
+        redis_pool=RedisPool(
+            fsm_db=redis_fsm_db,
+            data_db=redis_data_db,
+            max_connections=redis_max_connections,
+            socket_timeout=redis_socket_timeout,
+            connect_timeout=redis_connect_timeout,
+            health_check_interval=redis_health_check_interval,
+            retries=redis_retries),
+        level_log=level_log,
+        metrics=Metrics(enabled=metrics_enabled,
+                        host=metrics_host,
+                        port=metrics_port),
+        coordination=Coordination(shard_count=shard_count,
+                                  lease_ttl=lease_ttl,
+                                  renew_interval=lease_renew_interval),
+        polling=Polling(tick_seconds=poll_tick_seconds,
+                        tick_budget=poll_tick_budget,
+                        min_interval=poll_min_interval,
+                        max_interval=poll_max_interval,
+                        target_comments=poll_target_comments),
+        toxicity=Toxicity(executor=toxicity_executor,
+                          workers=toxicity_workers,
+                          num_threads=torch_num_threads,
+                          interop_threads=torch_interop_threads,
+                          model_dir=toxicity_model_dir,
+                          max_tokens=toxicity_max_tokens,
+                          batch_size=toxicity_batch_size),
+        profanity=Profanity(executor=profanity_executor,
+                            workers=profanity_workers))
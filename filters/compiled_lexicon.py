@@ -0,0 +1,249 @@
+"""
+Сборка словарей ProfanityFilter в один бинарный артефакт.
+
+Парсинг badwords.json и technical_words.json, генерация вариантов слов
+better_profanity и словоформ через pymorphy3 делаются один раз при сборке
+образа, а фильтр при старте только загружает готовый pickle.
+
+Сборка артефакта:
+    python -m filters.compiled_lexicon [--output PATH]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import pickle
+import time
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+import pymorphy3
+from better_profanity import Profanity
+from better_profanity.varying_string import VaryingString
+
+from filters.patterns import DataProfanity
+
+logger_lexicon = logging.getLogger(__name__)
+
+LEXICON_VERSION = 1
+
+BAD_WORDS_PATH = Path(__file__).parent.parent / "badwords.json"
+TECHNICAL_WORDS_PATH = Path(__file__).parent / 'technical_words.json'
+ARTIFACT_PATH = Path(__file__).parent / 'compiled_lexicon.pkl'
+
+
+@dataclass
+class CompiledLexicon:
+    """
+    Скомпилированные словари ProfanityFilter.
+
+    Attributes:
+        version (int): Версия формата артефакта.
+        source_hash (str): Хэш исходных JSON и таблицы замен символов.
+        bad_words (frozenset[str]): Запрещённые слова.
+        tech_keywords (frozenset[str]): Технические термины.
+        bad_word_forms (frozenset[str]): Словоформы из словарных лексем
+            запрещённых слов.
+        char_map (dict[str, str]): Таблица нормализации символов для
+            str.translate.
+        fuzzy_index (dict[int, tuple[str, ...]]): Запрещённые слова,
+            сгруппированные по длине, для проверки по Левенштейну.
+        censor_wordset (list[VaryingString]): Готовый CENSOR_WORDSET для
+            better_profanity.
+    """
+    version: int
+    source_hash: str
+    bad_words: frozenset[str]
+    tech_keywords: frozenset[str]
+    bad_word_forms: frozenset[str]
+    char_map: dict[str, str]
+    fuzzy_index: dict[int, tuple[str, ...]]
+    censor_wordset: list[VaryingString]
+
+
+@cache
+def get_morph_analyzer() -> pymorphy3.MorphAnalyzer:
+    """Общий на процесс MorphAnalyzer (его создание занимает заметное время)."""
+    return pymorphy3.MorphAnalyzer()
+
+
+def source_hash(bad_words_file: Path | None,
+                technical_words_file: Path | None) -> str:
+    """
+    Считает хэш исходников артефакта.
+    Args:
+        bad_words_file (Path | None): Путь к badwords.json.
+        technical_words_file (Path | None): Путь к technical_words.json.
+    Returns:
+        str: sha256 содержимого файлов, таблицы замен и версии формата.
+    """
+    digest = hashlib.sha256(f'v{LEXICON_VERSION}'.encode())
+    for path in (bad_words_file, technical_words_file):
+        try:
+            digest.update(Path(path).read_bytes() if path else b'')
+        except OSError:
+            digest.update(b'<missing>')
+    digest.update(repr(DataProfanity.CHAR_REPLACEMENT_MAP).encode())
+    return digest.hexdigest()
+
+
+def build_char_map() -> dict[str, str]:
+    """
+    Разворачивает CHAR_REPLACEMENT_MAP в таблицу символ -> базовая буква.
+    Как и раньше, при нескольких вариантах побеждает первая буква словаря.
+    """
+    char_map: dict[str, str] = {}
+    for base_char, variants in DataProfanity.CHAR_REPLACEMENT_MAP.items():
+        for variant in variants:
+            if len(variant) == 1:
+                char_map.setdefault(variant, base_char)
+    return char_map
+
+
+def _load_json_words(path: Path | None, title: str) -> list[str]:
+    if not path:
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as json_f:
+            words = json.load(json_f)
+            logger_lexicon.debug(f'Added {title}')
+            return words
+    except (FileNotFoundError, json.JSONDecodeError) as err:
+        logger_lexicon.error(f"🟢Ошибка загрузки файла {path}:{err}")
+    except Exception as err:
+        logger_lexicon.error(f'🟢Ошибка чтения JSON: {err}', exc_info=True)
+    return []
+
+
+def compile_lexicon(bad_words_file: Path | None = BAD_WORDS_PATH,
+                    technical_words_file: Path | None = TECHNICAL_WORDS_PATH
+                    ) -> CompiledLexicon:
+    """
+    Компилирует словари из исходных JSON.
+    Args:
+        bad_words_file (Path | None): Путь к badwords.json.
+        technical_words_file (Path | None): Путь к technical_words.json.
+    Returns:
+        CompiledLexicon: Скомпилированные словари.
+    """
+    bad_words = _load_json_words(bad_words_file, 'bad words')
+    tech_keywords = _load_json_words(technical_words_file, 'technical words')
+
+    # Только словарные разборы. bad_word_forms — быстрый путь для частых
+    # попаданий, а не замена обходу лексем в ProfanityFilter._is_bad_word:
+    # лексема из разбора слова не всегда совпадает с лексемами из разборов
+    # запрещённых слов (сволоченный, хуёво), так что ни одна проверка не
+    # покрывает другую.
+    morph = get_morph_analyzer()
+    bad_word_forms: set[str] = set()
+    for word in bad_words:
+        for parsed in morph.parse(word):
+            if parsed.is_known:
+                bad_word_forms.update(form.word for form in parsed.lexeme)
+
+    fuzzy_index: dict[int, list[str]] = {}
+    for word in dict.fromkeys(bad_words):
+        fuzzy_index.setdefault(len(word), []).append(word)
+
+    # Тот же порядок, что у глобального better_profanity в ProfanityFilter:
+    # стандартный список со стандартной таблицей, затем наши слова с
+    # дополненной таблицей
+    censor = Profanity()
+    censor.CHARS_MAPPING.update(DataProfanity.CHAR_REPLACEMENT_MAP)
+    if bad_words:
+        censor.add_censor_words(bad_words)
+
+    return CompiledLexicon(
+        version=LEXICON_VERSION,
+        source_hash=source_hash(bad_words_file, technical_words_file),
+        bad_words=frozenset(bad_words),
+        tech_keywords=frozenset(tech_keywords),
+        bad_word_forms=frozenset(bad_word_forms),
+        char_map=build_char_map(),
+        fuzzy_index={length: tuple(words) for length, words in
+            fuzzy_index.items()},
+        censor_wordset=censor.CENSOR_WORDSET)
+
+
+def save_lexicon(lexicon: CompiledLexicon, path: Path = ARTIFACT_PATH) -> None:
+    """Атомарно сохраняет артефакт на диск."""
+    path = Path(path)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(lexicon, file, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
+
+
+def load_lexicon(expected_hash: str,
+                 path: Path = ARTIFACT_PATH) -> CompiledLexicon | None:
+    """
+    Загружает артефакт, если он есть и собран из тех же исходников.
+    Args:
+        expected_hash (str): Хэш текущих исходников (source_hash).
+        path (Path): Путь к артефакту.
+    Returns:
+        CompiledLexicon | None: Артефакт или None, если его нужно пересобрать.
+    """
+    try:
+        with open(path, 'rb') as file:
+            lexicon = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        logger_lexicon.warning(f'Не удалось прочитать {path}: {err}')
+        return None
+
+    if not isinstance(lexicon, CompiledLexicon):
+        return None
+    if lexicon.version != LEXICON_VERSION:
+        logger_lexicon.info(
+            f'Версия артефакта {lexicon.version} != {LEXICON_VERSION}')
+        return None
+    if lexicon.source_hash != expected_hash:
+        logger_lexicon.info('Исходные словари изменились с момента сборки')
+        return None
+    return lexicon
+
+
+def get_lexicon(bad_words_file: Path | None = BAD_WORDS_PATH,
+                technical_words_file: Path | None = TECHNICAL_WORDS_PATH,
+                path: Path = ARTIFACT_PATH) -> CompiledLexicon:
+    """
+    Возвращает словари: из артефакта, если он актуален, иначе компилирует
+    их на лету и пробует обновить артефакт.
+    """
+    expected_hash = source_hash(bad_words_file, technical_words_file)
+    if lexicon := load_lexicon(expected_hash, path):
+        logger_lexicon.debug(f'Словари загружены из {path}')
+        return lexicon
+
+    logger_lexicon.info('Компиляция словарей на лету…')
+    lexicon = compile_lexicon(bad_words_file, technical_words_file)
+    try:
+        save_lexicon(lexicon, path)
+    except OSError as err:
+        logger_lexicon.warning(f'Не удалось сохранить {path}: {err}')
+    return lexicon
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Компиляция словарей ProfanityFilter в артефакт')
+    parser.add_argument('--bad-words', type=Path, default=BAD_WORDS_PATH)
+    parser.add_argument(
+        '--technical-words', type=Path, default=TECHNICAL_WORDS_PATH)
+    parser.add_argument('--output', type=Path, default=ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    lexicon = compile_lexicon(args.bad_words, args.technical_words)
+    save_lexicon(lexicon, args.output)
+    print(f'{args.output}: v{lexicon.version}, {len(lexicon.bad_words)} '
+          f'bad words, {len(lexicon.bad_word_forms)} forms, '
+          f'{len(lexicon.tech_keywords)} technical words '
+          f'({time.perf_counter() - start:.2f} s)')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
+import asyncio
 import logging
-import json
 import re
-from pathlib import Path
+from concurrent.futures import (Executor,
+                                ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from dataclasses import dataclass
+from multiprocessing import get_context
 
-import pymorphy3
 from Levenshtein import distance
 from better_profanity import profanity
 from aiogram.filters import BaseFilter
 from aiogram.types import CallbackQuery, Message
 
+from filters.compiled_lexicon import (ARTIFACT_PATH,
+                                      BAD_WORDS_PATH,
+                                      TECHNICAL_WORDS_PATH,
+                                      get_lexicon,
+                                      get_morph_analyzer)
 from filters.patterns import DataProfanity
+from filters.prefilter import PreClassifier
+from utils.metrics import metrics
 from utils.redis_service import RedisService
 
 logger_filters = logging.getLogger(__name__)
@@ -19,7 +29,7 @@ class AccessOwnersFilter(BaseFilter):
     
     async def __call__(self,
                        msg: Message | CallbackQuery,
-                       owners: list[int]) -> bool:
+                       owners: frozenset[int]) -> bool:
         owner_tg_id = msg.from_user.id
         return owner_tg_id in owners
 
@@ -29,9 +39,8 @@ class AccessUsersFilter(BaseFilter):
     async def __call__(self,
                        msg: Message | CallbackQuery,
                        redis_service: RedisService) -> bool:
-        user_tg_id = msg.from_user.id
-        users = await redis_service.get_tg_users_ids()
-        return user_tg_id in users
+        # O(1): поиск в закэшированном множестве или один SISMEMBER
+        return await redis_service.check_user(msg.from_user.id)
 
 
 class StepikIDFilter(BaseFilter):
@@ -91,53 +100,97 @@ class TgUserIDFilter(BaseFilter):
         return True
 
 
+@dataclass(frozen=True, slots=True)
+class ProfanityVerdict:
+    """
+    Результат проверки текста ProfanityFilter.
+    
+    Attributes:
+        is_profane (bool): Сработал ли фильтр.
+        rule (str): Идентификатор правила, которое приняло решение
+            (в том числе для чистых текстов: 'clean', 'technical',
+            'prefilter.code' и т.п.).
+        strength (str | None): Сила сработавшего правила: 'strong',
+            'medium', 'weak'; None для чистых текстов.
+        token (str | None): Слово или фрагмент, на котором сработало правило.
+    """
+    is_profane: bool
+    rule: str
+    strength: str | None = None
+    token: str | None = None
+    
+    def __bool__(self) -> bool:
+        return self.is_profane
+
+
 class ProfanityFilter:
     
-    BAD_WORDS_PATH = Path(__file__).parent.parent / "badwords.json"
-    TECHNICAL_WORDS_PATH = (
-        Path(__file__).parent.parent / 'filters' / 'technical_words.json')
+    STRONG: str = 'strong'
+    MEDIUM: str = 'medium'
+    WEAK: str = 'weak'
+    
+    # Сила срабатывания правил: правила без записи не считаются срабатыванием
+    RULE_STRENGTH: dict[str, str] = {
+        'bad_word.exact': STRONG,
+        'bad_word.base_pattern': STRONG,
+        'bad_word.pattern': MEDIUM,
+        'bad_word.form': MEDIUM,
+        'better_profanity': MEDIUM,
+        'base_pattern': STRONG,
+        'additional_patterns': MEDIUM,
+        'word_list': STRONG,
+        'levenshtein': WEAK}
+    
+    # Гистограмма длительностей стадий проверки (метка stage)
+    STAGE_METRIC: str = 'profanity_stage_seconds'
+    
+    # Где выполнять полную проверку (см. check_many)
+    EXECUTOR_INLINE: str = 'inline'
+    EXECUTOR_THREAD: str = 'thread'
+    EXECUTOR_PROCESS: str = 'process'
+    
+    BAD_WORDS_PATH = BAD_WORDS_PATH
+    TECHNICAL_WORDS_PATH = TECHNICAL_WORDS_PATH
     
     def __init__(self,
                  bad_words_file=BAD_WORDS_PATH,
-                 technical_words_file=TECHNICAL_WORDS_PATH):
-        # 1. Инициализация better_profanity
-        profanity.load_censor_words()
+                 technical_words_file=TECHNICAL_WORDS_PATH,
+                 lexicon_file=ARTIFACT_PATH,
+                 executor: str = EXECUTOR_THREAD,
+                 workers: int = 1):
+        """
+        :param executor: Где выполнять полную проверку: 'inline' — прямо в
+            event loop, 'thread' — в отдельном потоке, 'process' — в пуле
+            процессов (каждый со своей копией фильтра)
+        :param workers: Число процессов для executor='process'
+        """
+        if executor not in (self.EXECUTOR_INLINE, self.EXECUTOR_THREAD,
+                            self.EXECUTOR_PROCESS):
+            raise ValueError(f'Unknown executor: {executor}')
+        # 1. Загрузка скомпилированных словарей (или компиляция на лету,
+        # если артефакт отсутствует или устарел)
+        lexicon = get_lexicon(
+            bad_words_file, technical_words_file, path=lexicon_file)
+        
+        # 2. Инициализация better_profanity готовым набором слов
+        profanity.CENSOR_WORDSET = lexicon.censor_wordset
         
         # Инициализация
-        self.morph = pymorphy3.MorphAnalyzer()
+        self.morph = get_morph_analyzer()
         
         # словарь соответствий
         self.data_mapping = DataProfanity.CHAR_REPLACEMENT_MAP
         self.min_word_length = 4
         self.special_chars = set('0123456789!@#$%^&*')
         profanity.CHARS_MAPPING.update(self.data_mapping)
+        self.char_table = str.maketrans(lexicon.char_map)
+        self.repeated_chars_pattern = re.compile(r'(.)\1+')
         
-        # Загрузка кастомных слов из файла
-        self.bad_words = []
-        
-        if bad_words_file:
-            try:
-                with open(bad_words_file, 'r', encoding='utf-8') as json_f:
-                    self.bad_words = json.load(json_f)
-                    logger_filters.debug(f'Added bad words')
-                    profanity.add_censor_words(self.bad_words)
-            
-            except (FileNotFoundError, json.JSONDecodeError) as err:
-                logger_filters.error(
-                    f"🟢Ошибка загрузки файла {bad_words_file}:{err}")
-                self.bad_words = []
-            except Exception as err:
-                logger_filters.error(
-                    f'🟢Ошибка чтения JSON: {err}', exc_info=True)
-        
-        # Загрузка технических терминов(слов)
-        self.tech_keywords = []
-        try:
-            with open(technical_words_file, 'r', encoding='utf-8') as json_f:
-                self.tech_keywords = json.load(json_f)
-                logger_filters.debug(f'Added technical words')
-        except Exception as err:
-            logger_filters.error(f'🟢Ошибка чтения JSON: {err}', exc_info=True)
+        # 3. Словари
+        self.bad_words: frozenset[str] = lexicon.bad_words
+        self.bad_word_forms: frozenset[str] = lexicon.bad_word_forms
+        self.tech_keywords: frozenset[str] = lexicon.tech_keywords
+        self.fuzzy_index: dict[int, tuple[str, ...]] = lexicon.fuzzy_index
         
         # 4. Компиляция регулярных выражений
         self.base_pattern = re.compile(
@@ -148,6 +201,24 @@ class ProfanityFilter:
         
         # 5. Паттерн для разбивки текста на слова
         self.word_pattern = re.compile(r'\b\w+\b')
+        
+        # 6. Дешёвый предфильтр перед полной проверкой
+        self.pre_classifier = PreClassifier()
+        
+        # 7. Исполнитель полной проверки. Поток один: проверки идут
+        # последовательно, и состояние фильтра не нужно защищать
+        self.executor = executor
+        self._executor: Executor | None = None
+        self._workers = max(1, workers)
+        if executor == self.EXECUTOR_THREAD:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='profanity')
+        elif executor == self.EXECUTOR_PROCESS:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(bad_words_file, technical_words_file, lexicon_file))
     
     async def is_profanity(self, text: str) -> bool:
         """
@@ -155,101 +226,220 @@ class ProfanityFilter:
         :param text:
         :return bool:
         """
+        return (await self.check(text)).is_profane
+    
+    async def check(self, text: str) -> ProfanityVerdict:
+        """
+        Проверяет текст и возвращает подробный вердикт.
+        Сначала текст проходит дешёвый предфильтр, и только если он не
+        отсеян как заведомо чистый — полную проверку.
+        :param text:
+        :return ProfanityVerdict:
+        """
+        return (await self.check_many([text]))[0]
+    
+    async def check_many(self, texts: list[str]) -> list[ProfanityVerdict]:
+        """
+        Проверяет пачку текстов (например, все комментарии тика).
+        Предфильтр отрабатывает в event loop, а тексты, которым нужна полная
+        проверка, уходят в исполнитель одним вызовом.
+        :param texts:
+        :return list[ProfanityVerdict]: Вердикты в порядке texts.
+        """
+        verdicts: list[ProfanityVerdict | None] = [None] * len(texts)
+        pending: list[int] = []
+        for index, text in enumerate(texts):
+            # Вердикт предфильтра всегда чистый (bool() == False), поэтому
+            # сравниваем с None
+            if (verdict := self._prefilter(text)) is not None:
+                verdicts[index] = verdict
+            else:
+                pending.append(index)
+        
+        if pending:
+            full_verdicts = await self._check_full_many(
+                [texts[index] for index in pending])
+            for index, verdict in zip(pending, full_verdicts):
+                verdicts[index] = verdict
+                if not verdict:
+                    self.pre_classifier.remember_clean(texts[index])
+        
+        for verdict in verdicts:
+            metrics.inc('profanity_verdicts_total', rule=verdict.rule)
+        return verdicts
+    
+    def check_sync(self, text: str) -> ProfanityVerdict:
+        """Синхронная проверка одного текста (предфильтр + полная)."""
+        if (verdict := self._prefilter(text)) is None:
+            verdict = self._check_batch([text])[0]
+            if not verdict:
+                self.pre_classifier.remember_clean(text)
+        metrics.inc('profanity_verdicts_total', rule=verdict.rule)
+        return verdict
+    
+    def _prefilter(self, text: str) -> ProfanityVerdict | None:
+        with metrics.timer(self.STAGE_METRIC, stage='prefilter'):
+            tier = self.pre_classifier.classify(text)
+        if tier:
+            logger_filters.debug(f'Пропущено (предфильтр {tier}): {text}')
+            return self._verdict(f'prefilter.{tier}')
+        return None
+    
+    def _check_batch(self, texts: list[str]) -> list[ProfanityVerdict]:
+        """Синхронное ядро: полная проверка пачки текстов."""
+        verdicts = []
+        for text in texts:
+            with metrics.timer(self.STAGE_METRIC, stage='full'):
+                verdicts.append(self._check_profanity(text))
+        return verdicts
+    
+    async def _check_full_many(self,
+                               texts: list[str]) -> list[ProfanityVerdict]:
+        """Полная проверка пачки текстов в выбранном исполнителе."""
+        if self._executor is None:
+            return self._check_batch(texts)
+        
+        loop = asyncio.get_running_loop()
+        if self.executor == self.EXECUTOR_THREAD:
+            return await loop.run_in_executor(
+                self._executor, self._check_batch, texts)
+        
+        # Процессы: делим пачку на части по числу воркеров
+        chunk = -(-len(texts) // self._workers)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _worker_check_batch,
+                                 texts[start:start + chunk])
+            for start in range(0, len(texts), chunk)))
+        return [verdict for part in parts for verdict in part]
+    
+    def close(self) -> None:
+        """Останавливает поток/процессы исполнителя."""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _verdict(self, rule: str, token: str | None = None) -> ProfanityVerdict:
+        strength = self.RULE_STRENGTH.get(rule)
+        return ProfanityVerdict(
+            is_profane=strength is not None,
+            rule=rule,
+            strength=strength,
+            token=token)
+    
+    def _check_profanity(self, text: str) -> ProfanityVerdict:
+        """
+        Полная проверка текста: морфология, регулярные выражения, словари
+        и расстояние Левенштейна.
+        :param text:
+        :return ProfanityVerdict:
+        """
         
-        if await self._is_technical_text(text):
+        with metrics.timer(self.STAGE_METRIC, stage='technical'):
+            is_technical = self._is_technical_text(text)
+        if is_technical:
             logger_filters.debug(f'Пропущено (тех. текст): {text}')
-            return False
+            return self._verdict('technical')
         
         if any(
             symbol in text for symbol in
                 {'=', '(', ')', 'print', 'def', 'class'}):
             logger_filters.debug(f'Пропущено (код/скобки): {text}')
-            return False
+            return self._verdict('code')
         
         if len(set(text)) == 1:
             logger_filters.debug(f'Пропущено (повтор символов): {set(text)=}')
-            return False
+            return self._verdict('repeated_chars')
         
         if text.isdigit():
             logger_filters.debug(f'Пропущено (цифры):{text}')
-            return False
+            return self._verdict('digits')
         
         words = text.split()
-        for word in words:
-            if await self._is_bad_word(word):
-                logger_filters.warning(f'🟢Заблокировано bad word: {word}')
-                return True
+        with metrics.timer(self.STAGE_METRIC, stage='bad_words'):
+            for word in words:
+                if rule := self._is_bad_word(word):
+                    logger_filters.warning(f'🟢Заблокировано bad word: {word}')
+                    return self._verdict(rule, word)
         
         text = text.replace(" ", "")
-        normalized_text = await self._normalize_text(text)
+        normalized_text = self._normalize_text(text)
         text_lower = str(normalized_text).lower()
         
         if len(text_lower.strip()) < 3:
             logger_filters.debug(f'Пропущено: длина меньше 3х: {text_lower}')
-            return False
+            return self._verdict('too_short')
         
         # 1. Быстрая проверка по better_profanity
-        if profanity.contains_profanity(text_lower):
+        with metrics.timer(self.STAGE_METRIC, stage='better_profanity'):
+            contains_profanity = profanity.contains_profanity(text_lower)
+        if contains_profanity:
             # logger_tests.warning(
             #     'Фильтр 1 better_profanity(полное '
             #     'совпадение)')
             logger_filters.warning(f'🟢Заблокировано better_profanity: {text}')
-            return True
+            return self._verdict('better_profanity', text_lower)
         
         # 2. Проверка по регулярным выражениям
-        if self.base_pattern.search(text_lower):
-            logger_filters.warning(f'🟢Заблокировано base_pattern: {text}')
-            return True
-        
-        for pattern in self.additional_patterns:
-            if pattern.search(text.lower()):
-                logger_filters.warning(
-                    f'🟢Заблокировано additional_p'
-                    f'atterns: {text.lower()}')
-                return True
-        
-        for pattern in self.additional_patterns:
-            if pattern.search(text_lower):
-                logger_filters.warning(
-                    f'🟢Заблокировано additional_patterns: {text_lower}')
-                return True
+        with metrics.timer(self.STAGE_METRIC, stage='patterns'):
+            if match := self.base_pattern.search(text_lower):
+                logger_filters.warning(f'🟢Заблокировано base_pattern: {text}')
+                return self._verdict('base_pattern', match.group(0))
+        
+            for pattern in self.additional_patterns:
+                if match := pattern.search(text.lower()):
+                    logger_filters.warning(
+                        f'🟢Заблокировано additional_p'
+                        f'atterns: {text.lower()}')
+                    return self._verdict('additional_patterns', match.group(0))
+        
+            for pattern in self.additional_patterns:
+                if match := pattern.search(text_lower):
+                    logger_filters.warning(
+                        f'🟢Заблокировано additional_patterns: {text_lower}')
+                    return self._verdict('additional_patterns', match.group(0))
         
         # 3. Проверка по списку слов (с учетом опечаток)
         words = re.findall(r'\w+', text_lower)
-        if any(word in self.bad_words for word in words):
-            logger_filters.warning(
-                f'🟢Заблокировано Проверка по списку слов (с учетом опечаток): {words}')
-            return True
+        for word in words:
+            if word in self.bad_words:
+                logger_filters.warning(
+                    f'🟢Заблокировано Проверка по списку слов (с учетом опечаток): {words}')
+                return self._verdict('word_list', word)
         
         # 4. Дополнительные проверки (опционально)
-        if await self._check_levenshtein(text_lower):
+        with metrics.timer(self.STAGE_METRIC, stage='levenshtein'):
+            result = self._check_levenshtein(text_lower)
+        if result:
             logger_filters.warning('🟢Заблокировано: Фильтр 5 "Levenshtein"')
-            return True
+            return self._verdict(*result)
         logger_filters.debug('Текст прошел все фильтры')
-        return False
+        return self._verdict('clean')
     
-    async def _is_bad_word(self, word: str) -> bool:
+    def _is_bad_word(self, word: str) -> str | None:
         """
         Проверяет, является ли слово плохим с учетом нормализации.
         Обрабатывает притяжательные формы, уменьшительно-ласкательные и другие словоформы.
+        Возвращает идентификатор сработавшего правила или None.
         """
         if not word or not word.strip():
-            return False
+            return None
         
         # Приводим к нижнему регистру и убираем пробелы
         word = word.lower().strip()
         
         # Проверяем прямое вхождение
         if word in self.bad_words:
-            return True
+            return 'bad_word.exact'
         
         # Нормализуем слово (удаляем повторяющиеся символы, заменяем похожие символы)
-        normalized = await self._normalize_text(word)
+        normalized = self._normalize_text(word)
         
         # Проверяем по регулярным выражениям из patterns.py
-        if self.base_pattern.search(normalized) or any(
+        if self.base_pattern.search(normalized):
+            return 'bad_word.base_pattern'
+        if any(
             pattern.search(normalized) for pattern in self.additional_patterns):
-            return True
+            return 'bad_word.pattern'
         
         # Проверяем все возможные основы слова
         word_bases = [
@@ -261,7 +451,7 @@ class ProfanityFilter:
         
         # Проверяем все основы слова
         if any(base in self.bad_words for base in word_bases if base):
-            return True
+            return 'bad_word.form'
         
         # Проверяем уменьшительно-ласкательные суффиксы
         diminutive_suffixes = [
@@ -283,34 +473,40 @@ class ProfanityFilter:
             if normalized.endswith(suffix):
                 base = normalized[:-len(suffix)]
                 if base and base in self.bad_words:
-                    return True
+                    return 'bad_word.form'
         
         # Проверяем притяжательные суффиксы
         if normalized.endswith(('ин', 'ов', 'ев')):
             base = normalized[:-2]
             if base in self.bad_words:
-                return True
+                return 'bad_word.form'
         
-        # Проверяем все словоформы через pymorphy3
+        # Проверяем словоформы, заранее собранные при компиляции словарей
+        if normalized in self.bad_word_forms:
+            return 'bad_word.form'
+        
+        # Проверяем все словоформы через pymorphy3. bad_word_forms этого не
+        # заменяет: лексема разбора слова может не совпадать с лексемами
+        # разборов запрещённых слов (сволоченный)
         try:
             parsed_words = self.morph.parse(normalized)
             for parsed in parsed_words:
                 # Проверяем нормальную форму
                 normal_form = parsed.normal_form
                 if normal_form in self.bad_words:
-                    return True
+                    return 'bad_word.form'
                 
                 # Проверяем все словоформы
                 for form in parsed.lexeme:
                     if form.word in self.bad_words:
-                        return True
+                        return 'bad_word.form'
         except Exception as e:
             logger_filters.error(
                 f"Ошибка при морфологическом разборе {word}: {e}")
         
-        return False
+        return None
     
-    async def _is_technical_text(self, text: str) -> bool:
+    def _is_technical_text(self, text: str) -> bool:
         """Проверяет, является ли текст техническим (игнорирует мат в таком контексте)"""
         words = re.findall(r'\w+', text.lower())
         for word in words:
@@ -320,59 +516,53 @@ class ProfanityFilter:
                 return True
         return False
     
-    async def _is_technical_word(self, word: str) -> bool:
+    def _is_technical_word(self, word: str) -> bool:
         """Проверяет, является ли слово техническим термином (игнорирует его в проверках)."""
         parsed = self.morph.parse(word.lower())[0]
         normal_form = parsed.normal_form  # нормальная форма слова
         return normal_form in self.tech_keywords
     
-    async def _normalize_text(self, text: str) -> str:
+    def _normalize_text(self, text: str) -> str:
         """Улучшенная нормализация текста с учетом контекста"""
         # Сначала заменяем все спецсимволы и похожие буквы
-        normalized = []
-        for char in text.lower():
-            replacement = char
-            for base_char, variants in self.data_mapping.items():
-                if char in variants:
-                    replacement = base_char
-                    break
-            normalized.append(replacement)
-        normalized_text = ''.join(normalized)
+        normalized_text = text.lower().translate(self.char_table)
         
         # Удаляем повторяющиеся символы (например "прривет" -> "привет")
-        normalized_text = re.sub(r'(.)\1+', r'\1', normalized_text)
+        normalized_text = self.repeated_chars_pattern.sub(r'\1', normalized_text)
         return normalized_text
     
-    async def _check_levenshtein(self, phrase: str) -> bool:
-        """Улучшенная проверка с контекстным анализом"""
-        normalized = await self._normalize_text(phrase)
+    def _check_levenshtein(self, phrase: str) -> tuple[str, str] | None:
+        """
+        Улучшенная проверка с контекстным анализом.
+        Возвращает (правило, слово) при срабатывании или None.
+        """
+        normalized = self._normalize_text(phrase)
         words = re.findall(r'\b\w+\b', normalized)  # выделяем целые слова
         
-        for bad_word in self.bad_words:
-            bw_len = len(bad_word)
+        for candidate in words:
+            c_len = len(candidate)
             
-            # Не проверяем слишком короткие слова
-            if bw_len < self.min_word_length:
+            # Игнорируем слова короче min_word_length
+            if c_len < self.min_word_length:
                 continue
             
-            for candidate in words:
-                c_len = len(candidate)
-                
-                # Игнорируем слова короче min_word_length
-                if c_len < self.min_word_length:
-                    continue
-                
-                # Быстрая проверка по длине
-                if abs(c_len - bw_len) > 2:  # допускаем разницу до 1 символов
-                    continue
-                
-                # Точное совпадение после нормализации
-                if await self._is_bad_word(candidate):
-                    logger_filters.warning(f'🟢Точное совпадение: {candidate}')
-                    return True
-                
+            # Быстрая проверка по длине: берём из индекса только слова,
+            # отличающиеся по длине не больше чем на 2 символа
+            bad_words = [
+                bad_word for bw_len in range(c_len - 2, c_len + 3)
+                if bw_len >= self.min_word_length
+                for bad_word in self.fuzzy_index.get(bw_len, ())]
+            if not bad_words:
+                continue
+            
+            # Точное совпадение после нормализации
+            if rule := self._is_bad_word(candidate):
+                logger_filters.warning(f'🟢Точное совпадение: {candidate}')
+                return rule, candidate
+            
+            for bad_word in bad_words:
                 # Проверка расстояния Левенштейна (ужесточённая)
-                max_allowed_distance = 1 if bw_len <= 6 else 2
+                max_allowed_distance = 1 if len(bad_word) <= 6 else 2
                 
                 # Если кандидат — часть другого слова (например, "код" в "кодекс"), пропускаем
                 if candidate in bad_word or bad_word in candidate:
@@ -381,10 +571,26 @@ class ProfanityFilter:
                 # Если расстояние Левенштейна в допустимых пределах
                 if distance(candidate, bad_word) <= max_allowed_distance:
                     # Дополнительная проверка: слово не должно быть частью технического термина
-                    if not await self._is_technical_word(candidate):
+                    if not self._is_technical_word(candidate):
                         logger_filters.debug(
                             f'🟢Найдено по Левенштейну: {bad_word} '
                             f'(кандидат: {candidate}, расстояние: {distance(candidate, bad_word)})')
-                        return True
+                        return 'levenshtein', candidate
         
-        return False
+        return None
+
+
+# Фильтр процесса-воркера (режим executor='process'): создаётся один раз в
+# initializer пула; словари грузятся из скомпилированного артефакта
+_worker_filter: ProfanityFilter | None = None
+
+
+def _init_worker(bad_words_file, technical_words_file, lexicon_file) -> None:
+    global _worker_filter
+    _worker_filter = ProfanityFilter(
+        bad_words_file, technical_words_file, lexicon_file,
+        executor=ProfanityFilter.EXECUTOR_INLINE)
+
+
+def _worker_check_batch(texts: list[str]) -> list[ProfanityVerdict]:
+    return _worker_filter._check_batch(texts)
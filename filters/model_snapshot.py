@@ -0,0 +1,220 @@
+"""
+Локальный снапшот модели токсичности.
+
+Вместо обращения к Hugging Face Hub при каждом старте модель один раз
+выгружается в каталог (при сборке образа или в volume под HF_HOME) вместе с
+manifest.json — списком файлов и их sha256. При старте классификатор
+проверяет снапшот по манифесту и грузит модель только с диска
+(local_files_only), без сети.
+
+Выгрузка снапшота (ревизия — полный commit модели на Hub, по умолчанию из
+TOXICITY_MODEL_REVISION):
+    python -m filters.model_snapshot [--model NAME] [--revision SHA]
+                                     [--output DIR]
+Проверка готового снапшота:
+    python -m filters.model_snapshot --verify [--output DIR]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger_snapshot = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+DEFAULT_MODEL_NAME = 'SkolkovoInstitute/russian_toxicity_classifier'
+MANIFEST_NAME = 'manifest.json'
+REVISION_ENV = 'TOXICITY_MODEL_REVISION'
+
+# Только полный commit: ветка или тег на Hub могут сдвинуться между сборками
+_COMMIT_SHA_RE = re.compile(r'[0-9a-f]{40}')
+
+
+@dataclass
+class SnapshotManifest:
+    """
+    Описание снапшота модели.
+
+    Attributes:
+        version (int): Версия формата манифеста.
+        model_name (str): Имя модели на Hugging Face Hub.
+        revision (str): Commit модели на Hub, из которого выгружено.
+        files (dict[str, str]): Относительный путь файла -> sha256.
+    """
+    version: int
+    model_name: str
+    revision: str
+    files: dict[str, str]
+
+
+def default_snapshot_dir(model_name: str = DEFAULT_MODEL_NAME) -> Path:
+    """Каталог снапшота по умолчанию: $HF_HOME/snapshots/<имя модели>."""
+    hf_home = os.environ.get('HF_HOME', '~/.cache/huggingface')
+    return (Path(hf_home).expanduser() / 'snapshots' /
+            model_name.replace('/', '--'))
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(directory: Path) -> dict[str, str]:
+    """
+    Считает sha256 всех файлов каталога (кроме манифеста).
+    Returns:
+        dict[str, str]: Относительный путь (posix) -> sha256.
+    """
+    directory = Path(directory)
+    return {
+        path.relative_to(directory).as_posix(): _file_sha256(path)
+        for path in sorted(directory.rglob('*'))
+        if path.is_file() and path.name != MANIFEST_NAME}
+
+
+def write_manifest(directory: Path, model_name: str,
+                   revision: str) -> SnapshotManifest:
+    """Записывает manifest.json по текущему содержимому каталога."""
+    manifest = SnapshotManifest(
+        version=SNAPSHOT_VERSION,
+        model_name=model_name,
+        revision=revision,
+        files=hash_files(directory))
+    with open(Path(directory) / MANIFEST_NAME, 'w', encoding='utf-8') as file:
+        json.dump(asdict(manifest), file, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def verify_snapshot(directory: Path,
+                    model_name: str | None = None) -> SnapshotManifest | None:
+    """
+    Проверяет снапшот по манифесту: тот же набор файлов и те же хэши.
+    Args:
+        directory (Path): Каталог снапшота.
+        model_name (str | None): Ожидаемая модель; None — любая.
+    Returns:
+        SnapshotManifest | None: Манифест или None, если снапшота нет или
+            он не прошёл проверку.
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / MANIFEST_NAME, 'r', encoding='utf-8') as file:
+            manifest = SnapshotManifest(**json.load(file))
+    except FileNotFoundError:
+        logger_snapshot.info(f'Снапшот модели не найден: {directory}')
+        return None
+    except Exception as err:
+        logger_snapshot.warning(f'Не удалось прочитать манифест: {err}')
+        return None
+
+    if manifest.version != SNAPSHOT_VERSION:
+        logger_snapshot.warning(
+            f'Версия манифеста {manifest.version} != {SNAPSHOT_VERSION}')
+        return None
+    if model_name and manifest.model_name != model_name:
+        logger_snapshot.warning(
+            f'Снапшот {directory} собран для {manifest.model_name}, '
+            f'ожидалась {model_name}')
+        return None
+
+    actual = hash_files(directory)
+    if actual != manifest.files:
+        changed = sorted(name for name in manifest.files.keys() | actual.keys()
+                         if manifest.files.get(name) != actual.get(name))
+        logger_snapshot.error(
+            f'Снапшот {directory} повреждён, не совпадают: {changed}')
+        return None
+    return manifest
+
+
+def is_commit_sha(revision: str | None) -> bool:
+    """Ревизия — полный (40 символов) commit, а не ветка или тег."""
+    return bool(revision and _COMMIT_SHA_RE.fullmatch(revision))
+
+
+def export_snapshot(model_name: str, revision: str,
+                    output: Path | None = None) -> SnapshotManifest:
+    """
+    Скачивает модель и токенизатор с Hub и атомарно выгружает их в output.
+    Кэш Hub используется временный, чтобы не хранить модель в образе дважды.
+    Args:
+        model_name (str): Имя модели на Hugging Face Hub.
+        revision (str): Полный commit модели на Hub.
+        output (Path | None): Каталог снапшота; None — default_snapshot_dir.
+    Returns:
+        SnapshotManifest: Манифест выгруженного снапшота.
+    Raises:
+        ValueError: revision — не полный commit.
+        RuntimeError: Hub отдал модель из другого commit.
+    """
+    if not is_commit_sha(revision):
+        raise ValueError(
+            f'Model revision must be a full commit sha, got {revision!r}')
+
+    from transformers import (AutoModelForSequenceClassification,
+                              AutoTokenizer)
+
+    output = Path(output or default_snapshot_dir(model_name))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = output.with_name(output.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_name, revision=revision, cache_dir=cache_dir)
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name, revision=revision, cache_dir=cache_dir)
+        resolved = getattr(model.config, '_commit_hash', None)
+        if resolved and resolved != revision:
+            raise RuntimeError(
+                f'{model_name}: requested {revision}, got {resolved}')
+        tokenizer.save_pretrained(tmp_dir)
+        model.save_pretrained(tmp_dir)
+
+    manifest = write_manifest(tmp_dir, model_name, revision)
+    shutil.rmtree(output, ignore_errors=True)
+    tmp_dir.replace(output)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Выгрузка локального снапшота модели токсичности')
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    parser.add_argument(
+        '--revision', default=os.environ.get(REVISION_ENV),
+        help=f'полный commit модели на Hub (по умолчанию ${REVISION_ENV})')
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--verify', action='store_true',
+                        help='только проверить готовый снапшот')
+    args = parser.parse_args()
+    output = args.output or default_snapshot_dir(args.model)
+
+    start = time.perf_counter()
+    if args.verify:
+        manifest = verify_snapshot(output, args.model)
+        if manifest is None:
+            raise SystemExit(f'{output}: снапшот не прошёл проверку')
+    else:
+        if not is_commit_sha(args.revision):
+            parser.error(f'--revision (или ${REVISION_ENV}) должен быть '
+                         f'полным commit модели, получено {args.revision!r}')
+        manifest = export_snapshot(args.model, args.revision, output)
+    print(f'{output}: {manifest.model_name}@{manifest.revision}, '
+          f'{len(manifest.files)} files '
+          f'({time.perf_counter() - start:.2f} s)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import logging
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from hashlib import blake2b
+
+logger_prefilter = logging.getLogger(__name__)
+
+
+@dataclass
+class CharStats:
+    """
+    Гистограмма классов символов текста.
+
+    Attributes:
+        total (int): Всего символов.
+        cyrillic (int): Кириллических букв.
+        latin (int): Латинских букв.
+        digits (int): Цифр.
+        words (int): Слов.
+    """
+    total: int
+    cyrillic: int
+    latin: int
+    digits: int
+    words: int
+
+
+@dataclass
+class PreClassifier:
+    """
+    Дешёвый многоуровневый предфильтр перед ProfanityFilter.
+
+    Все проверки линейны по длине текста и не используют pymorphy и
+    регулярные выражения ProfanityFilter. Если текст заведомо чистый,
+    classify возвращает название уровня, на котором он отсеян, иначе None —
+    и текст уходит на полную проверку.
+
+    Уровни (в порядке проверки):
+        empty: в тексте нет ни букв, ни цифр.
+        cache: текст уже проверялся полной проверкой и оказался чистым.
+        code: в тексте есть признаки кода (те же, что пропускает
+            ProfanityFilter).
+        charset: текст из одних цифр или одного повторяющегося символа.
+
+    Предфильтр отсеивает только то, что полная проверка и так признала бы
+    чистым. Поэтому нет уровней "текст без кириллицы" (base_pattern,
+    additional_patterns и better_profanity ловят латиницу и транслит) и
+    "большая часть текста — блоки <pre><code>" (мат вне блока кода).
+
+    Attributes:
+        cache_size (int): Размер кэша заведомо чистых текстов.
+        stats (Counter): Счётчики отсеянных текстов по уровням, 'passed' —
+            тексты, ушедшие на полную проверку.
+    """
+    cache_size: int = 10000
+    stats: Counter = field(default_factory=Counter, init=False)
+    _clean_cache: OrderedDict = field(
+        default_factory=OrderedDict, init=False, repr=False)
+
+    CODE_MARKERS = ('=', '(', ')', 'print', 'def', 'class')
+
+    _CYRILLIC_RE = re.compile(r'[а-яё]', flags=re.IGNORECASE)
+    _LATIN_RE = re.compile(r'[a-z]', flags=re.IGNORECASE)
+    _DIGIT_RE = re.compile(r'\d')
+
+    @classmethod
+    def char_stats(cls, text: str) -> CharStats:
+        """Считает гистограмму классов символов текста."""
+        return CharStats(
+            total=len(text),
+            cyrillic=len(cls._CYRILLIC_RE.findall(text)),
+            latin=len(cls._LATIN_RE.findall(text)),
+            digits=len(cls._DIGIT_RE.findall(text)),
+            words=len(text.split()))
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        return blake2b(text.encode(), digest_size=16).digest()
+
+    def classify(self, text: str) -> str | None:
+        """
+        Пытается отсеять текст дешёвыми проверками.
+        Args:
+            text (str): Текст комментария.
+        Returns:
+            str | None: Название уровня, отсеявшего текст как чистый, или
+                None, если нужна полная проверка.
+        """
+        tier = self._classify(text)
+        self.stats[tier or 'passed'] += 1
+        return tier
+
+    def _classify(self, text: str) -> str | None:
+        stats = self.char_stats(text)
+
+        if not (stats.cyrillic or stats.latin or stats.digits):
+            return 'empty'
+
+        key = self._cache_key(text)
+        if key in self._clean_cache:
+            self._clean_cache.move_to_end(key)
+            return 'cache'
+
+        if any(marker in text for marker in self.CODE_MARKERS):
+            return 'code'
+
+        if text.isdigit() or len(set(text)) == 1:
+            return 'charset'
+
+        return None
+
+    def remember_clean(self, text: str) -> None:
+        """Запоминает текст, признанный полной проверкой чистым."""
+        key = self._cache_key(text)
+        self._clean_cache[key] = True
+        self._clean_cache.move_to_end(key)
+        if len(self._clean_cache) > self.cache_size:
+            self._clean_cache.popitem(last=False)
+
+    @property
+    def cached_count(self) -> int:
+        """Число текстов в кэше заведомо чистых (не больше cache_size)."""
+        return len(self._clean_cache)
+
+    def format_stats(self) -> str:
+        """Возвращает компактную строку со счётчиками уровней."""
+        total = sum(self.stats.values())
+        if not total:
+            return 'Предфильтр: проверок не было'
+        rows = [f'{tier}={count}({count / total:.0%})' for tier, count in
+            self.stats.most_common()]
+        return f'Предфильтр: всего={total} ' + ' '.join(rows)
@@ -1,105 +1,378 @@
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
 from typing import Dict, List, Optional, Union
 import asyncio
 import logging
+import time
 
+import torch
 from transformers import Pipeline, pipeline
 
+from filters.model_snapshot import default_snapshot_dir, verify_snapshot
+from utils.metrics import metrics
+
 logger_classifier = logging.getLogger(__name__)
 
+# Pipeline процесса-воркера (режим executor='process'): загружается один раз
+# в initializer пула и живёт, пока жив процесс
+_worker_pipeline: Pipeline | None = None
+
+# Тексты прогрева: короткий, обычный, длинный и код — чтобы при старте
+# отработали ленивые инициализации токенизатора и torch для разных длин
+WARMUP_TEXTS = (
+    'спасибо',
+    'не понимаю почему не проходит третий тест, вывод совпадает',
+    'курс ужасный автор ничего не объясняет задачи бред трачу время зря '
+    * 20,
+    'for i in range(n):\n    print(i)\nx = [int(i) for i in input().split()]')
+
+# Лимит длины входа модели в токенах (вместе со служебными) и доля начала
+# текста при обрезке: остальное берётся с конца, где в длинных комментариях
+# обычно сам вопрос или реакция после вставленного кода
+DEFAULT_MAX_TOKENS = 256
+HEAD_SHARE = 0.25
+DEFAULT_BATCH_SIZE = 8
+
+
+def _configure_torch(num_threads: int | None,
+                     interop_threads: int | None) -> None:
+    """
+    Ограничивает потоки torch, чтобы инференс не занимал все ядра и не
+    конкурировал с event loop. None — оставить значение torch по умолчанию.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as err:
+            # Можно задать только до первой параллельной операции в процессе
+            logger_classifier.warning(f'Interop threads not set: {err}')
+
+
+def _warm_up(classifier: Pipeline) -> float:
+    """Прогоняет WARMUP_TEXTS через модель, возвращает время в секундах."""
+    start = time.perf_counter()
+    for text in WARMUP_TEXTS:
+        classifier(text, truncation=True)
+    return time.perf_counter() - start
+
+
+def _load_pipeline(task: str,
+                   model_name: str,
+                   num_threads: int | None = None,
+                   interop_threads: int | None = None) -> Pipeline:
+    _configure_torch(num_threads, interop_threads)
+    # Каталог снапшота грузим только с диска, без обращений к Hub
+    local_files_only = Path(model_name).is_dir()
+    classifier = pipeline(
+        task=task,
+        model=model_name,
+        tokenizer=model_name,
+        device="cpu",
+        framework="pt",
+        model_kwargs={'local_files_only': local_files_only})
+    warm_up_time = _warm_up(classifier)
+    logger_classifier.info(
+        f'Warm-up {model_name}: {len(WARMUP_TEXTS)} texts in '
+        f'{warm_up_time:.2f} s (torch threads: {torch.get_num_threads()})')
+    return classifier
+
+
+def _init_worker(task: str,
+                 model_name: str,
+                 num_threads: int | None = None,
+                 interop_threads: int | None = None) -> None:
+    global _worker_pipeline
+    _worker_pipeline = _load_pipeline(
+        task, model_name, num_threads, interop_threads)
+
+
+def _truncate(classifier: Pipeline, text: str,
+              max_tokens: int) -> tuple[str, int]:
+    """
+    Обрезает текст до max_tokens токенов по схеме head+tail: HEAD_SHARE
+    бюджета с начала текста, остальное — с конца.
+    Returns:
+        tuple[str, int]: Текст для модели и его длина в токенах (без
+            служебных) — по ней сортируется батч.
+    """
+    tokenizer = classifier.tokenizer
+    token_ids = tokenizer(text, add_special_tokens=False)['input_ids']
+    budget = max_tokens - tokenizer.num_special_tokens_to_add()
+    if len(token_ids) <= budget:
+        return text, len(token_ids)
+    
+    head = int(budget * HEAD_SHARE)
+    tail = budget - head
+    truncated = (tokenizer.decode(token_ids[:head]) + ' ' +
+                 tokenizer.decode(token_ids[-tail:]))
+    return truncated, budget
+
+
+def _classify(classifier: Pipeline, texts: list[str], max_tokens: int,
+              batch_size: int) -> list[dict]:
+    """
+    Классифицирует тексты батчами. Тексты обрезаются до max_tokens и
+    сортируются по длине, чтобы в батче паддинг шёл до близкой длины, а не
+    до самого длинного комментария; результат — в исходном порядке.
+    """
+    prepared = [_truncate(classifier, text, max_tokens) for text in texts]
+    order = sorted(range(len(texts)), key=lambda index: prepared[index][1])
+    # truncation=True страхует от расхождения длины после decode/encode
+    results = classifier([prepared[index][0] for index in order],
+                         batch_size=batch_size,
+                         truncation=True,
+                         max_length=max_tokens)
+    
+    ordered: list[dict] = [{}] * len(texts)
+    for index, result in zip(order, results):
+        ordered[index] = result
+    return ordered
+
+
+def _worker_classify(texts: list[str], max_tokens: int,
+                     batch_size: int) -> list[dict]:
+    return _classify(_worker_pipeline, texts, max_tokens, batch_size)
+
 
 class RussianToxicityClassifier:
-    def __init__(self, models: List[str], task: str = 'text-classification'):
+    EXECUTOR_THREAD = 'thread'
+    EXECUTOR_PROCESS = 'process'
+    
+    def __init__(self,
+                 models: List[str],
+                 task: str = 'text-classification',
+                 executor: str = EXECUTOR_THREAD,
+                 workers: int = 1,
+                 num_threads: int | None = None,
+                 interop_threads: int | None = None,
+                 snapshot_dir: str | Path | None = None,
+                 max_tokens: int = DEFAULT_MAX_TOKENS,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
         """
         Инициализация классификатора токсичности.
 
         :param models: Список моделей для попытки загрузки (в порядке приоритета)
         :param task: Тип задачи для pipeline (по умолчанию 'text-classification')
+        :param executor: Где выполнять инференс: 'thread' — в пуле потоков
+            процесса бота, 'process' — в отдельных процессах-воркерах (не
+            конкурирует за GIL с aiogram)
+        :param workers: Число процессов-воркеров для executor='process'
+        :param num_threads: torch.set_num_threads (на процесс-воркер в
+            режиме 'process'); None — значение torch по умолчанию
+        :param interop_threads: torch.set_num_interop_threads
+        :param snapshot_dir: Каталог локального снапшота модели
+            (filters.model_snapshot); None — $HF_HOME/snapshots/<модель>.
+            Проверенный снапшот пробуется первым, модели из models — запасной
+            вариант через Hub
+        :param max_tokens: Максимальная длина входа модели в токенах;
+            длинные тексты обрезаются по схеме head+tail
+        :param batch_size: Размер батча инференса в batch_predict
         """
+        if executor not in (self.EXECUTOR_THREAD, self.EXECUTOR_PROCESS):
+            raise ValueError(f'Unknown executor: {executor}')
         self.task = task
         self.models = models
+        self.executor = executor
+        self.workers = max(1, workers)
+        self.num_threads = num_threads
+        self.interop_threads = interop_threads
+        self.snapshot_dir = Path(
+            snapshot_dir or default_snapshot_dir(models[0]))
+        self.max_tokens = max_tokens
+        self.batch_size = max(1, batch_size)
         self.classifier: Pipeline | None = None
         self.loaded_model_name: str | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        self._failed = False
+    
+    @property
+    def is_ready(self) -> bool:
+        """Модель загружена и прогрета (initialize завершился успешно)."""
+        return self._ready.is_set()
+    
+    @property
+    def is_failed(self) -> bool:
+        """Ни одну модель загрузить не удалось — ждать готовности бессмысленно."""
+        return self._failed
+    
+    async def wait_ready(self) -> None:
+        await self._ready.wait()
     
     async def initialize(self) -> None:
         """Инициализирует классификатор (должен быть вызван перед использованием)"""
-        for model_name in self.models:
+        candidates = list(self.models)
+        manifest = await asyncio.to_thread(verify_snapshot, self.snapshot_dir)
+        if manifest:
+            logger_classifier.info(
+                f'Using local snapshot {self.snapshot_dir}: '
+                f'{manifest.model_name}@{manifest.revision}')
+            candidates.insert(0, str(self.snapshot_dir))
+        
+        for model_name in candidates:
+            start = time.perf_counter()
             try:
-                self.classifier = await asyncio.to_thread(
-                    pipeline,
-                    task=self.task,
-                    model=model_name,
-                    tokenizer=model_name,
-                    device="cpu",
-                    framework="pt")
+                # Загрузка включает прогрев: когда initialize завершился,
+                # модель действительно готова, и первый тик не будет медленным
+                if self.executor == self.EXECUTOR_PROCESS:
+                    await self._start_pool(model_name)
+                else:
+                    self.classifier = await asyncio.to_thread(
+                        _load_pipeline, self.task, model_name,
+                        self.num_threads, self.interop_threads)
                 self.loaded_model_name = model_name
-                await asyncio.sleep(10)
-                logger_classifier.info(f'Classifier loaded!')
+                self._ready.set()
+                logger_classifier.info(
+                    f'Classifier ready: {model_name} ({self.executor}) in '
+                    f'{time.perf_counter() - start:.2f} s')
                 return
             except Exception as e:
                 logger_classifier.error(f"Failed to load {model_name}: {str(e)}")
                 continue
         
+        self._failed = True
         raise RuntimeError("All models failed to load")
     
     async def is_initialized(self) -> bool:
         """Проверяет, была ли успешная инициализация"""
-        return self.classifier is not None
+        return self.classifier is not None or self._pool is not None
+    
+    async def _start_pool(self, model_name: str) -> None:
+        """
+        Поднимает пул процессов, в каждом из которых модель загружается один
+        раз. Воркеры запускаются сразу: по задаче на каждый, чтобы ошибка
+        загрузки модели проявилась здесь, а не на первом комментарии.
+        """
+        # spawn: fork процесса с инициализированным torch/aiohttp небезопасен
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.task, model_name, self.num_threads,
+                      self.interop_threads))
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _worker_classify, ['привет'], self.max_tokens, 1)
+                for _ in range(self.workers)))
+        except Exception:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._pool = pool
+        logger_classifier.info(
+            f'Inference process pool started: {self.workers} worker(s)')
+    
+    async def _restart_pool(self, broken_pool: ProcessPoolExecutor) -> None:
+        """Перезапускает пул, если воркер умер (BrokenProcessPool)."""
+        async with self._pool_lock:
+            # Пул уже перезапущен другим запросом
+            if self._pool is not broken_pool:
+                return
+            logger_classifier.warning('Inference worker died, restarting pool')
+            metrics.inc('toxicity_worker_restarts_total')
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            # Умерший пул остаётся в self._pool, пока его не заменит новый:
+            # параллельные запросы получат BrokenProcessPool и дождутся
+            # перезапуска, а не уйдут в пул потоков по умолчанию (pool=None)
+            await self._start_pool(self.loaded_model_name)
+    
+    async def _infer(self, texts: list[str]) -> list[dict]:
+        if self.executor == self.EXECUTOR_THREAD:
+            return await asyncio.to_thread(
+                _classify, self.classifier, texts, self.max_tokens,
+                self.batch_size)
+        
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(
+                pool, _worker_classify, texts, self.max_tokens,
+                self.batch_size)
+        except BrokenProcessPool:
+            # Один повтор на свежем пуле
+            await self._restart_pool(pool)
+            return await loop.run_in_executor(
+                self._pool, _worker_classify, texts, self.max_tokens,
+                self.batch_size)
+    
+    async def close(self) -> None:
+        """Останавливает процессы-воркеры (для executor='process')."""
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
     
     @staticmethod
     async def _normalized_text(text: str) -> str:
         normalized_text = re.sub(r'(.)\1+', r'\1', text)
         return normalized_text
     
-    async def predict(self, text: str, threshold: float = 0.5) -> Dict[
+    @staticmethod
+    def _to_result(text: str, result: dict, threshold: float) -> Dict[
         str, Union[str, float, bool]]:
-        """
-        Асинхронно предсказывает токсичность текста.
-
-        :param text: Текст для анализа
-        :param threshold: Порог уверенности для классификации
-        :return: Словарь с результатом и метаданными.
-        """
-        if not self.classifier:
+        is_toxic = (
+            result['label'] == 'toxic' if 'label' in result else
+            result['label'] == 'LABEL_1')
+        confidence = result['score']
+        
+        return {
+            'text': text,
+            'is_toxic': is_toxic and (confidence >= threshold),
+            'confidence': confidence}
+    
+    async def _predict_many(self, texts: List[str], threshold: float) -> \
+        List[Dict[str, Union[str, float, bool]]]:
+        if not await self.is_initialized():
             raise RuntimeError("Classifier didn't initialize")
         
         try:
-            result = await asyncio.to_thread(
-                self.classifier,
-                await self._normalized_text(text))
-            logger_classifier.debug(f"{result=}")
-            first_result = result[0]
-            logger_classifier.debug(f"{first_result=}")
-            
-            is_toxic = (
-                first_result['label'] == 'toxic' if 'label' in first_result else
-                first_result['label'] == 'LABEL_1')
-            confidence = first_result['score']
-            
-            return {
-                'text': text,
-                'is_toxic': is_toxic and (confidence >= threshold),
-                'confidence': confidence}
+            results = await self._infer(
+                [await self._normalized_text(text) for text in texts])
+            logger_classifier.debug(f"{results=}")
+            return [self._to_result(text, result, threshold)
+                    for text, result in zip(texts, results)]
         
         except Exception as e:
             logger_classifier.error(f"Prediction error: {str(e)}")
-            return {
+            metrics.inc('toxicity_predict_errors_total')
+            return [{
                 'text': text,
                 'error': str(e),
                 'is_toxic': False,
-                'confidence': 0.0}
+                'confidence': 0.0} for text in texts]
+    
+    @metrics.timer('toxicity_predict_seconds')
+    async def predict(self, text: str, threshold: float = 0.5) -> Dict[
+        str, Union[str, float, bool]]:
+        """
+        Асинхронно предсказывает токсичность текста.
+
+        :param text: Текст для анализа
+        :param threshold: Порог уверенности для классификации
+        :return: Словарь с результатом и метаданными.
+        """
+        return (await self._predict_many([text], threshold))[0]
     
+    @metrics.timer('toxicity_batch_predict_seconds')
     async def batch_predict(self, texts: List[str], threshold: float = 0.5) -> \
         List[Dict[str, Union[str, float, bool]]]:
         """
-        Асинхронно обрабатывает список текстов.
+        Асинхронно обрабатывает список текстов одним вызовом модели: тексты
+        группируются в батчи по длине (см. _classify).
 
         :param texts: Список текстов для анализа
         :param threshold: Порог уверенности для классификации
-        :return: Список результатов
+        :return: Список результатов в порядке texts
         """
-        tasks = [self.predict(text, threshold) for text in texts]
-        return await asyncio.gather(*tasks)
+        if not texts:
+            return []
+        return await self._predict_many(texts, threshold)
     
     async def get_model_info(self) -> Dict[str, Optional[str]]:
         """Возвращает информацию о загруженной модели."""
@@ -109,4 +382,5 @@ class RussianToxicityClassifier:
         return {
             'model_name': self.loaded_model_name,
             'task': self.task,
-            'status': 'loaded' if self.classifier else 'failed'}
+            'executor': self.executor,
+            'status': 'loaded' if await self.is_initialized() else 'failed'}
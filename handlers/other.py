@@ -19,7 +19,7 @@ other_router.callback_query.filter(
 
 @other_router.message()
 async def msg_other_handler(msg: Message,
-                        owners: list[int],
+                        owners: frozenset[int],
                         msg_processor: MessageProcessor,
                         redis_service: RedisService) -> None:
     
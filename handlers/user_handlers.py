@@ -31,7 +31,7 @@ user_router.callback_query.filter(
 
 @user_router.callback_query(F.data.in_(['/cancel', '/exit']))
 async def clbk_cancel(clbk: CallbackQuery,
-                      owners: list[int],
+                      owners: frozenset[int],
                       msg_processor: MessageProcessor,
                       redis_service: RedisService,
                       state: FSMContext) -> None:
@@ -47,7 +47,7 @@ async def clbk_cancel(clbk: CallbackQuery,
             working with Redis.
         state (FSMContext): An instance of the FSMContext class for managing
             state.
-        owners (list[int]): A list of owner IDs.
+        owners (frozenset[int]): A set of owner IDs.
     """
     logger.debug('Entry')
     
@@ -75,7 +75,7 @@ async def clbk_cancel(clbk: CallbackQuery,
 async def cmd_start(msg: Message,
                     msg_processor: MessageProcessor,
                     redis_service: RedisService,
-                    owners: list[int],
+                    owners: frozenset[int],
                     state: FSMContext) -> None:
     """
     Handler for the /start command.
@@ -86,7 +86,7 @@ async def cmd_start(msg: Message,
     Args:
         redis_service (RedisService): An instance of the RedisService class for
             working with Redis.
-        owners (list[int]): A list of owner IDs
+        owners (frozenset[int]): A set of owner IDs
         msg (Message): The message object that triggered the /start command
         msg_processor (MessageProcessor): An instance of the MessageProcessor
             class for deleting messages
@@ -186,7 +186,7 @@ async def msg_settings(msg: Message,
     F.data == 'all_settings', StateFilter(default_state))
 async def clbk_settings(clbk: CallbackQuery,
                         state: FSMContext,
-                        owners: list[int]):
+                        owners: frozenset[int]):
     logger.debug('Entry')
     
     kb = (kb_user_all_settings, kb_own_all_settings)[clbk.from_user.id in owners]
@@ -231,7 +231,7 @@ async def clbk_notif(clbk: CallbackQuery,
         StateFilter(AllSettingsStates.settings_toxic_msgs)))
 async def clbk_notif_back(clbk: CallbackQuery,
                           state: FSMContext,
-                          owners: list[int]):
+                          owners: frozenset[int]):
     logger.debug('Entry')
     
     kb = (kb_user_all_settings, kb_own_all_settings)[clbk.from_user.id in owners]
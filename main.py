@@ -6,7 +6,11 @@ import yaml
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from environs import Env
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import (ConnectionError as RedisConnectionError,
+                              TimeoutError as RedisTimeoutError)
 from aiogram.fsm.storage.redis import RedisStorage
 from aiogram import Bot, Dispatcher
 
@@ -15,10 +19,16 @@ from filters.toxicity_classifiers import RussianToxicityClassifier
 from handlers import other, owners_handlers, user_handlers
 from keyboards.set_menu import set_main_menu
 from scheduler import start_scheduler
+from tasks.adaptive_polling import AdaptivePolling
 from tasks.tasks import StepikTasks
 from utils.stepik import StepikAPIClient
+from middlewares.metrics import BotApiMetricsMiddleware
 from middlewares.outer import MsgProcMiddleware
 from filters.filters import ProfanityFilter
+from utils.coordination import Coordinator
+from utils.json_codec import get_json_loads
+from utils.metrics_server import start_metrics_server
+from utils.redis_schema import migrate
 from utils.redis_service import RedisService
 
 logger_main = logging.getLogger(__name__)
@@ -33,19 +43,43 @@ async def setup_logging(config: Config):
     logger_main.info('=== LOGGING CONFIGURATION IS LOADED SUCCESSFULLY ===')
 
 
-async def setup_redis(config: Config) -> tuple[Redis, Redis]:
-    redis_fsm = Redis(
-        host=config.redis_host,
-        port=6379,
-        db=0,
-        password=config.redis_password or None)
-    
-    redis_data = Redis(
+def create_redis(config: Config, db: int, decode_responses: bool) -> Redis:
+    """
+    Клиент Redis со своим пулом соединений: ограниченный размер пула
+    (при исчерпании ждём свободное соединение), таймауты, health check и
+    повтор команд с экспоненциальной задержкой при обрывах и таймаутах.
+    """
+    pool_config = config.redis_pool
+    pool = BlockingConnectionPool(
         host=config.redis_host,
         port=6379,
-        db=1,
-        decode_responses=True,
-        password=config.redis_password or None)
+        db=db,
+        password=config.redis_password or None,
+        decode_responses=decode_responses,
+        max_connections=pool_config.max_connections,
+        timeout=pool_config.socket_timeout,
+        socket_timeout=pool_config.socket_timeout,
+        socket_connect_timeout=pool_config.connect_timeout,
+        socket_keepalive=True,
+        health_check_interval=pool_config.health_check_interval,
+        retry=Retry(ExponentialBackoff(cap=2.0, base=0.1),
+                    pool_config.retries),
+        # OSError — отказ в соединении, пока Redis перезапускается
+        retry_on_error=[RedisConnectionError, RedisTimeoutError, OSError])
+    # from_pool: клиент владеет пулом и закрывает его в aclose()
+    return Redis.from_pool(pool)
+
+
+async def setup_redis(config: Config) -> tuple[Redis, Redis]:
+    fsm_db = config.redis_pool.fsm_db
+    data_db = config.redis_pool.data_db
+    redis_data = create_redis(config, db=data_db, decode_responses=True)
+    # Пул привязан к номеру БД, поэтому общий клиент возможен, только если
+    # FSM и данные в одной БД (ключи aiogram отделены префиксом fsm:)
+    if fsm_db == data_db:
+        redis_fsm = redis_data
+    else:
+        redis_fsm = create_redis(config, db=fsm_db, decode_responses=False)
     
     try:
         await redis_fsm.ping()
@@ -66,6 +100,55 @@ async def setup_redis(config: Config) -> tuple[Redis, Redis]:
     return redis_fsm, redis_data
 
 
+async def close_redis(redis_fsm: Redis, redis_data: Redis) -> None:
+    await redis_data.aclose()
+    if redis_fsm is not redis_data:
+        await redis_fsm.aclose()
+
+
+async def poll_as_leader(dp: Dispatcher, bot: Bot, coordinator: Coordinator,
+                         **kwargs) -> None:
+    """
+    Опрашивает Telegram, только пока реплика — лидер: getUpdates с двух
+    реплик конфликтует. При потере лидерства polling останавливается и
+    возобновляется, когда лидерство вернётся. Polling, завершившийся сам
+    (сигнал остановки), завершает и эту функцию.
+
+    Вебхук снимает только лидер и без сброса накопленных обновлений:
+    реплика, ставшая лидером, дочитывает то, что не успел прежний.
+    """
+    while True:
+        await coordinator.wait_leadership(True)
+        await bot.delete_webhook(drop_pending_updates=False)
+        logger_main.info('Leader: start polling')
+        polling = asyncio.create_task(
+            dp.start_polling(bot, close_bot_session=False, **kwargs))
+        lost = asyncio.create_task(coordinator.wait_leadership(False))
+        await asyncio.wait({polling, lost},
+                           return_when=asyncio.FIRST_COMPLETED)
+        if polling.done():
+            lost.cancel()
+            return polling.result()
+        logger_main.warning('Leadership lost: stop polling')
+        try:
+            await dp.stop_polling()
+        except RuntimeError:
+            # Polling ещё не успел запуститься
+            polling.cancel()
+        await asyncio.gather(polling, return_exceptions=True)
+
+
+async def load_toxicity_filter(
+    toxicity_filter: RussianToxicityClassifier) -> None:
+    try:
+        await toxicity_filter.initialize()
+        logger_main.info('=== TOXICITY FILTER INITIALIZATION SUCCEEDED ===')
+    except Exception as err:
+        logger_main.error(
+            f'=== TOXICITY FILTER INITIALIZATION FAILED: {err}. '
+            f'Working with ProfanityFilter only ===', exc_info=True)
+
+
 async def main():
     env = Env()
     env.read_env()
@@ -76,48 +159,87 @@ async def main():
     stepik_client_id: str = config.stepik.client_id
     stepik_client_secret: str = config.stepik.client_secret
     redis_fsm, redis_data = await setup_redis(config)
+    schema_version = await migrate(redis_data)
+    logger_main.info(f'=== REDIS SCHEMA v{schema_version} ===')
     
     stepik_client = StepikAPIClient(
         client_id=stepik_client_id,
         client_secret=stepik_client_secret,
-        redis_client=redis_data)
+        redis_client=redis_data,
+        json_loads=get_json_loads(config.stepik.json_decoder))
     
     bot = Bot(
         token=config.tg_bot.token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(BotApiMetricsMiddleware())
     logger_main.info('=== BOT INITIALIZATION SUCCEEDED ===')
     
     storage = RedisStorage(redis=redis_fsm)
     
     redis_service = RedisService(redis=redis_data,
                                  stepik_client=stepik_client)
+    cache_task = asyncio.create_task(redis_service.run_cache_invalidation())
     logger_main.info('=== STEPIK SERVICE INITIALIZATION SUCCEEDED ===')
     
+    coordinator = Coordinator(
+        redis=redis_data,
+        shard_count=config.coordination.shard_count,
+        lease_ttl=config.coordination.lease_ttl,
+        renew_interval=config.coordination.renew_interval)
+    # Первые аренды — до старта планировщика, чтобы первый тик знал шарды
+    await coordinator.rebalance()
+    coordinator_task = asyncio.create_task(coordinator.run())
+    logger_main.info(
+        f'=== COORDINATOR STARTED: {coordinator.instance_id} ===')
+    
     dp = Dispatcher(storage=storage)
     
+    metrics_runner = None
+    if config.metrics.enabled:
+        metrics_runner = await start_metrics_server(
+            host=config.metrics.host, port=config.metrics.port)
+    
     await set_main_menu(bot=bot)
     
-    profanity_filter = ProfanityFilter()
+    profanity_filter = ProfanityFilter(
+        executor=config.profanity.executor,
+        workers=config.profanity.workers)
     logger_main.info('=== PROFANITY FILTER INITIALIZATION SUCCEEDED ===')
     
     logger_main.info('=== TOXICITY FILTER START INITIALIZATION... ===')
     toxicity_filter = RussianToxicityClassifier(
-            ["SkolkovoInstitute/russian_toxicity_classifier"])
-    await toxicity_filter.initialize()
-    logger_main.info('=== TOXICITY FILTER INITIALIZATION SUCCEEDED ===')
+            ["SkolkovoInstitute/russian_toxicity_classifier"],
+            executor=config.toxicity.executor,
+            workers=config.toxicity.workers,
+            num_threads=config.toxicity.num_threads,
+            interop_threads=config.toxicity.interop_threads,
+            snapshot_dir=config.toxicity.model_dir,
+            max_tokens=config.toxicity.max_tokens,
+            batch_size=config.toxicity.batch_size)
+    # Модель грузится в фоне: polling и модерация по ProfanityFilter
+    # стартуют сразу, а срабатывания до готовности модели ждут в очереди
+    toxicity_task = asyncio.create_task(load_toxicity_filter(toxicity_filter))
     
     stepik_tasks = StepikTasks(
         stepik_client=stepik_client,
         redis_service=redis_service,
         bot=bot,
         owners=config.tg_bot.id_owners,
-        storage=storage)
+        storage=storage,
+        coordinator=coordinator,
+        tick_interval=config.polling.tick_seconds,
+        tick_budget=config.polling.tick_budget,
+        polling=AdaptivePolling(
+            min_interval=config.polling.min_interval,
+            max_interval=config.polling.max_interval,
+            target_comments=config.polling.target_comments))
     logger_main.info('=== STEPIK TASKS INITIALIZATION SUCCEEDED ===')
     
     await start_scheduler(
         stepik_tasks=stepik_tasks,
         profanity_filter=profanity_filter,
-        toxicity_filter=toxicity_filter)
+        toxicity_filter=toxicity_filter,
+        tick_seconds=config.polling.tick_seconds)
     
     try:
         # routers
@@ -128,23 +250,33 @@ async def main():
         # middlewares
         dp.update.middleware(MsgProcMiddleware())
         
-        await bot.delete_webhook(drop_pending_updates=True)
         logger_main.info('Start bot')
         
-        await asyncio.gather(
-            dp.start_polling(
-                bot,
-                owners=config.tg_bot.id_owners,
-                redis_fsm=redis_fsm,
-                redis_data=redis_data,
-                stepik_client=stepik_client,
-                redis_service=redis_service))
+        await poll_as_leader(
+            dp,
+            bot,
+            coordinator,
+            # Множество: проверка владельца в фильтрах и хэндлерах — O(1)
+            owners=frozenset(config.tg_bot.id_owners),
+            redis_fsm=redis_fsm,
+            redis_data=redis_data,
+            stepik_client=stepik_client,
+            redis_service=redis_service)
     
     except Exception as err:
         logger_main.exception(err)
         raise
     finally:
-        await redis_fsm.aclose()
+        toxicity_task.cancel()
+        cache_task.cancel()
+        coordinator_task.cancel()
+        await coordinator.close()
+        await bot.session.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        await toxicity_filter.close()
+        profanity_filter.close()
+        await close_redis(redis_fsm, redis_data)
         logger_main.info('Stop bot')
 
 
@@ -0,0 +1,41 @@
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (BaseRequestMiddleware,
+                                                     NextRequestMiddlewareType)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from utils.metrics import metrics
+
+logger_middl_metrics = logging.getLogger(__name__)
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Request-middleware сессии бота: замеряет каждый вызов Bot API.
+    Пишет длительность в telegram_request_seconds{method} и исход в
+    telegram_requests_total{method, result}, где result — 'ok' или имя
+    исключения (TelegramRetryAfter, TelegramBadRequest и т.п.).
+    Подключается через bot.session.middleware(BotApiMetricsMiddleware()).
+    """
+
+    async def __call__(self,
+                       make_request: NextRequestMiddlewareType[TelegramType],
+                       bot: Bot,
+                       method: TelegramMethod[TelegramType]
+                       ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        result = 'ok'
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as err:
+            result = type(err).__name__
+            raise
+        finally:
+            metrics.observe('telegram_request_seconds',
+                            time.perf_counter() - start, method=api_method)
+            metrics.inc('telegram_requests_total',
+                        method=api_method, result=result)
@@ -1,30 +1,61 @@
 import logging
 
+from apscheduler.events import (EVENT_JOB_ERROR,
+                                EVENT_JOB_MAX_INSTANCES,
+                                EVENT_JOB_MISSED,
+                                JobEvent)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from filters.filters import ProfanityFilter
 from filters.toxicity_classifiers import RussianToxicityClassifier
 from tasks.tasks import StepikTasks
+from utils.metrics import metrics
 
 logger_scheduler = logging.getLogger(__name__)
 
+CHECK_COMMENTS_JOB_ID = 'check_comments'
+
+JOB_EVENT_NAMES = {
+    EVENT_JOB_MISSED: 'missed',
+    EVENT_JOB_MAX_INSTANCES: 'max_instances',
+    EVENT_JOB_ERROR: 'error'}
+
+
+def on_job_event(event: JobEvent) -> None:
+    """Считает пропуски (misfire), наложения и ошибки задач планировщика."""
+    name = JOB_EVENT_NAMES.get(event.code, str(event.code))
+    metrics.inc('scheduler_job_events_total', job=event.job_id, event=name)
+    logger_scheduler.warning(f'Scheduler job {event.job_id}: {name}')
+
 
 async def start_scheduler(stepik_tasks: StepikTasks,
                           profanity_filter: ProfanityFilter,
-                          toxicity_filter: RussianToxicityClassifier) -> None:
+                          toxicity_filter: RussianToxicityClassifier,
+                          tick_seconds: int = 30) -> None:
     
     scheduler = AsyncIOScheduler()
     
     logger_scheduler.info("🟢=== PLANNER INITIALIZATION STARTED... ===")
     
+    def on_tick_event(event: JobEvent) -> None:
+        on_job_event(event)
+        if event.job_id == CHECK_COMMENTS_JOB_ID:
+            # Владельцам сообщит следующий завершившийся тик
+            stepik_tasks.note_tick_event(
+                JOB_EVENT_NAMES.get(event.code, str(event.code)))
+    
     scheduler.add_job(
         stepik_tasks.check_comments,
+        id=CHECK_COMMENTS_JOB_ID,
         args=[profanity_filter, toxicity_filter],
         trigger='interval',
-        minutes=2,
+        seconds=tick_seconds,
         max_instances=1,
         coalesce=True,
-        misfire_grace_time=60)
+        misfire_grace_time=tick_seconds)
     
+    scheduler.add_listener(
+        on_tick_event,
+        EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_ERROR)
     scheduler.start()
     logger_scheduler.info("🟢=== PLANNER IS LAUNCHED ===")
@@ -0,0 +1,119 @@
+"""
+Адаптивный интервал опроса курсов.
+
+Для каждого курса хранится EWMA скорости появления комментариев
+(комментариев в минуту) и время следующего опроса. Интервал подбирается
+так, чтобы за один опрос приходило около target_comments новых
+комментариев — заметно меньше страницы Stepik (100), — и ограничивается
+[min_interval, max_interval]. Тихие курсы опрашиваются редко, активные —
+часто; jitter разносит опросы во времени, чтобы курсы не синхронизировались
+в пачки запросов к API.
+
+Общий тик планировщика выбирает только курсы, у которых подошло время
+опроса (due), и после опроса обновляет их расписание (update).
+"""
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class CourseSchedule:
+    """
+    Расписание опроса курса.
+
+    Attributes:
+        rate (float): EWMA скорости комментариев, в минуту.
+        last_poll_at (float): Время последнего опроса, unix time.
+        next_poll_at (float): Время следующего опроса, unix time.
+    """
+    rate: float
+    last_poll_at: float
+    next_poll_at: float
+
+    def to_redis(self) -> dict[str, str]:
+        return {'poll_rate': f'{self.rate:.4f}',
+                'poll_last_at': f'{self.last_poll_at:.0f}',
+                'poll_next_at': f'{self.next_poll_at:.0f}'}
+
+    @classmethod
+    def from_redis(cls, data: dict[str, str | None]) -> 'CourseSchedule | None':
+        """Расписание из полей хэша курса; None, если курс ещё не опрашивался."""
+        try:
+            return cls(rate=float(data['poll_rate']),
+                       last_poll_at=float(data['poll_last_at']),
+                       next_poll_at=float(data['poll_next_at']))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+@dataclass
+class AdaptivePolling:
+    """
+    Расчёт расписаний опроса курсов.
+
+    Attributes:
+        min_interval (float): Минимальный интервал опроса курса, секунды.
+        max_interval (float): Максимальный интервал опроса курса, секунды.
+        target_comments (float): Желаемое число новых комментариев за опрос.
+        page_size (int): Размер страницы комментариев; полная страница
+            означает, что часть комментариев могла не поместиться.
+        alpha (float): Вес нового наблюдения в EWMA.
+        jitter (float): Разброс интервала, доля (0.2 — ±20%).
+        first_lookback (float): Окно первого опроса курса, секунды: новыми
+            считаются комментарии не старше него.
+    """
+    min_interval: float = 60.0
+    max_interval: float = 900.0
+    target_comments: float = 20.0
+    page_size: int = 100
+    alpha: float = 0.3
+    jitter: float = 0.2
+    first_lookback: float = 2 * 60 * 60
+
+    @staticmethod
+    def due(schedules: dict[int, CourseSchedule | None],
+            now: float | None = None) -> list[int]:
+        """
+        Курсы, которые пора опросить: новые и самые просроченные — первыми,
+        чтобы курсы, не опрошенные из-за бюджета тика, не откладывались.
+        """
+        now = time.time() if now is None else now
+        due = [(schedule.next_poll_at if schedule else float('-inf'),
+                course_id) for course_id, schedule in schedules.items()
+               if schedule is None or schedule.next_poll_at <= now]
+        return [course_id for _, course_id in sorted(due)]
+
+    def update(self, schedule: CourseSchedule | None, new_comments: int,
+               now: float | None = None) -> CourseSchedule:
+        """
+        Обновляет EWMA скорости по результату опроса и назначает следующий.
+        Args:
+            schedule (CourseSchedule | None): Текущее расписание курса.
+            new_comments (int): Новых комментариев в этом опросе.
+            now (float | None): Время опроса, unix time.
+        Returns:
+            CourseSchedule: Новое расписание.
+        """
+        now = time.time() if now is None else now
+        if schedule is None:
+            # Первый опрос: новые комментарии собраны за всё окно
+            elapsed = self.first_lookback
+        else:
+            elapsed = max(now - schedule.last_poll_at, 1.0)
+        observed = new_comments / (elapsed / 60)
+        rate = observed if schedule is None else (
+            self.alpha * observed + (1 - self.alpha) * schedule.rate)
+
+        if new_comments >= self.page_size:
+            # Страница заполнена, часть комментариев могла не поместиться —
+            # опрашиваем как можно чаще, без разброса
+            interval = self.min_interval
+        else:
+            interval = (self.target_comments / rate * 60 if rate > 0 else
+                        self.max_interval)
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+            interval = min(max(interval, self.min_interval), self.max_interval)
+
+        return CourseSchedule(rate=rate, last_poll_at=now,
+                              next_poll_at=now + interval)
@@ -1,5 +1,7 @@
 import asyncio
 import logging
+import time
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Any
 from datetime import datetime, timedelta
@@ -10,14 +12,42 @@ from aiogram.types import LinkPreviewOptions
 from aiogram.fsm.storage.base import BaseStorage, StorageKey
 from aiohttp import ClientError
 
-from filters.filters import ProfanityFilter
+from filters.filters import ProfanityFilter, ProfanityVerdict
 from filters.toxicity_classifiers import RussianToxicityClassifier
+from tasks.adaptive_polling import AdaptivePolling, CourseSchedule
+from utils.coordination import Coordinator, shard_of
+from utils.metrics import COUNT_BUCKETS, metrics
 from utils.redis_service import RedisService
 from utils.stepik import StepikAPIClient
-from utils.utils import clean_html_tags
+from utils.utils import clean_html_tags, fit_html_message
 
 logger_tasks = logging.getLogger(__name__)
 
+# Действия политики для срабатываний ProfanityFilter по силе правила:
+# POLICY_FLAG — помечать токсичным сразу, POLICY_MODEL — подтверждать моделью
+POLICY_FLAG = 'flag'
+POLICY_MODEL = 'model'
+
+DEFAULT_TOXICITY_POLICY: dict[str, str] = {
+    ProfanityFilter.STRONG: POLICY_FLAG,
+    ProfanityFilter.MEDIUM: POLICY_MODEL,
+    ProfanityFilter.WEAK: POLICY_MODEL}
+
+MIN_TEXT_LEN_FOR_MODEL = 12
+# Порог уверенности модели токсичности
+TOXICITY_THRESHOLD = 0.82
+# Границы бакетов гистограммы интервалов опроса курсов, секунды
+POLL_INTERVAL_BUCKETS: tuple[float, ...] = (60, 120, 180, 300, 450, 600, 900)
+# Не чаще раза за это время (секунды) владельцам сообщается о проблемах тика
+TICK_ALERT_TTL = 1800
+
+TICK_EVENT_NAMES = {
+    'overrun': 'тик дольше интервала',
+    'carryover': 'работа перенесена на следующий тик',
+    'missed': 'тик пропущен (misfire)',
+    'max_instances': 'тик пропущен: предыдущий ещё идёт',
+    'error': 'тик завершился ошибкой'}
+
 
 @dataclass
 class StepikTasks:
@@ -26,12 +56,185 @@ class StepikTasks:
     redis_service: RedisService
     owners: list[int] = field(default_factory=list)
     storage: BaseStorage | None = None
+    toxicity_policy: dict[str, str] = field(
+        default_factory=lambda: dict(DEFAULT_TOXICITY_POLICY))
+    # Несколько реплик: каждая обрабатывает только курсы своих шардов
+    coordinator: Coordinator | None = None
+    # Интервал опроса каждого курса подбирается по его активности
+    polling: AdaptivePolling = field(default_factory=AdaptivePolling)
+    # Интервал тика и бюджет времени на него, секунды: по истечении бюджета
+    # необработанные комментарии откладываются на следующий тик
+    tick_interval: float = 30.0
+    tick_budget: float = 25.0
+    # Проблемы тиков, о которых ещё не сообщили владельцам
+    _tick_events: Counter = field(default_factory=Counter, init=False,
+                                  repr=False)
+    
+    @staticmethod
+    def _model_unavailable(
+        toxicity_filter: RussianToxicityClassifier | None) -> bool:
+        """Модели нет или она не загрузилась: работаем только ProfanityFilter."""
+        return toxicity_filter is None or toxicity_filter.is_failed
+    
+    def _needs_model(self, verdict: ProfanityVerdict, text: str) -> bool:
+        """
+        Решает по таблице toxicity_policy, нужно ли подтверждать срабатывание
+        ProfanityFilter моделью токсичности.
+        Короткие тексты модель классифицирует плохо — их не подтверждаем.
+        Args:
+            verdict (ProfanityVerdict): Вердикт ProfanityFilter.
+            text (str): Текст комментария.
+        Returns:
+            bool: True, если нужен прогон модели.
+        """
+        if len(text) < MIN_TEXT_LEN_FOR_MODEL:
+            return False
+        action = self.toxicity_policy.get(verdict.strength, POLICY_MODEL)
+        return action == POLICY_MODEL
     
     async def check_comments(self,
                              profanity_filter: ProfanityFilter,
                              toxicity_filter: RussianToxicityClassifier):
         logger_tasks.debug("Начало проверки комментариев")
+        tick_start = metrics.snapshot()
+        started = time.monotonic()
+        
+        with metrics.timer('tick_seconds'):
+            await self._check_comments(profanity_filter, toxicity_filter,
+                                       deadline=started + self.tick_budget)
+        
+        if time.monotonic() - started > self.tick_interval:
+            self.note_tick_event('overrun')
+        metrics.set('tick_last_finished_timestamp_seconds', time.time())
+        await self._report_tick_events()
+        self._export_prefilter_stats(profanity_filter)
+        logger_tasks.info(
+            f'Сводка тика:\n{metrics.format_summary(since=tick_start)}')
+        logger_tasks.info(profanity_filter.pre_classifier.format_stats())
+    
+    def _backlog_shard(self, course_id: int) -> int | None:
+        """Шард отложенных комментариев курса (None — одна реплика)."""
+        if self.coordinator is None:
+            return None
+        return shard_of(course_id, self.coordinator.shard_count)
+    
+    async def _checkpoint_backlog(self,
+                                  taken: dict[int | None, int],
+                                  remaining: list[dict]) -> None:
+        """
+        Удаляет из отложенных взятые в тик записи и откладывает
+        необработанные комментарии по шардам их курсов.
+        Args:
+            taken (dict[int | None, int]): Шард -> сколько записей взято.
+            remaining (list[dict]): Необработанные комментарии.
+        """
+        by_shard: dict[int | None, list[dict]] = {}
+        for comment in remaining:
+            by_shard.setdefault(self._backlog_shard(comment['course_id']),
+                                []).append(comment)
+        await self.redis_service.checkpoint_tick_backlog(taken, by_shard)
+    
+    def note_tick_event(self, event: str) -> None:
+        """
+        Учитывает проблему тика (переполнение, перенос, пропуск, ошибку);
+        владельцам о ней сообщит _report_tick_events.
+        Args:
+            event (str): Ключ TICK_EVENT_NAMES.
+        """
+        metrics.inc('tick_events_total', event=event)
+        self._tick_events[event] += 1
+    
+    async def _report_tick_events(self) -> None:
+        """
+        Сообщает владельцам о накопленных проблемах тиков — не чаще раза за
+        TICK_ALERT_TTL на все реплики.
+        """
+        if not self._tick_events:
+            return
+        if not await self.redis_service.claim_owner_alert('tick',
+                                                          ttl=TICK_ALERT_TTL):
+            return
+        
+        text = '⚠️ Проблемы тиков проверки комментариев:\n' + '\n'.join(
+            f'• {TICK_EVENT_NAMES.get(event, event)}: {count}' for
+            event, count in self._tick_events.items())
+        self._tick_events.clear()
+        for user_id in self.owners:
+            try:
+                await self.bot.send_message(chat_id=user_id, text=text)
+                await asyncio.sleep(0.3)
+            except (TelegramBadRequest, TelegramForbiddenError):
+                pass
+    
+    @staticmethod
+    def _export_prefilter_stats(profanity_filter: ProfanityFilter) -> None:
+        """Доли уровней предфильтра (в т.ч. попаданий в кэш) — в gauges."""
+        pre_classifier = profanity_filter.pre_classifier
+        total = sum(pre_classifier.stats.values())
+        for tier, count in pre_classifier.stats.items():
+            metrics.set('prefilter_tier_ratio', count / total, tier=tier)
+        metrics.set('prefilter_cache_size', pre_classifier.cached_count)
+    
+    async def _confirm_pending(self,
+                               toxicity_filter: RussianToxicityClassifier,
+                               all_users: set[int]) -> None:
+        """
+        Досматривает моделью комментарии, отложенные, пока она загружалась.
+        Подтверждённые токсичные удаляются (если включено remove_toxic), о
+        них уведомляются пользователи.
+        Если модель так и не загрузилась, решение ProfanityFilter по ним
+        окончательное.
+        Args:
+            toxicity_filter (RussianToxicityClassifier): Классификатор.
+            all_users (set[int]): Получатели уведомлений.
+        """
+        model_unavailable = self._model_unavailable(toxicity_filter)
+        if not model_unavailable and not toxicity_filter.is_ready:
+            return
+        pending: list[dict] = await self.redis_service.pop_pending_toxicity()
+        if not pending:
+            return
         
+        flag_remove_comment = await self.redis_service.get_remove_toxic_flag()
+        if model_unavailable:
+            # Модель так и не загрузилась: решение ProfanityFilter
+            # окончательное, как без модели
+            results = [{'is_toxic': True} for _ in pending]
+            confirmed_by = '🛡 Модель недоступна, по ProfanityFilter'
+        else:
+            results = await toxicity_filter.batch_predict(
+                [entry['text'].lower() for entry in pending],
+                threshold=TOXICITY_THRESHOLD)
+            confirmed_by = '🤖 Подтверждено моделью'
+        for entry, result in zip(pending, results):
+            if not result.get('is_toxic'):
+                continue
+            
+            metrics.inc('toxicity_pending_confirmed_total')
+            comment_id = entry['comment_id']
+            if flag_remove_comment:
+                await self.stepik_client.delete_comment(comment_id)
+            
+            text = (f'{"🚨 Удалено! 🚨" if flag_remove_comment else "🚨 Удалить! 🚨"}\n'
+                    f'{confirmed_by}\n'
+                    f'<b>{entry["course_title"]}</b>\n'
+                    f'🔗 <a href="{entry["link"]}">Comment ID'
+                    f'[{comment_id}]</a>')
+            logger_tasks.warning(f'Pending comment confirmed: {comment_id=}')
+            for user_id in all_users:
+                try:
+                    await self.bot.send_message(
+                        chat_id=user_id, text=text,
+                        link_preview_options=LinkPreviewOptions(
+                            is_disabled=True))
+                    await asyncio.sleep(0.3)
+                except (TelegramBadRequest, TelegramForbiddenError):
+                    pass
+    
+    async def _check_comments(self,
+                              profanity_filter: ProfanityFilter,
+                              toxicity_filter: RussianToxicityClassifier,
+                              deadline: float = float('inf')):
         all_comments = []
         stepik_courses_ids: list[
             int] = await self.redis_service.get_courses_ids()
@@ -40,10 +243,57 @@ class StepikTasks:
             logger_tasks.info('Нет активных курсов')
             return
         
+        if self.coordinator:
+            stepik_courses_ids = self.coordinator.owned_courses(
+                stepik_courses_ids)
+            if not stepik_courses_ids:
+                logger_tasks.info('Нет курсов в шардах этой реплики')
+                return
+        
+        # Водяные знаки и расписания всех курсов — одним запросом
+        courses_state: dict[int, dict[str, str | None]] = await (
+            self.redis_service.get_courses_state(stepik_courses_ids))
+        schedules: dict[int, CourseSchedule | None] = {
+            course_id: CourseSchedule.from_redis(state) for course_id, state in
+            courses_state.items()}
+        due_courses_ids: list[int] = self.polling.due(schedules)
+        metrics.set('poll_courses_due', len(due_courses_ids))
+        
         redis_tg_users: list[int] = await self.redis_service.get_tg_users_ids()
         all_users: set[int] = set(self.owners + redis_tg_users)
         
-        for course_id in stepik_courses_ids:
+        await self._confirm_pending(toxicity_filter, all_users)
+        
+        # Комментарии, не обработанные прошлым тиком, — первыми. Из Redis
+        # они удаляются только после обработки (_checkpoint_backlog)
+        backlog_taken: dict[int | None, int] = {}
+        backlog: list[dict] = []
+        shards = (sorted(self.coordinator.owned_shards) if self.coordinator
+                  else [None])
+        for shard, comments in (
+            await self.redis_service.get_tick_backlog(shards)).items():
+            backlog_taken[shard] = len(comments)
+            backlog.extend(comments)
+        if backlog:
+            logger_tasks.info(f'Из прошлого тика: {len(backlog)} комментов')
+            all_comments.extend(backlog)
+        
+        if not due_courses_ids and not backlog:
+            logger_tasks.debug('Нет курсов, которые пора опрашивать')
+            return
+        
+        # Новые водяные знаки и расписания — одной записью в конце
+        courses_updates: dict[int, dict[str, str]] = {}
+        
+        for position, course_id in enumerate(due_courses_ids):
+            if time.monotonic() > deadline:
+                # Расписание не обновлено — курсы останутся просроченными и
+                # будут опрошены первыми в следующем тике
+                logger_tasks.warning(
+                    f'Tick budget exceeded, {len(due_courses_ids) - position}'
+                    f' courses postponed')
+                self.note_tick_event('carryover')
+                break
             try:
                 logger_tasks.debug(f'Поиск в {course_id=}')
                 
@@ -63,13 +313,8 @@ class StepikTasks:
                     f' error: {e}')
                 
                 # антиспам уведомлений на 7 минут
-                key = f'notify_skip_course:{course_id}'
-                already_notified = await self.stepik_client.redis_client.get(key)
-                
-                if not already_notified:
-                    await self.stepik_client.redis_client.set(
-                        key, '1', ex=420)
-                    
+                if await self.redis_service.claim_skip_notification(
+                    course_id, ttl=420):
                     text = (f'⚠️ Пропущен курс ID: {course_id}\n'
                             f'Причина: сетевая ошибка/таймаут.')
                     
@@ -86,10 +331,8 @@ class StepikTasks:
                 logger_tasks.error(
                     f'Skip course {course_id} due to network'
                     f' error: {e}')
-                key = f'notify_skip_course:{course_id}'
-                already_notified = await self.stepik_client.redis_client.get(key)
-                if not already_notified:
-                    await self.stepik_client.redis_client.set(key, '1', ex=450)
+                if await self.redis_service.claim_skip_notification(
+                    course_id, ttl=450):
                     text = (f'⚠️ Пропущен курс ID: {course_id}\n'
                             f'Причина: внутренняя ошибка.\n'
                             f'Обратитесь к разработчику.')
@@ -103,18 +346,19 @@ class StepikTasks:
                 
                 continue
             
-            redis_key = f'{course_id}:time_last_comment'
-            time_last_comment_str = await self.stepik_client.redis_client.get(
-                redis_key)
+            time_last_comment_str = courses_state[course_id].get(
+                RedisService.COURSE_LAST_COMMENT_TIME)
             
             if time_last_comment_str is None:
-                time_last_comment = datetime.now() - timedelta(hours=2)
+                time_last_comment = datetime.now() - timedelta(
+                    seconds=self.polling.first_lookback)
             else:
                 try:
                     time_last_comment: datetime = datetime.strptime(
                         time_last_comment_str, '%Y-%m-%dT%H:%M:%SZ')
                 except ValueError:
-                    time_last_comment = datetime.now() - timedelta(hours=2)
+                    time_last_comment = datetime.now() - timedelta(
+                        seconds=self.polling.first_lookback)
             
             course_comments = comments_data.get("comments", [])
             new_comments = []
@@ -122,8 +366,10 @@ class StepikTasks:
             
             for comment in course_comments:
                 comment_time_str = comment.get("time")
-                comment.update(
-                    {'course_title': course_title, 'course_id': course_id})
+                # Страница может быть закэширована клиентом (ответ 304) —
+                # её комментарии не изменяем
+                comment = {**comment, 'course_title': course_title,
+                           'course_id': course_id}
                 if not comment_time_str:
                     continue
                 
@@ -137,220 +383,307 @@ class StepikTasks:
                     else:
                         break
             
+            schedule = self.polling.update(schedules[course_id],
+                                           len(new_comments))
+            metrics.observe('poll_interval_seconds',
+                            schedule.next_poll_at - schedule.last_poll_at,
+                            buckets=POLL_INTERVAL_BUCKETS)
+            courses_updates[course_id] = schedule.to_redis()
             if new_comments:
                 all_comments.extend(new_comments)
-                # write last time on comment to redis
-                await self.stepik_client.redis_client.set(
-                    name=f'{course_id}:time_last_comment',
-                    value=max_comments_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
+                courses_updates[course_id][
+                    RedisService.COURSE_LAST_COMMENT_TIME] = (
+                    max_comments_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
         
-        logger_tasks.info(f"Найдено {len(all_comments)} новых комментов")
+        await self.redis_service.update_courses_state(courses_updates)
         
-        users_url = 'https://stepik.org/users/'
+        new_comments_count = len(all_comments) - len(backlog)
+        logger_tasks.info(f"Найдено {new_comments_count} новых комментов")
+        metrics.inc('comments_total', new_comments_count)
+        metrics.observe('tick_comments', new_comments_count,
+                        buckets=COUNT_BUCKETS)
         
-        for comment in all_comments:
-            # logger_tasks.debug(f'Data: {comment=}')
-            
-            user_stepik_id: int = comment.get('user')
-            # logger_tasks.debug(f'{user_stepik_id=}')
-            
-            user = await self.stepik_client.get_user(user_id=user_stepik_id)
-            if not user:
-                user = {
-                    'full_name': 'Unknown',
-                    'reputation': '?',
-                    'solved_steps_count': '?',
-                    'reputation_rank': '?'}
-            logger_tasks.debug(f'{user=}')
-            
-            link_to_user_profile: str = f'{users_url}{user_stepik_id}/profile'
-            course_title: str = comment.get('course_title')
-            course_id = comment.get('course_id')
-            
-            link_to_course: str = await self.stepik_client.get_link_to_course(
-                course_id=course_id)
-            
-            comment_id = comment.get('id')
-            
-            section_position, lesson_position, step_position = await (
-                self.stepik_client.get_comment_context(comment_id))
-            
-            lesson_position = f'{section_position}.{lesson_position}'
-            
-            link_to_comment: str = await self.stepik_client.get_comment_url(
-                comment_id=comment_id)
-            
-            comment_text = await clean_html_tags(comment.get('text'))
-            user_name = user.get('full_name')
-            reputation: int | str = user.get('reputation')
-            count_steps: int | str = user.get('solved_steps_count')
-            comment_time = datetime.strptime(
-                comment.get('time'), '%Y-%m-%dT%H:%M:%SZ')
+        position = 0
+        try:
+            # Весь тик проверяется ProfanityFilter одной пачкой вне event loop
+            comment_texts: list[str] = [
+                clean_html_tags(comment.get('text')) for comment in
+                all_comments]
+            profanity_verdicts: list[ProfanityVerdict] = await (
+                profanity_filter.check_many(comment_texts))
             
-            full_user_info = (f'<b><a href="{link_to_course}"'
-                              f'>{course_title}</a></b>\n'
-                              f'🧑‍🎓 <a href="{link_to_user_profile}">'
-                              f' {user_name}</a>\n'
-                              f'<b>Progress:</b> {count_steps}\n'
-                              f'<b>Reputation:</b> {reputation}\n'
-                              f'🕘 <b>Comment time</b>: {comment_time}UTC\n'
-                              f'🔗 <a href="{link_to_comment}">Comment ID'
-                              f'[{comment_id}]</a>\n'
-                              f'({lesson_position} шаг {step_position})\n\n'
-                              f'{comment_text}')
-            
-            middle_user_info = (f'<b><a href="{link_to_course}"'
-                                f'>{course_title}</a></b>\n'
-                                f'🧑‍🎓 <a href="{link_to_user_profile}">'
-                                f' {user_name}</a>\n'
-                                f'🔗 <a href="{link_to_comment}">Comment ID'
-                                f'[{comment_id}]</a>\n'
-                                f'({lesson_position} шаг {step_position})\n\n'
-                                f'{comment_text}')
-            
-            light_user_info = (f'<b>{course_title}</b>\n'
-                               f'🧑‍🎓 <a href="{link_to_user_profile}">'
-                               f' {user_name}</a>\n'
-                               f'🔗 <a href="{link_to_comment}">Comment ID'
-                               f'[{comment_id}]</a>\n\n'
-                               f'{comment_text}')
+            for position, (comment, comment_text,
+                           profanity_verdict) in enumerate(
+                zip(all_comments, comment_texts, profanity_verdicts)):
+                if time.monotonic() > deadline:
+                    carried = len(all_comments) - position
+                    metrics.inc('tick_carried_comments_total', carried)
+                    self.note_tick_event('carryover')
+                    logger_tasks.warning(
+                        f'Tick budget exceeded, {carried} comments carried'
+                        f' over to the next tick')
+                    break
+                try:
+                    await self._process_comment(comment, comment_text,
+                                                profanity_verdict,
+                                                toxicity_filter, all_users)
+                except Exception as e:
+                    # Ошибочный комментарий не откладывается: иначе он
+                    # вставал бы в начало очереди каждого следующего тика
+                    metrics.inc('comment_errors_total')
+                    logger_tasks.error(
+                        f'Skip comment {comment.get("id")} due to'
+                        f' error: {e!r}')
+            else:
+                position = len(all_comments)
+        finally:
+            # Необработанное (по бюджету, ошибке или остановке) — в отложенные,
+            # взятые из них записи удаляются только теперь
+            await self._checkpoint_backlog(backlog_taken,
+                                           all_comments[position:])
+    
+    async def _process_comment(self,
+                               comment: dict[str, Any],
+                               comment_text: str,
+                               profanity_verdict: ProfanityVerdict,
+                               toxicity_filter: RussianToxicityClassifier,
+                               all_users: set[int]) -> None:
+        """
+        Обогащает комментарий данными Stepik, применяет политику модерации
+        и рассылает уведомления.
+        """
+        users_url = 'https://stepik.org/users/'
+        
+        # logger_tasks.debug(f'Data: {comment=}')
+        
+        user_stepik_id: int = comment.get('user')
+        # logger_tasks.debug(f'{user_stepik_id=}')
+        
+        user = await self.stepik_client.get_user(user_id=user_stepik_id)
+        if not user:
+            user = {
+                'full_name': 'Unknown',
+                'reputation': '?',
+                'solved_steps_count': '?',
+                'reputation_rank': '?'}
+        logger_tasks.debug(f'{user=}')
+        
+        link_to_user_profile: str = f'{users_url}{user_stepik_id}/profile'
+        course_title: str = comment.get('course_title')
+        course_id = comment.get('course_id')
+        
+        link_to_course: str = await self.stepik_client.get_link_to_course(
+            course_id=course_id)
+        
+        comment_id = comment.get('id')
+        
+        section_position, lesson_position, step_position = await (
+            self.stepik_client.get_comment_context(comment_id))
+        
+        lesson_position = f'{section_position}.{lesson_position}'
+        
+        link_to_comment: str = await self.stepik_client.get_comment_url(
+            comment_id=comment_id)
+        
+        user_name = user.get('full_name')
+        reputation: int | str = user.get('reputation')
+        count_steps: int | str = user.get('solved_steps_count')
+        comment_time = datetime.strptime(
+            comment.get('time'), '%Y-%m-%dT%H:%M:%SZ')
+        
+        full_user_info = (f'<b><a href="{link_to_course}"'
+                          f'>{course_title}</a></b>\n'
+                          f'🧑‍🎓 <a href="{link_to_user_profile}">'
+                          f' {user_name}</a>\n'
+                          f'<b>Progress:</b> {count_steps}\n'
+                          f'<b>Reputation:</b> {reputation}\n'
+                          f'🕘 <b>Comment time</b>: {comment_time}UTC\n'
+                          f'🔗 <a href="{link_to_comment}">Comment ID'
+                          f'[{comment_id}]</a>\n'
+                          f'({lesson_position} шаг {step_position})\n\n'
+                          f'{comment_text}')
+        
+        middle_user_info = (f'<b><a href="{link_to_course}"'
+                            f'>{course_title}</a></b>\n'
+                            f'🧑‍🎓 <a href="{link_to_user_profile}">'
+                            f' {user_name}</a>\n'
+                            f'🔗 <a href="{link_to_comment}">Comment ID'
+                            f'[{comment_id}]</a>\n'
+                            f'({lesson_position} шаг {step_position})\n\n'
+                            f'{comment_text}')
+        
+        light_user_info = (f'<b>{course_title}</b>\n'
+                           f'🧑‍🎓 <a href="{link_to_user_profile}">'
+                           f' {user_name}</a>\n'
+                           f'🔗 <a href="{link_to_comment}">Comment ID'
+                           f'[{comment_id}]</a>\n\n'
+                           f'{comment_text}')
+        
+        result_profanity_filter: bool = profanity_verdict.is_profane
+        logger_tasks.info(f'{profanity_verdict=}')
+        
+        text_solution = 'Решение ⚪\n'
+        text_comment_low = 'Комментарий 🟡\n'
+        text_comment_high = 'Комментарий 🟢\n'
+        text_remove = f'🚨 Удалено! 🚨\n' if \
+            (await self.redis_service.get_msgs_settings())[
+                'remove_toxic'] else f'🚨 Удалить! 🚨\n'
+        text_pending = '⏳ Ожидает проверки моделью ⏳\n'
+        
+        flag_low_comment: bool = (len(set(comment_text)) <= 2) or (len(
+            comment_text) <= 3)
+        
+        flag_solution_comment: bool = 'thread=solutions' in link_to_comment
+        if not flag_solution_comment:
+            res_text: str = (text_comment_high, text_comment_low)[
+                flag_low_comment]
+        else:
+            res_text: str = text_solution
+        
+        lpw_options = LinkPreviewOptions(is_disabled=True)
+        have_avatar = await self.stepik_client.check_user_avatar(
+            user_stepik_id)
+        
+        comment_statuses: list[str] = []
+        if 'Решение' in res_text:
+            comment_statuses.append('solution')
+        if not flag_low_comment:
+            comment_statuses.append('informative')
+            if have_avatar:
+                lpw_options = LinkPreviewOptions(
+                    is_disabled=False, url=link_to_user_profile)
+        else:
+            comment_statuses.append('uninformative')
+            light_user_info = res_text + light_user_info
+        
+        # Без модели срабатывание ProfanityFilter окончательное
+        needs_model: bool = (
+            result_profanity_filter and
+            not self._model_unavailable(toxicity_filter) and
+            self._needs_model(profanity_verdict, comment_text))
+        
+        if needs_model and not toxicity_filter.is_ready:
+            # Модель ещё загружается: уведомляем без удаления, а проверку
+            # моделью откладываем до готовности (_confirm_pending)
+            await self.redis_service.push_pending_toxicity(
+                {'comment_id': comment_id,
+                 'text': comment_text,
+                 'link': link_to_comment,
+                 'course_title': course_title})
+            full_user_info = text_pending + middle_user_info
+            comment_statuses.append('pending')
+            metrics.inc('toxicity_pending_queued_total')
+            logger_tasks.info(
+                f'Model is not ready, {comment_id=} queued for check')
+        elif needs_model:
+            result_toxicity_classifier = await toxicity_filter.predict(
+                comment_text.lower(), threshold=TOXICITY_THRESHOLD)
+            logger_tasks.info(f'{result_toxicity_classifier=}')
             
-            result_profanity_filter: bool = await profanity_filter.is_profanity(
-                text=comment_text)
-            logger_tasks.info(f'{result_profanity_filter=}')
+            if result_toxicity_classifier.get('is_toxic'):
+                full_user_info = text_remove + full_user_info
+                comment_statuses.append('toxic')
+                logger_tasks.warning(f'Toxicity filter: {full_user_info}')
+            else:
+                full_user_info = res_text + middle_user_info
+                logger_tasks.debug(f'{full_user_info}')
+        elif result_profanity_filter:
+            full_user_info = text_remove + full_user_info
+            comment_statuses.append('toxic')
+            logger_tasks.warning(
+                f'Profanity filter [{profanity_verdict.rule}/'
+                f'{profanity_verdict.strength}]: {full_user_info}')
+        else:
+            full_user_info = res_text + middle_user_info
+        
+        # Режем длинные сообщения до отправки, чтобы не тратить запросы
+        # к Bot API на заведомый "message is too long"
+        msg_parts: list[str] = fit_html_message(
+            light_user_info if flag_low_comment else full_user_info,
+            link=link_to_comment)
+        
+        flag_remove_comment = await self.redis_service.get_remove_toxic_flag()
+        if 'toxic' in comment_statuses and flag_remove_comment:
+            await self.stepik_client.delete_comment(comment_id)
+        
+        for user in all_users:
+            # Пропускаем отправку, если пользователь не зарегистрирован в Redis
+            if not await self.redis_service.check_user(user):
+                logger_tasks.warning(
+                    f"Skip notify tg_id={user} - user not found in Redis")
+                continue
+
+            # Если у пользователя активно любое FSM-состояние — пропускаем отправку
+            try:
+                if self.storage is not None:
+                    key = StorageKey(
+                        bot_id=self.bot.id, chat_id=user, user_id=user)
+                    state = await self.storage.get_state(key)
+                    if state:
+                        logger_tasks.info(
+                            f"Skip notify tg_id={user} due to active FSM state: {state}")
+                        continue
+            except Exception as e:
+                logger_tasks.debug(
+                    f"FSM state check failed for tg_id={user}: {e}")
             
-            text_solution = 'Решение ⚪\n'
-            text_comment_low = 'Комментарий 🟡\n'
-            text_comment_high = 'Комментарий 🟢\n'
-            text_remove = f'🚨 Удалено! 🚨\n' if \
-                (await self.redis_service.get_msgs_settings())[
-                    'remove_toxic'] else f'🚨 Удалить! 🚨\n'
+            user_notifications: dict[str, bool] = await (
+                self.redis_service.get_user_notif(tg_user_id=user))
             
-            flag_low_comment: bool = (len(set(comment_text)) <= 2) or (len(
-                comment_text) <= 3)
+            # Skip toxic comments
+            if 'toxic' in comment_statuses:
+                pass
             
-            flag_solution_comment: bool = 'thread=solutions' in link_to_comment
-            if not flag_solution_comment:
-                res_text: str = (text_comment_high, text_comment_low)[
-                    flag_low_comment]
+            # Check notification settings for solutions
+            if 'solution' in comment_statuses:
+                if not user_notifications.get('is_notif_solution', True):
+                    continue
             else:
-                res_text: str = text_solution
+                # For non-solution comments, check uninformative flag
+                if 'informative' not in comment_statuses and not user_notifications.get(
+                    'is_notif_uninformative', True):
+                    continue
             
-            lpw_options = LinkPreviewOptions(is_disabled=True)
-            have_avatar = await self.stepik_client.check_user_avatar(
-                user_stepik_id)
+            comment_data = await self.stepik_client.get_comment_data(
+                comment_id)
+            target = comment_data['comments'][0].get('target')
             
-            comment_statuses: list[str] = []
-            if 'Решение' in res_text:
-                comment_statuses.append('solution')
-            if not flag_low_comment:
-                comment_statuses.append('informative')
-                if have_avatar:
-                    lpw_options = LinkPreviewOptions(
-                        is_disabled=False, url=link_to_user_profile)
+            if target and isinstance(target, str) and target.startswith(
+                'step-'):
+                step_id = int(target.split('-')[1])
             else:
-                comment_statuses.append('uninformative')
-                light_user_info = res_text + light_user_info
+                # Иначе используем target как есть (должен быть числом)
+                step_id = int(target) if target else None
             
-            if result_profanity_filter and len(comment_text) >= 12:
-                result_toxicity_classifier = await toxicity_filter.predict(
-                    comment_text.lower(), threshold=0.82)
-                logger_tasks.info(f'{result_toxicity_classifier=}')
-                
-                if result_toxicity_classifier.get('is_toxic'):
-                    full_user_info = text_remove + full_user_info
-                    comment_statuses.append('toxic')
-                    logger_tasks.warning(f'Toxicity filter: {full_user_info}')
-                else:
-                    full_user_info = res_text + middle_user_info
-                    logger_tasks.debug(f'{full_user_info}')
-            elif result_profanity_filter:
-                full_user_info = text_remove + full_user_info
-                comment_statuses.append('toxic')
-                logger_tasks.warning(f'Profanity filter: {full_user_info}')
-            else:
-                full_user_info = res_text + middle_user_info
+            if not step_id:
+                logger_tasks.error(
+                    f"Не удалось определить ID шага для комментария {comment_id}")
+                continue
             
-            flag_remove_comment = await self.redis_service.get_remove_toxic_flag()
-            if 'toxic' in comment_statuses and flag_remove_comment:
-                await self.stepik_client.delete_comment(comment_id)
+            # if user == 632745189:
+            #     await self.stepik_client.reply_to_comment(
+            #         step_id=step_id,
+            #         parent_id=comment_id,
+            #         text=f'{comment_id}\n'
+            #              f'Auto-Answer AI 🤖')
             
-            for user in all_users:
-                # Пропускаем отправку, если пользователь не зарегистрирован в Redis
-                if not await self.redis_service.check_user(user):
-                    logger_tasks.warning(
-                        f"Skip notify tg_id={user} - user not found in Redis")
-                    continue
-
-                # Если у пользователя активно любое FSM-состояние — пропускаем отправку
-                try:
-                    if self.storage is not None:
-                        key = StorageKey(
-                            bot_id=self.bot.id, chat_id=user, user_id=user)
-                        state = await self.storage.get_state(key)
-                        if state:
-                            logger_tasks.info(
-                                f"Skip notify tg_id={user} due to active FSM state: {state}")
-                            continue
-                except Exception as e:
-                    logger_tasks.debug(
-                        f"FSM state check failed for tg_id={user}: {e}")
-                
-                user_notifications: dict[str, bool] = await (
-                    self.redis_service.get_user_notif(tg_user_id=user))
-                
-                # Skip toxic comments
-                if 'toxic' in comment_statuses:
-                    pass
-                
-                # Check notification settings for solutions
-                if 'solution' in comment_statuses:
-                    if not user_notifications.get('is_notif_solution', True):
-                        continue
-                else:
-                    # For non-solution comments, check uninformative flag
-                    if 'informative' not in comment_statuses and not user_notifications.get(
-                        'is_notif_uninformative', True):
-                        continue
-                
-                comment_data = await self.stepik_client.get_comment_data(
-                    comment_id)
-                target = comment_data['comments'][0].get('target')
-                
-                if target and isinstance(target, str) and target.startswith(
-                    'step-'):
-                    step_id = int(target.split('-')[1])
-                else:
-                    # Иначе используем target как есть (должен быть числом)
-                    step_id = int(target) if target else None
-                
-                if not step_id:
-                    logger_tasks.error(
-                        f"Не удалось определить ID шага для комментария {comment_id}")
-                    continue
-                
-                # if user == 632745189:
-                #     await self.stepik_client.reply_to_comment(
-                #         step_id=step_id,
-                #         parent_id=comment_id,
-                #         text=f'{comment_id}\n'
-                #              f'Auto-Answer AI 🤖')
-                
-                try:
+            try:
+                for num, msg_part in enumerate(msg_parts):
                     await self.bot.send_message(
-                        link_preview_options=lpw_options,
+                        link_preview_options=lpw_options if not num else
+                        LinkPreviewOptions(is_disabled=True),
                         chat_id=user,
-                        text=light_user_info if flag_low_comment else full_user_info)
+                        text=msg_part)
                     await asyncio.sleep(0.5)
+            
+            except TelegramBadRequest as err:
                 
-                except TelegramBadRequest as err:
-                    
-                    if 'chat not found' in err.message.lower():
-                        logger_tasks.warning(
-                            f'Chat not found for: tg_id={user}')
-                    elif 'message is too long' in err.message.lower():
-                        logger_tasks.warning(
-                            f'Message too long for: tg_id={user}')
-                
-                except TelegramForbiddenError as err:
-                    logger_tasks.warning(f'Forbidden for tg_id={user}: {err}')
+                if 'chat not found' in err.message.lower():
+                    logger_tasks.warning(
+                        f'Chat not found for: tg_id={user}')
+                elif 'message is too long' in err.message.lower():
+                    logger_tasks.warning(
+                        f'Message too long for: tg_id={user}')
+            
+            except TelegramForbiddenError as err:
+                logger_tasks.warning(f'Forbidden for tg_id={user}: {err}')
@@ -0,0 +1,242 @@
+"""
+Бенчмарк ProfanityFilter и RussianToxicityClassifier.
+
+Прогоняет настоящие фильтры из filters/ по TestCases.test_cases и
+синтетическому корпусу комментариев Stepik (короткие благодарности,
+вставки кода, длинные тексты), печатает p50/p95 задержки по стадиям и
+пропускную способность и сохраняет результат в JSON для сравнения
+между запусками.
+
+Запуск из корня проекта:
+    python -m tests.bench_filters --save bench_baseline.json
+    python -m tests.bench_filters --compare bench_baseline.json
+    python -m tests.bench_filters --skip-model  # без transformers
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from filters.filters import ProfanityFilter
+from tests.tests_cases import TestCases
+from utils.utils import clean_html_tags
+
+SEED = 20240501
+SYNTHETIC_SIZE = 600
+REPEAT = 3
+MODEL_NAME = "SkolkovoInstitute/russian_toxicity_classifier"
+# Допустимый рост p95 / падение пропускной способности при сравнении
+DEFAULT_TOLERANCE = 0.25
+
+THANKS = ('Спасибо!', 'Спасибо за курс', 'Всё понятно, спасибо',
+          'Отличное объяснение 👍', 'Класс!', 'Thanks', 'Супер, разобрался',
+          'Благодарю', 'Лучший курс', '+1')
+QUESTION_WORDS = ('почему', 'не', 'понимаю', 'как', 'решить', 'задачу',
+                  'ошибка', 'в', 'тесте', 'номер', 'вывод', 'не', 'совпадает',
+                  'подскажите', 'пожалуйста', 'что', 'я', 'делаю', 'так',
+                  'условие', 'непонятное', 'список', 'строка', 'функция')
+RANT_WORDS = ('курс', 'ужасный', 'автор', 'вообще', 'ничего', 'не',
+              'объясняет', 'задачи', 'бред', 'трачу', 'время', 'зря',
+              'проверка', 'тупая', 'бесит', 'кошмар', 'никто', 'отвечает')
+CODE_SNIPPETS = (
+    'for i in range(n):\n    print(i)',
+    'def solve(a, b):\n    return a + b',
+    "s = input().split()\nprint(' '.join(reversed(s)))",
+    'class Node:\n    def __init__(self, val):\n        self.val = val',
+    'x = [int(i) for i in input().split()]\nprint(sum(x) / len(x))',
+    'while True:\n    line = input()\n    if line == &quot;end&quot;:\n'
+    '        break')
+
+
+def synthetic_comment(rnd: random.Random) -> str:
+    """Генерирует комментарий в HTML-виде, как его отдаёт Stepik."""
+    kind = rnd.choices(('thanks', 'question', 'code', 'rant'),
+                       weights=(4, 3, 2, 1))[0]
+    if kind == 'thanks':
+        return f'<p>{rnd.choice(THANKS)}</p>'
+    if kind == 'question':
+        words = rnd.choices(QUESTION_WORDS, k=rnd.randint(5, 25))
+        return f'<p>{" ".join(words).capitalize()}?</p>'
+    if kind == 'code':
+        words = rnd.choices(QUESTION_WORDS, k=rnd.randint(3, 10))
+        return (f'<p>{" ".join(words)}:</p>'
+                f'<pre><code>{rnd.choice(CODE_SNIPPETS)}</code></pre>')
+    paragraphs = [' '.join(rnd.choices(RANT_WORDS, k=rnd.randint(20, 60)))
+                  for _ in range(rnd.randint(2, 6))]
+    return ''.join(f'<p>{paragraph}</p>' for paragraph in paragraphs)
+
+
+def build_corpus(size: int = SYNTHETIC_SIZE, seed: int = SEED) -> list[str]:
+    """Тестовые случаи + синтетические комментарии (уже очищенные от HTML)."""
+    rnd = random.Random(seed)
+    corpus = [comment for comment, _ in TestCases.test_cases]
+    corpus += [clean_html_tags(synthetic_comment(rnd)) for _ in range(size)]
+    return corpus
+
+
+def summarize(latencies: list[float], wall_time: float) -> dict:
+    """Сводка по стадии: задержки в мс и пропускная способность."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    def percentile(q: float) -> float:
+        return ordered[min(count - 1, int(q * count))] * 1000
+
+    return {
+        'count': count,
+        'p50_ms': round(percentile(0.50), 4),
+        'p95_ms': round(percentile(0.95), 4),
+        'max_ms': round(ordered[-1] * 1000, 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'throughput_per_s': round(count / wall_time, 2) if wall_time else 0.0}
+
+
+async def measure(func, texts: list[str], repeat: int = REPEAT) -> dict:
+    """Прогоняет корпус repeat раз и возвращает лучший по p95 прогон."""
+    runs = []
+    for _ in range(repeat):
+        latencies = []
+        start = time.perf_counter()
+        for text in texts:
+            t0 = time.perf_counter()
+            await func(text)
+            latencies.append(time.perf_counter() - t0)
+        runs.append(summarize(latencies, time.perf_counter() - start))
+    return min(runs, key=lambda run: run['p95_ms'])
+
+
+async def run_benchmark(corpus: list[str], skip_model: bool = False,
+                        repeat: int = REPEAT) -> dict:
+    stages: dict[str, dict] = {}
+
+    start = time.perf_counter()
+    profanity_filter = ProfanityFilter()
+    stages['profanity_init'] = {
+        'time_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+    async def prefilter(text: str):
+        return profanity_filter.pre_classifier.classify(text)
+
+    stages['prefilter'] = await measure(prefilter, corpus, repeat)
+    async def rules(text: str):
+        return profanity_filter._check_profanity(text)
+
+    # Полная проверка без предфильтра — худший случай для каждого текста
+    stages['profanity_rules'] = await measure(rules, corpus, repeat)
+    # Проверка как в боте; кэш чистых текстов отключён, чтобы повторный
+    # прогон не мерил только попадания в кэш
+    profanity_filter.pre_classifier.cache_size = 0
+    stages['profanity_check'] = await measure(
+        profanity_filter.check, corpus, repeat)
+
+    # Весь корпус одной пачкой, как в тике
+    start = time.perf_counter()
+    await profanity_filter.check_many(corpus)
+    stages['profanity_check_many'] = {
+        'time_ms': round((time.perf_counter() - start) * 1000, 2)}
+    profanity_filter.close()
+
+    if not skip_model:
+        from filters.toxicity_classifiers import RussianToxicityClassifier
+
+        classifier = RussianToxicityClassifier([MODEL_NAME])
+        start = time.perf_counter()
+        await classifier.initialize()
+        stages['model_init'] = {
+            'time_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+        async def predict(text: str):
+            return await classifier.predict(text.lower(), threshold=0.82)
+
+        # Модель медленная, её прогоняем один раз
+        stages['model_predict'] = await measure(predict, corpus, 1)
+
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'corpus_size': len(corpus),
+        'seed': SEED,
+        'repeat': repeat,
+        'stages': stages}
+
+
+def print_report(result: dict) -> None:
+    print(f"Корпус: {result['corpus_size']} текстов, "
+          f"Python {result['python']} ({result['machine']})")
+    for stage, data in result['stages'].items():
+        if 'time_ms' in data:
+            print(f'{stage:<16} {data["time_ms"]:>10.2f} ms')
+            continue
+        print(f'{stage:<16} p50={data["p50_ms"]:.3f} ms '
+              f'p95={data["p95_ms"]:.3f} ms max={data["max_ms"]:.3f} ms '
+              f'{data["throughput_per_s"]:.1f} текст/с')
+
+
+def compare(result: dict, baseline: dict,
+            tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Сравнивает результат с эталоном.
+    Returns:
+        list[str]: Описания регрессий (пустой список — регрессий нет).
+    """
+    regressions = []
+    for stage, old in baseline.get('stages', {}).items():
+        new = result['stages'].get(stage)
+        if not new or 'p95_ms' not in old:
+            continue
+        if new['p95_ms'] > old['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{stage}: p95 {old["p95_ms"]:.3f} -> {new["p95_ms"]:.3f} ms')
+        if new['throughput_per_s'] < old['throughput_per_s'] * (1 - tolerance):
+            regressions.append(
+                f'{stage}: throughput {old["throughput_per_s"]:.1f} -> '
+                f'{new["throughput_per_s"]:.1f} текст/с')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк ProfanityFilter и RussianToxicityClassifier')
+    parser.add_argument('--size', type=int, default=SYNTHETIC_SIZE,
+                        help='Число синтетических комментариев')
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+                        help='Число прогонов корпуса (берётся лучший)')
+    parser.add_argument('--skip-model', action='store_true',
+                        help='Не загружать модель токсичности')
+    parser.add_argument('--save', type=Path,
+                        help='Сохранить результат как JSON-эталон')
+    parser.add_argument('--compare', type=Path,
+                        help='Сравнить с сохранённым JSON-эталоном')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Допустимое ухудшение (доля), по умолчанию 0.25')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    result = asyncio.run(run_benchmark(
+        corpus, skip_model=args.skip_model, repeat=args.repeat))
+    print_report(result)
+
+    if args.save:
+        args.save.write_text(
+            json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f'Эталон сохранён: {args.save}')
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print('Регрессии относительно эталона:')
+            print('\n'.join(f'  {line}' for line in regressions))
+            return 1
+        print('Регрессий относительно эталона нет')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Сквозной бенчмарк одного тика check_comments.
+
+Поднимает локальные FakeStepik и FakeTelegram (tests/fake_servers.py),
+заполняет отдельную БД Redis курсами и подписчиками и прогоняет
+StepikTasks.check_comments с настоящими ProfanityFilter и
+RussianToxicityClassifier. Печатает время тика, число запросов к Stepik и
+Bot API по эндпоинтам и число команд Redis (по INFO commandstats).
+
+Нужен запущенный Redis; используемая БД (--redis-db) очищается.
+
+Запуск из корня проекта:
+    python -m tests.bench_tick --courses 20 --comments 30 --subscribers 5
+    python -m tests.bench_tick --stepik-latency 0.05 --stepik-error-rate 0.02
+    python -m tests.bench_tick --skip-model --json tick.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+from redis.asyncio import Redis
+
+from filters.filters import ProfanityFilter
+from middlewares.metrics import BotApiMetricsMiddleware
+from tasks.tasks import POLICY_FLAG, StepikTasks
+from tests.fake_servers import FakeStepik, FakeTelegram, ServerConfig
+from utils.metrics import metrics
+from utils.redis_service import RedisService
+from utils.stepik import StepikAPIClient
+
+MODEL_NAME = "SkolkovoInstitute/russian_toxicity_classifier"
+BOT_TOKEN = '123456:FAKE-TOKEN'
+
+
+async def redis_command_stats(redis: Redis) -> dict[str, int]:
+    """Счётчики вызовов команд Redis (cmdstat_* из INFO commandstats)."""
+    stats = await redis.info('commandstats')
+    return {name.removeprefix('cmdstat_'): data['calls']
+            for name, data in stats.items()}
+
+
+def counters_diff(before: dict[str, int], after: dict[str, int]
+                  ) -> dict[str, int]:
+    diff = {name: calls - before.get(name, 0) for name, calls in after.items()}
+    return dict(sorted(((name, calls) for name, calls in diff.items()
+                        if calls > 0), key=lambda item: -item[1]))
+
+
+async def seed_redis(redis_service: RedisService, courses: int,
+                     subscribers: int) -> list[int]:
+    """Добавляет курсы и подписчиков, возвращает их Telegram ID."""
+    await redis_service.redis.sadd(
+        redis_service.STEPIK_IDS_SET,
+        *[str(course_id) for course_id in range(1, courses + 1)])
+    tg_ids = [100000 + num for num in range(subscribers)]
+    for tg_id in tg_ids:
+        await redis_service.add_user(tg_id)
+    await redis_service.update_msgs_settings(remove_toxic_flag=False)
+    return tg_ids
+
+
+async def run_tick(args: argparse.Namespace) -> dict:
+    stepik = FakeStepik(
+        config=ServerConfig(latency=args.stepik_latency,
+                            jitter=args.stepik_latency / 2,
+                            error_rate=args.stepik_error_rate, seed=args.seed),
+        courses=args.courses,
+        comments_per_course=args.comments,
+        lessons_per_course=args.lessons,
+        users=args.users)
+    telegram = FakeTelegram(
+        config=ServerConfig(latency=args.tg_latency,
+                            error_rate=args.tg_error_rate, seed=args.seed))
+    await stepik.start()
+    await telegram.start()
+
+    redis = Redis.from_url(args.redis_url, db=args.redis_db,
+                           decode_responses=True)
+    bot = Bot(token=BOT_TOKEN,
+              session=AiohttpSession(
+                  api=TelegramAPIServer.from_base(telegram.url)),
+              default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(BotApiMetricsMiddleware())
+    profanity_filter = None
+    try:
+        await redis.flushdb()
+        stepik_client = StepikAPIClient(
+            client_id='fake', client_secret='fake', redis_client=redis,
+            base_url=stepik.url)
+        redis_service = RedisService(redis=redis, stepik_client=stepik_client)
+        await seed_redis(redis_service, args.courses, args.subscribers)
+
+        profanity_filter = ProfanityFilter()
+        stepik_tasks = StepikTasks(
+            bot=bot, stepik_client=stepik_client,
+            redis_service=redis_service, owners=[])
+
+        toxicity_filter = None
+        if args.skip_model:
+            # Все срабатывания ProfanityFilter помечаются без модели
+            stepik_tasks.toxicity_policy = dict.fromkeys(
+                stepik_tasks.toxicity_policy, POLICY_FLAG)
+        else:
+            from filters.toxicity_classifiers import RussianToxicityClassifier
+            toxicity_filter = RussianToxicityClassifier([MODEL_NAME])
+            await toxicity_filter.initialize()
+
+        stepik.reset_counters()
+        telegram.reset_counters()
+        redis_before = await redis_command_stats(redis)
+        metrics_before = metrics.snapshot()
+
+        # Ошибка внутри тика — тоже результат: фиксируем её, а не падаем
+        tick_error = None
+        start = time.perf_counter()
+        try:
+            await stepik_tasks.check_comments(
+                profanity_filter, toxicity_filter)
+        except Exception as err:
+            tick_error = f'{type(err).__name__}: {err}'
+        tick_time = time.perf_counter() - start
+
+        redis_after = await redis_command_stats(redis)
+        # Сам INFO тоже попадает в счётчик
+        redis_after['info'] = redis_after.get('info', 1) - 1
+    finally:
+        if profanity_filter:
+            profanity_filter.close()
+        await bot.session.close()
+        await redis.aclose()
+        await stepik.stop()
+        await telegram.stop()
+
+    redis_calls = counters_diff(redis_before, redis_after)
+    return {
+        'params': {
+            'courses': args.courses, 'comments_per_course': args.comments,
+            'subscribers': args.subscribers, 'lessons': args.lessons,
+            'stepik_latency': args.stepik_latency,
+            'stepik_error_rate': args.stepik_error_rate,
+            'tg_latency': args.tg_latency,
+            'tg_error_rate': args.tg_error_rate,
+            'model': not args.skip_model},
+        'tick_time_s': round(tick_time, 3),
+        'tick_error': tick_error,
+        'messages_sent': len(telegram.messages),
+        'stepik_calls': dict(stepik.calls.most_common()),
+        'stepik_errors': dict(stepik.errors),
+        'stepik_calls_total': sum(stepik.calls.values()),
+        'telegram_calls': dict(telegram.calls.most_common()),
+        'telegram_errors': dict(telegram.errors),
+        'telegram_calls_total': sum(telegram.calls.values()),
+        'redis_commands': redis_calls,
+        'redis_commands_total': sum(redis_calls.values()),
+        'metrics_summary': metrics.format_summary(since=metrics_before)}
+
+
+def print_report(result: dict) -> None:
+    params = result['params']
+    print(f"Курсов: {params['courses']}, комментариев на курс: "
+          f"{params['comments_per_course']}, подписчиков: "
+          f"{params['subscribers']}")
+    print(f"Время тика: {result['tick_time_s']:.3f} s, "
+          f"отправлено сообщений: {result['messages_sent']}")
+    if result['tick_error']:
+        print(f"Тик прерван: {result['tick_error']}")
+    for title, key in (('Stepik API', 'stepik_calls'),
+                       ('Bot API', 'telegram_calls'),
+                       ('Redis', 'redis_commands')):
+        total = sum(result[key].values())
+        print(f'\n{title}: {total} вызовов')
+        for name, calls in result[key].items():
+            print(f'  {name:<32} {calls}')
+    print(f"\nМетрики тика:\n{result['metrics_summary']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк тика check_comments на фейковых API')
+    parser.add_argument('--courses', type=int, default=5)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев на курс')
+    parser.add_argument('--lessons', type=int, default=10,
+                        help='Уроков на курс')
+    parser.add_argument('--users', type=int, default=50,
+                        help='Пользователей Stepik (авторов комментариев)')
+    parser.add_argument('--subscribers', type=int, default=3,
+                        help='Подписчиков бота')
+    parser.add_argument('--stepik-latency', type=float, default=0.0)
+    parser.add_argument('--stepik-error-rate', type=float, default=0.0)
+    parser.add_argument('--tg-latency', type=float, default=0.0)
+    parser.add_argument('--tg-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--redis-url', default='redis://localhost:6379')
+    parser.add_argument('--redis-db', type=int, default=15,
+                        help='БД Redis для бенчмарка (будет очищена)')
+    parser.add_argument('--skip-model', action='store_true',
+                        help='Не загружать модель токсичности')
+    parser.add_argument('--json', type=Path,
+                        help='Сохранить результат в JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run_tick(args))
+    print_report(result)
+    if args.json:
+        args.json.write_text(
+            json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 1 if result['tick_error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
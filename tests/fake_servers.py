@@ -0,0 +1,323 @@
+"""
+Локальные фейковые Stepik API и Telegram Bot API для бенчмарков.
+
+FakeStepik отдаёт детерминированные курсы, комментарии, шаги, уроки и
+пользователей в том формате, который ожидает StepikAPIClient. FakeTelegram
+отвечает на методы Bot API так, как это делает api.telegram.org, и
+подключается к aiogram через TelegramAPIServer.from_base.
+
+У обоих серверов настраиваются задержка, доля ошибок и размеры данных,
+а все запросы считаются по эндпоинтам.
+"""
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+STEPIK_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+COMMENT_TEXTS = (
+    '<p>Спасибо за курс!</p>',
+    '<p>Не понимаю, почему тест не проходит</p>',
+    '<p>Вот мой код:</p><pre><code>for i in range(n):\n    print(i)'
+    '</code></pre>',
+    '<p>Подскажите, что не так с условием задачи?</p>',
+    '<p>+</p>',
+    '<p>Курс ужасный, автор ничего не объясняет, задачи бред</p>' * 3)
+
+
+@dataclass
+class ServerConfig:
+    """
+    Настройки поведения фейкового сервера.
+
+    Attributes:
+        latency (float): Средняя задержка ответа, с.
+        jitter (float): Разброс задержки (равномерный, ± jitter), с.
+        error_rate (float): Доля запросов, на которые сервер отвечает ошибкой.
+        seed (int): Seed генератора задержек и ошибок.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class FakeServer(ABC):
+    """Общая часть фейковых серверов: запуск, задержки, ошибки, счётчики."""
+    config: ServerConfig = field(default_factory=ServerConfig)
+    calls: Counter = field(default_factory=Counter, init=False)
+    errors: Counter = field(default_factory=Counter, init=False)
+    not_modified: Counter = field(default_factory=Counter, init=False)
+    url: str = field(default='', init=False)
+    _runner: web.AppRunner | None = field(default=None, init=False)
+
+    def __post_init__(self):
+        self._rnd = random.Random(self.config.seed)
+
+    @abstractmethod
+    def build_app(self) -> web.Application:
+        """Приложение aiohttp с маршрутами сервера."""
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Запускает сервер и возвращает его базовый URL."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets
+        self.url = f'http://{host}:{sockets[0].getsockname()[1]}'
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _delay(self) -> None:
+        latency = self.config.latency
+        if self.config.jitter:
+            latency += self._rnd.uniform(-self.config.jitter,
+                                         self.config.jitter)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    def _should_fail(self) -> bool:
+        return self._rnd.random() < self.config.error_rate
+
+    def reset_counters(self) -> None:
+        self.calls.clear()
+        self.errors.clear()
+        self.not_modified.clear()
+
+
+@dataclass
+class FakeStepik(FakeServer):
+    """
+    Фейковый Stepik API: oauth2/token, comments, courses, users, steps,
+    units, sections.
+
+    Каждому курсу принадлежит один модуль с lessons_per_course уроками по
+    одному шагу; комментарии курса равномерно распределены по шагам, самые
+    свежие — в пределах последнего часа (бот берёт комментарии не старше
+    двух часов).
+
+    Attributes:
+        courses (int): Число курсов; их ID — 1..courses.
+        comments_per_course (int): Комментариев на курс.
+        lessons_per_course (int): Уроков (и шагов) на курс.
+        users (int): Число пользователей Stepik, авторов комментариев.
+        avatar_rate (float): Доля пользователей с собственной аватаркой.
+    """
+    courses: int = 5
+    comments_per_course: int = 20
+    lessons_per_course: int = 10
+    users: int = 50
+    avatar_rate: float = 0.5
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._build_data()
+
+    # --- данные ---
+    def _build_data(self) -> None:
+        rnd = random.Random(self.config.seed)
+        now = datetime.now(timezone.utc)
+        self.course_comments: dict[int, list[dict]] = {}
+        self.comments: dict[int, dict] = {}
+        self.steps: dict[int, dict] = {}
+        self.units: dict[int, dict] = {}
+        self.sections: dict[int, dict] = {}
+
+        for course_id in range(1, self.courses + 1):
+            section_id = course_id
+            unit_ids = []
+            for position in range(1, self.lessons_per_course + 1):
+                object_id = course_id * 10000 + position
+                unit_ids.append(object_id)
+                self.units[object_id] = {
+                    'id': object_id, 'section': section_id,
+                    'lesson': object_id, 'position': position}
+                self.steps[object_id] = {
+                    'id': object_id, 'lesson': object_id, 'position': 1,
+                    'unit': object_id,
+                    'block': {'text': f'<p>Шаг {object_id}</p>'}}
+            self.sections[section_id] = {
+                'id': section_id, 'position': 1, 'units': unit_ids}
+
+            comments = []
+            for num in range(self.comments_per_course):
+                comment_id = course_id * 1000000 + num
+                step_id = unit_ids[num % len(unit_ids)]
+                comment_time = now - timedelta(
+                    seconds=30 + num * 3600 // max(self.comments_per_course, 1))
+                comment = {
+                    'id': comment_id,
+                    'user': rnd.randint(1, self.users),
+                    'text': rnd.choice(COMMENT_TEXTS),
+                    'time': comment_time.strftime(STEPIK_TIME_FORMAT),
+                    'target': step_id,
+                    'parent': None,
+                    'thread': rnd.choice(('default', 'default', 'solutions'))}
+                comments.append(comment)
+                self.comments[comment_id] = comment
+            self.course_comments[course_id] = comments
+
+        self.users_data = {
+            user_id: {
+                'id': user_id,
+                'full_name': f'Student {user_id}',
+                'avatar': ('https://cdn.stepik.net/media/users/a.png'
+                           if rnd.random() < self.avatar_rate else
+                           'https://stepik.org/users/default.png'),
+                'reputation': rnd.randint(0, 500),
+                'solved_steps_count': rnd.randint(0, 1000)}
+            for user_id in range(1, self.users + 1)}
+
+    # --- сервер ---
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post('/oauth2/token/', self.token)
+        app.router.add_get('/api/comments', self.list_comments)
+        app.router.add_post('/api/comments', self.create_comment)
+        app.router.add_get('/api/comments/{id}', self.get_comment)
+        app.router.add_delete('/api/comments/{id}', self.delete_comment)
+        app.router.add_get('/api/courses/{id}', self.get_course)
+        app.router.add_get('/api/users/{id}', self.get_user)
+        app.router.add_get('/api/steps/{id}', self.get_step)
+        app.router.add_get('/api/units', self.list_units)
+        app.router.add_get('/api/units/{id}', self.get_unit)
+        app.router.add_get('/api/sections/{id}', self.get_section)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        endpoint = (f'{request.method} '
+                    f'{resource.canonical if resource else request.path}')
+        self.calls[endpoint] += 1
+        await self._delay()
+        if request.path != '/oauth2/token/' and self._should_fail():
+            self.errors[endpoint] += 1
+            return web.json_response({'detail': 'Fake error'}, status=503)
+        response = await handler(request)
+        if request.method != 'GET' or response.status != 200:
+            return response
+        # ETag по содержимому: на совпадающий If-None-Match — 304 без тела
+        etag = f'"{hashlib.md5(response.body).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified[endpoint] += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        response.headers['ETag'] = etag
+        return response
+
+    @staticmethod
+    def _object_id(request: web.Request) -> int:
+        return int(request.match_info['id'])
+
+    async def token(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {'access_token': 'fake-token', 'expires_in': 36000})
+
+    async def list_comments(self, request: web.Request) -> web.Response:
+        course_id = int(request.query.get('course', 0))
+        page_size = int(request.query.get('page_size', 20))
+        comments = self.course_comments.get(course_id, [])[:page_size]
+        return web.json_response({'comments': comments})
+
+    async def create_comment(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        return web.json_response({'comments': [payload.get('comment')]},
+                                 status=201)
+
+    async def get_comment(self, request: web.Request) -> web.Response:
+        comment = self.comments.get(self._object_id(request))
+        if not comment:
+            return web.json_response({'detail': 'Not found'}, status=404)
+        return web.json_response({'comments': [comment]})
+
+    async def delete_comment(self, request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    async def get_course(self, request: web.Request) -> web.Response:
+        course_id = self._object_id(request)
+        if not 1 <= course_id <= self.courses:
+            return web.json_response({'detail': 'Not found'}, status=404)
+        return web.json_response({'courses': [{
+            'id': course_id,
+            'title': f'Курс {course_id}',
+            'canonical_url': f'https://stepik.org/course/{course_id}',
+            'sections': [course_id]}]})
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        user = self.users_data.get(self._object_id(request))
+        return web.json_response({'users': [user] if user else []})
+
+    async def get_step(self, request: web.Request) -> web.Response:
+        step = self.steps.get(self._object_id(request))
+        return web.json_response({'steps': [step] if step else []})
+
+    async def list_units(self, request: web.Request) -> web.Response:
+        unit = self.units.get(int(request.query.get('lesson', 0)))
+        return web.json_response({'units': [unit] if unit else []})
+
+    async def get_unit(self, request: web.Request) -> web.Response:
+        unit = self.units.get(self._object_id(request))
+        return web.json_response({'units': [unit] if unit else []})
+
+    async def get_section(self, request: web.Request) -> web.Response:
+        section = self.sections.get(self._object_id(request))
+        return web.json_response({'sections': [section] if section else []})
+
+
+@dataclass
+class FakeTelegram(FakeServer):
+    """
+    Фейковый Telegram Bot API (/bot<token>/<method>).
+
+    На sendMessage отвечает отправленным сообщением, на остальные методы —
+    True. При срабатывании error_rate отвечает 400 "chat not found", как
+    Telegram для недоступного чата.
+    """
+    messages: list[dict] = field(default_factory=list, init=False)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls[method] += 1
+        await self._delay()
+        data = await request.post()
+
+        if self._should_fail():
+            self.errors[method] += 1
+            return web.json_response({
+                'ok': False, 'error_code': 400,
+                'description': 'Bad Request: chat not found'}, status=400)
+
+        if method == 'sendMessage':
+            message = {
+                'message_id': len(self.messages) + 1,
+                'date': int(time.time()),
+                'chat': {'id': int(data.get('chat_id', 0)),
+                         'type': 'private'},
+                'text': data.get('text', '')}
+            self.messages.append(message)
+            return web.json_response({'ok': True, 'result': message})
+
+        if method == 'getMe':
+            return web.json_response({'ok': True, 'result': {
+                'id': 123456, 'is_bot': True, 'first_name': 'FakeBot',
+                'username': 'fake_bot'}})
+
+        return web.json_response({'ok': True, 'result': True})
@@ -0,0 +1,45 @@
+"""
+Тестовая БД Redis для тестов, которым нужен Redis.
+
+Адрес — из TEST_REDIS_URL (по умолчанию БД 15 локального Redis, как у
+bench_tick); БД очищается перед каждым тестом. Если Redis недоступен, тест
+идёт на fakeredis в памяти процесса (Lua-скрипты — с пакетом lupa), а без
+fakeredis помечается пропущенным через pytest.skip.
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+TEST_REDIS_URL = os.environ.get('TEST_REDIS_URL', 'redis://localhost:6379/15')
+
+
+def skip_without_redis(reason: str) -> None:
+    """Помечает тест пропущенным (под pytest) — не пройденным."""
+    import pytest
+    pytest.skip(f'Redis недоступен ({TEST_REDIS_URL}): {reason}')
+
+
+def _fake_redis() -> Redis:
+    try:
+        from fakeredis import FakeAsyncRedis
+    except ImportError:
+        skip_without_redis('fakeredis не установлен')
+    return FakeAsyncRedis(decode_responses=True)
+
+
+@asynccontextmanager
+async def open_test_redis() -> AsyncIterator[Redis]:
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    try:
+        await redis.ping()
+    except (RedisConnectionError, OSError):
+        await redis.aclose()
+        redis = _fake_redis()
+    try:
+        await redis.flushdb()
+        yield redis
+    finally:
+        await redis.aclose()
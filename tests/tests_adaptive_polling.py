@@ -0,0 +1,63 @@
+import random
+
+from tasks.adaptive_polling import AdaptivePolling, CourseSchedule
+
+NOW = 1_700_000_000.0
+
+
+def test_due() -> None:
+    schedules = {
+        1: None,
+        2: CourseSchedule(rate=1.0, last_poll_at=NOW - 60,
+                          next_poll_at=NOW - 1),
+        3: CourseSchedule(rate=0.0, last_poll_at=NOW - 60,
+                          next_poll_at=NOW + 600)}
+    assert AdaptivePolling.due(schedules, now=NOW) == [1, 2]
+
+
+def test_update_bounds() -> None:
+    polling = AdaptivePolling(min_interval=60, max_interval=900,
+                              target_comments=20, jitter=0.2)
+    random.seed(47)
+    quiet = active = full = None
+    for step in range(20):
+        now = NOW + step * 60
+        quiet = polling.update(quiet, 0, now=now)
+        active = polling.update(active, 10, now=now)
+        full = polling.update(full, polling.page_size, now=now)
+        for schedule in (quiet, active, full):
+            interval = schedule.next_poll_at - schedule.last_poll_at
+            assert 60 <= interval <= 900
+
+    # Тихий курс — около максимального интервала, заполненная страница —
+    # ровно минимальный
+    assert 720 <= quiet.next_poll_at - quiet.last_poll_at <= 900
+    assert full.next_poll_at - full.last_poll_at == 60
+    # 10 комментариев в минуту при цели 20 — около 2 минут (±jitter);
+    # первое наблюдение — за окно first_lookback, его вес уже исчез
+    assert abs(active.rate - 10) < 0.05
+    assert 96 <= active.next_poll_at - active.last_poll_at <= 144
+
+
+def test_first_poll_uses_lookback() -> None:
+    polling = AdaptivePolling(min_interval=60, max_interval=900,
+                              target_comments=20, jitter=0.0)
+    # 24 комментария за двухчасовое окно — 0.2 в минуту, а не 24
+    first = polling.update(None, 24, now=NOW)
+    assert abs(first.rate - 0.2) < 1e-9
+    assert first.next_poll_at - first.last_poll_at == 900
+
+
+def test_schedule_redis_roundtrip() -> None:
+    schedule = CourseSchedule(rate=0.25, last_poll_at=NOW,
+                              next_poll_at=NOW + 300)
+    assert CourseSchedule.from_redis(schedule.to_redis()) == schedule
+    assert CourseSchedule.from_redis({'poll_rate': None}) is None
+
+
+if __name__ == "__main__":
+    test_due()
+    test_update_bounds()
+    test_first_poll_uses_lookback()
+    test_schedule_redis_roundtrip()
+    print('Адаптивный опрос курсов: OK')
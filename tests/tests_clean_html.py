@@ -0,0 +1,136 @@
+import html
+import random
+import re
+import time
+
+from utils.utils import clean_html_tags
+
+SEED = 20240501
+ITERATIONS = 5000
+
+WORDS = ('Спасибо', 'за', 'курс', 'не', 'понимаю', 'почему', 'ошибка',
+         'print', 'list', 'Hello', 'world', 'x', '42', '3.14', 'a+b', 'ёжик')
+ENTITIES = ('&lt;', '&gt;', '&amp;', '&quot;', '&#39;', '&nbsp;', '&#1071;',
+            '&#x41;', '&copy;', '&amp', '&unknown;')
+SPACES = (' ', '  ', '\n', '\t', '\n\n', ' \n ', '\xa0')
+TAGS = ('<p>', '</p>', '<br>', '<br/>', '<b>', '</b>', '<i>', '</i>',
+        '<span class="x">', '</span>', '<a href="https://stepik.org/">',
+        '</a>', '<code>', '</code>', '<pre>', '</pre>', '<div>', '</div>')
+CODE_LINES = ('for i in range(10):', '    print(i)', 'if a &lt; b:',
+              'x = &quot;str&quot;', 'a &amp;&amp; b', '', '    return x')
+SYMBOLS = ('"', "'", '&', '<', '>', ' < ', ' > ', '=', '(', ')', '*', '@',
+           '—')
+
+
+def clean_html_tags_reference(raw_html: str) -> str:
+    """Прежняя (многопроходная) реализация clean_html_tags — эталон."""
+    if not raw_html:
+        return ""
+
+    code_blocks = {}
+
+    def save_code(match):
+        block_id = f"__CODE_BLOCK_{len(code_blocks)}__"
+        code_blocks[block_id] = match.group(0)
+        return block_id
+
+    pattern = re.compile(r'<pre><code>(.*?)</code></pre>', re.DOTALL)
+    temp_text = pattern.sub(save_code, raw_html)
+
+    clean_text = re.sub(r'<[^>]+>', '', temp_text)
+
+    for block_id, code_block in code_blocks.items():
+        clean_text = clean_text.replace(block_id, code_block)
+
+    clean_text = html.unescape(clean_text)
+
+    parts = re.split(
+        r'(<pre><code>.*?</code></pre>)',
+        clean_text,
+        flags=re.DOTALL)
+    for i in range(len(parts)):
+        if not parts[i].startswith('<pre><code>'):
+            parts[i] = (
+                parts[i].replace('&', '&amp;').replace('<', '&lt;').replace(
+                    '>',
+                    '&gt;').replace('"', '&quot;'))
+
+    clean_text = ''.join(parts)
+
+    parts = re.split(
+        r'(<pre><code>.*?</code></pre>)',
+        clean_text,
+        flags=re.DOTALL)
+    for i in range(
+        0,
+        len(parts),
+        2):
+        if i < len(parts):
+            parts[i] = re.sub(r'\s+', ' ', parts[i]).strip()
+
+    return ''.join(parts)
+
+
+def random_code_block(rnd: random.Random) -> str:
+    lines = [rnd.choice(CODE_LINES) for _ in range(rnd.randint(0, 6))]
+    return '<pre><code>' + '\n'.join(lines) + '</code></pre>'
+
+
+def random_comment(rnd: random.Random) -> str:
+    """
+    Генерирует комментарий в том виде, в котором его отдаёт Stepik, плюс
+    неэкранированные '<' и '>' в тексте (в том числе перед блоками кода).
+    """
+    generators = (
+        (lambda: rnd.choice(WORDS), 10),
+        (lambda: rnd.choice(SPACES), 8),
+        (lambda: rnd.choice(ENTITIES), 3),
+        (lambda: rnd.choice(TAGS), 4),
+        (lambda: rnd.choice(SYMBOLS), 2),
+        (lambda: random_code_block(rnd), 1))
+    funcs, weights = zip(*generators)
+    chunks = [rnd.choices(funcs, weights)[0]()
+              for _ in range(rnd.randint(0, 60))]
+    return ''.join(chunks)
+
+
+def test_clean_html_tags_equivalence(iterations: int = ITERATIONS,
+                                     seed: int = SEED) -> None:
+    rnd = random.Random(seed)
+    cases = ['', 'просто текст', '<p>Спасибо!</p>',
+             '<p>a</p><pre><code>x &lt; y</code></pre><p>b</p>',
+             '<pre><code>a</code></pre><pre><code>b</code></pre>',
+             '<pre><code>не закрыт', 'a &amp b &lt;pre&gt;',
+             'a < b <pre><code>x</code></pre>',
+             'a < b <pre><code>x > y</code></pre> c > d',
+             'a < b <pre><code>x</code></pre> <pre><code>y']
+    cases += [random_comment(rnd) for _ in range(iterations)]
+
+    for raw_html in cases:
+        expected = clean_html_tags_reference(raw_html)
+        result = clean_html_tags(raw_html)
+        assert result == expected, (
+            f'Расхождение для {raw_html!r}:\n'
+            f'ожидалось {expected!r}\nполучено  {result!r}')
+
+
+def bench_clean_html_tags(repeat: int = 200) -> None:
+    rnd = random.Random(SEED)
+    big_comment = ('<p>Не работает код, помогите:</p>'
+                   + ''.join(random_code_block(rnd) for _ in range(50))
+                   + '<p>' + ' '.join(WORDS) * 50 + '</p>')
+
+    for name, func in (('reference', clean_html_tags_reference),
+                       ('single-pass', clean_html_tags)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(big_comment)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f'{name:<12}: {elapsed:.3f} ms на комментарий '
+              f'({len(big_comment)} символов)')
+
+
+if __name__ == "__main__":
+    test_clean_html_tags_equivalence()
+    print(f'Эквивалентность: {ITERATIONS} случайных комментариев — OK')
+    bench_clean_html_tags()
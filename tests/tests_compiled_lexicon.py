@@ -0,0 +1,75 @@
+import tempfile
+from pathlib import Path
+
+from filters.compiled_lexicon import (BAD_WORDS_PATH, TECHNICAL_WORDS_PATH,
+                                      compile_lexicon, get_lexicon,
+                                      get_morph_analyzer, load_lexicon,
+                                      save_lexicon, source_hash)
+from filters.filters import ProfanityFilter
+
+SOURCE_HASH = source_hash(BAD_WORDS_PATH, TECHNICAL_WORDS_PATH)
+
+
+def lexeme_hit(word: str, bad_words: frozenset[str]) -> bool:
+    """Обход лексем pymorphy3, как в ProfanityFilter._is_bad_word."""
+    for parsed in get_morph_analyzer().parse(word):
+        if parsed.normal_form in bad_words:
+            return True
+        if any(form.word in bad_words for form in parsed.lexeme):
+            return True
+    return False
+
+
+def test_artifact_round_trip() -> None:
+    lexicon = compile_lexicon()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'lexicon.pkl'
+        save_lexicon(lexicon, path)
+        loaded = load_lexicon(SOURCE_HASH, path)
+        assert loaded is not None
+        assert loaded.bad_words == lexicon.bad_words
+        assert loaded.tech_keywords == lexicon.tech_keywords
+        assert loaded.bad_word_forms == lexicon.bad_word_forms
+        assert loaded.char_map == lexicon.char_map
+        assert loaded.fuzzy_index == lexicon.fuzzy_index
+        assert ([str(word) for word in loaded.censor_wordset] ==
+                [str(word) for word in lexicon.censor_wordset])
+
+        # Другие исходники — артефакт устарел
+        assert load_lexicon('stale', path) is None
+        assert load_lexicon(SOURCE_HASH, Path(tmp) / 'missing.pkl') is None
+        # get_lexicon собирает и сохраняет артефакт, если его нет
+        other = Path(tmp) / 'other.pkl'
+        assert get_lexicon(path=other).bad_words == lexicon.bad_words
+        assert load_lexicon(SOURCE_HASH, other) is not None
+
+
+def test_forms_and_lexeme_walk() -> None:
+    """
+    bad_word_forms и обход лексем не покрывают друг друга, поэтому
+    _is_bad_word проверяет и то и другое.
+    """
+    lexicon = compile_lexicon()
+    assert 'хуёво' in lexicon.bad_word_forms
+    assert not lexeme_hit('хуёво', lexicon.bad_words)
+    assert 'сволоченный' not in lexicon.bad_word_forms
+    assert lexeme_hit('сволоченный', lexicon.bad_words)
+
+    profanity_filter = ProfanityFilter(
+        executor=ProfanityFilter.EXECUTOR_INLINE)
+    try:
+        # _is_bad_word сверяет нормализованное слово (сс -> с и т.п.)
+        words = [word for word in (*lexicon.bad_word_forms, 'сволоченный')
+                 if profanity_filter._normalize_text(word) == word]
+        missed = [word for word in words
+                  if not profanity_filter._is_bad_word(word)]
+        assert not missed, missed[:10]
+        assert profanity_filter._is_bad_word('программист') is None
+    finally:
+        profanity_filter.close()
+
+
+if __name__ == "__main__":
+    test_artifact_round_trip()
+    test_forms_and_lexeme_walk()
+    print('Скомпилированные словари: OK')
@@ -0,0 +1,43 @@
+from collections import Counter
+
+from utils.coordination import shard_of, shard_owner
+
+SHARD_COUNT = 64
+
+
+def test_shard_of_is_stable() -> None:
+    shards = [shard_of(course_id, SHARD_COUNT) for course_id in range(1000)]
+    assert shards == [shard_of(course_id, SHARD_COUNT) for course_id in
+        range(1000)]
+    assert set(shards) == set(range(SHARD_COUNT))
+
+
+def test_shard_owner_balance() -> None:
+    instances = [f'bot-{i}:1:abcdef' for i in range(4)]
+    owners = Counter(shard_owner(shard, instances) for shard in
+        range(SHARD_COUNT))
+    assert set(owners) == set(instances)
+    assert max(owners.values()) <= SHARD_COUNT // 2
+
+
+def test_shard_owner_minimal_movement() -> None:
+    instances = [f'bot-{i}:1:abcdef' for i in range(4)]
+    before = {shard: shard_owner(shard, instances) for shard in
+        range(SHARD_COUNT)}
+    dead = instances[1]
+    after = {shard: shard_owner(shard, instances[:1] + instances[2:]) for
+        shard in range(SHARD_COUNT)}
+
+    # Переезжают только шарды ушедшей реплики
+    for shard in range(SHARD_COUNT):
+        if before[shard] != dead:
+            assert after[shard] == before[shard]
+        else:
+            assert after[shard] != dead
+
+
+if __name__ == "__main__":
+    test_shard_of_is_stable()
+    test_shard_owner_balance()
+    test_shard_owner_minimal_movement()
+    print('Координация реплик: OK')
@@ -0,0 +1,137 @@
+import html
+import random
+import re
+
+from utils.utils import (TG_MESSAGE_LIMIT, fit_html_message,
+                         html_text_length, split_html_message,
+                         truncate_html_message)
+
+SEED = 20240502
+ITERATIONS = 300
+
+WORDS = ('Спасибо', 'за', 'курс', 'print(i)', 'Hello', 'ёжик', '😀', '👍🏽',
+         '𝔘𝔫𝔦', 'x', '42', '\n', 'a' * 50)
+ENTITIES = ('&lt;', '&gt;', '&amp;', '&quot;', '&#39;', '&#x1F600;')
+TAGS = ('b', 'i', 'u', 's', 'code', 'pre', 'tg-spoiler')
+LINK = 'https://stepik.org/lesson/1/step/2?discussion=3'
+
+_TAG_RE = re.compile(r'<(/?)([a-zA-Z][\w-]*)[^>]*>')
+_AMP_RE = re.compile(r'&(?!(?:#\d+|#[xX][0-9a-fA-F]+|\w+);)')
+
+
+def random_html(rnd: random.Random, size: int) -> str:
+    """Случайный HTML с вложенными тегами, сущностями и эмодзи."""
+    chunks: list[str] = []
+    stack: list[str] = []
+    while html_text_length(''.join(chunks)) < size:
+        roll = rnd.random()
+        if roll < 0.1 and len(stack) < 3:
+            tag = rnd.choice(TAGS)
+            stack.append(tag)
+            chunks.append(f'<{tag}>')
+        elif roll < 0.15 and len(stack) < 3:
+            stack.append('a')
+            chunks.append(f'<a href="{LINK}">')
+        elif roll < 0.25 and stack:
+            chunks.append(f'</{stack.pop()}>')
+        elif roll < 0.35:
+            chunks.append(rnd.choice(ENTITIES))
+        else:
+            chunks.append(rnd.choice(WORDS) + ' ')
+    chunks += [f'</{tag}>' for tag in reversed(stack)]
+    return ''.join(chunks)
+
+
+def visible_text(text: str) -> str:
+    return html.unescape(_TAG_RE.sub('', text))
+
+
+def assert_valid_part(part: str, limit: int) -> None:
+    assert html_text_length(part) <= limit, html_text_length(part)
+    # Длина в UTF-16: эмодзи вне BMP — две единицы
+    assert len(visible_text(part).encode('utf-16-le')) // 2 <= limit
+
+    stack: list[str] = []
+    for match in _TAG_RE.finditer(part):
+        tag = match.group(2).lower()
+        if match.group(1):
+            assert stack and stack[-1] == tag, (part, tag)
+            stack.pop()
+        else:
+            stack.append(tag)
+    assert not stack, (part, stack)
+
+    # Каждый & — начало целой сущности
+    assert not _AMP_RE.search(part), part
+
+
+def test_split_random() -> None:
+    rnd = random.Random(SEED)
+    for _ in range(ITERATIONS):
+        limit = rnd.choice((20, 50, 100, 333))
+        text = random_html(rnd, rnd.randint(1, limit * 4))
+        parts = split_html_message(text, limit)
+        for part in parts:
+            assert_valid_part(part, limit)
+        # Текст не теряется и не дублируется
+        assert ''.join(map(visible_text, parts)) == visible_text(text)
+
+
+def test_split_telegram_limit() -> None:
+    # Эмодзи вне BMP: 3000 символов — 6000 единиц UTF-16, две части
+    text = '<b>' + '😀' * 3000 + '</b>'
+    parts = split_html_message(text)
+    assert len(parts) == 2
+    for part in parts:
+        assert_valid_part(part, TG_MESSAGE_LIMIT)
+    assert visible_text(parts[0]) == '😀' * (TG_MESSAGE_LIMIT // 2)
+
+    # Сущность на границе не разрывается
+    text = 'a' * (TG_MESSAGE_LIMIT - 1) + '&lt;&gt;'
+    parts = split_html_message(text)
+    assert parts == ['a' * (TG_MESSAGE_LIMIT - 1) + '&lt;', '&gt;']
+
+    short = '<i>коротко</i>'
+    assert split_html_message(short) == [short]
+
+
+def test_truncate() -> None:
+    rnd = random.Random(SEED + 1)
+    for _ in range(ITERATIONS // 3):
+        limit = rnd.choice((60, 100, 500))
+        text = random_html(rnd, limit * 3)
+        result = truncate_html_message(text, LINK, limit)
+        assert_valid_part(result, limit)
+        assert result.endswith(f'…\n<a href="{html.escape(LINK)}">'
+                               f'Читать полностью</a>')
+        assert visible_text(text).startswith(
+            visible_text(result).removesuffix('…\nЧитать полностью'))
+
+    assert truncate_html_message('текст', LINK) == 'текст'
+
+
+def test_fit_max_parts() -> None:
+    rnd = random.Random(SEED + 2)
+    for _ in range(ITERATIONS // 3):
+        limit = rnd.choice((60, 100, 500))
+        text = random_html(rnd, limit * 6)
+        parts = fit_html_message(text, LINK, limit, max_parts=3)
+        assert len(parts) <= 3
+        for part in parts:
+            assert_valid_part(part, limit)
+        if len(split_html_message(text, limit)) > 3:
+            assert len(parts) == 3
+            assert f'<a href="{html.escape(LINK)}">' in parts[-1]
+            assert parts[-1].endswith('Читать полностью</a>')
+
+        # Без ссылки — все части, без обрезки
+        assert fit_html_message(text, None, limit) == split_html_message(
+            text, limit)
+
+
+if __name__ == "__main__":
+    test_split_random()
+    test_split_telegram_limit()
+    test_truncate()
+    test_fit_max_parts()
+    print('Разбиение HTML-сообщений: OK')
@@ -0,0 +1,44 @@
+from utils.json_codec import DECODERS, get_json_loads
+
+PAYLOAD = '{"comments": [{"id": 1, "text": "Привет"}], "meta": null}'
+
+
+def test_decoders_agree() -> None:
+    expected = {'comments': [{'id': 1, 'text': 'Привет'}], 'meta': None}
+    for name in DECODERS:
+        try:
+            loads = get_json_loads(name)
+        except ImportError:
+            continue
+        assert loads(PAYLOAD.encode()) == expected
+        assert loads(PAYLOAD) == expected
+
+
+def test_decode_error_is_value_error() -> None:
+    for name in DECODERS:
+        try:
+            loads = get_json_loads(name)
+        except ImportError:
+            continue
+        try:
+            loads(b'{"comments": [')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{name}: no ValueError')
+
+
+def test_unknown_decoder() -> None:
+    try:
+        get_json_loads('yaml')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('no ValueError')
+
+
+if __name__ == "__main__":
+    test_decoders_agree()
+    test_decode_error_is_value_error()
+    test_unknown_decoder()
+    print('Декодеры JSON: OK')
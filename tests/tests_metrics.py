@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import aiohttp
+from aiohttp import web
+
+from utils.metrics import COUNT_BUCKETS, MetricsRegistry, render_prometheus
+from utils.metrics_server import METRICS_PREFIX, build_metrics_app
+
+
+def filled_registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.inc('telegram_requests_total', method='sendMessage', result='ok')
+    registry.inc('telegram_requests_total', method='sendMessage',
+                 result='TelegramRetryAfter')
+    registry.inc('stepik_api_responses_total', 3, endpoint='comments/{id}',
+                 status=200)
+    registry.set('prefilter_tier_ratio', 0.25, tier='cache')
+    for value in (0.004, 0.02, 0.3, 700):
+        registry.observe('tick_seconds', value)
+    registry.observe('tick_comments', 7, buckets=COUNT_BUCKETS)
+    with registry.timer('profanity_stage_seconds', stage='full'):
+        pass
+    return registry
+
+
+def test_render_prometheus() -> None:
+    text = render_prometheus(filled_registry(), prefix='x_')
+    lines = text.splitlines()
+
+    assert '# TYPE x_telegram_requests_total counter' in lines
+    assert ('x_telegram_requests_total{method="sendMessage",'
+            'result="TelegramRetryAfter"} 1') in lines
+    assert ('x_stepik_api_responses_total{endpoint="comments/{id}",'
+            'status="200"} 3') in lines
+    assert '# TYPE x_prefilter_tier_ratio gauge' in lines
+    assert 'x_prefilter_tier_ratio{tier="cache"} 0.25' in lines
+
+    # Бакеты кумулятивные, +Inf равен count
+    assert '# TYPE x_tick_seconds histogram' in lines
+    assert 'x_tick_seconds_bucket{le="0.005"} 1' in lines
+    assert 'x_tick_seconds_bucket{le="0.025"} 2' in lines
+    assert 'x_tick_seconds_bucket{le="120"} 3' in lines
+    assert 'x_tick_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'x_tick_seconds_count 4' in lines
+    assert 'x_tick_comments_bucket{le="10"} 1' in lines
+    assert any(line.startswith('x_profanity_stage_seconds_count{stage="full"}')
+               for line in lines)
+
+
+def test_label_escaping() -> None:
+    registry = MetricsRegistry()
+    registry.inc('errors_total', reason='a "b"\\c\nd')
+    text = render_prometheus(registry)
+    assert 'errors_total{reason="a \\"b\\"\\\\c\\nd"} 1' in text
+
+
+def test_concurrent_updates() -> None:
+    registry = MetricsRegistry()
+    threads_count, per_thread = 8, 2000
+    stop = threading.Event()
+
+    def write() -> None:
+        for _ in range(per_thread):
+            registry.inc('ops_total', kind='a')
+            registry.observe('op_seconds', 0.01)
+            registry.set('last_op', 1.0)
+
+    def render() -> None:
+        # Рендер из снимка: реестр меняется во время рендера
+        while not stop.is_set():
+            render_prometheus(registry)
+
+    reader = threading.Thread(target=render)
+    reader.start()
+    writers = [threading.Thread(target=write) for _ in range(threads_count)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    reader.join()
+
+    snapshot = registry.snapshot()
+    total = threads_count * per_thread
+    assert snapshot.counters[('ops_total', (('kind', 'a'),))] == total
+    assert snapshot.histograms[('op_seconds', ())].count == total
+    assert f'op_seconds_count {total}' in render_prometheus(registry)
+
+
+async def scrape_local() -> str:
+    runner = web.AppRunner(build_metrics_app(filled_registry()))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                    f'http://127.0.0.1:{port}/metrics') as response:
+                assert response.status == 200
+                assert response.headers['Content-Type'].startswith(
+                    'text/plain; version=0.0.4')
+                return await response.text()
+    finally:
+        await runner.cleanup()
+
+
+def test_scrape_metrics_endpoint() -> None:
+    text = asyncio.run(scrape_local())
+    assert f'{METRICS_PREFIX}tick_seconds_count 4' in text
+    assert f'# TYPE {METRICS_PREFIX}telegram_requests_total counter' in text
+
+
+if __name__ == "__main__":
+    test_render_prometheus()
+    test_label_escaping()
+    test_concurrent_updates()
+    test_scrape_metrics_endpoint()
+    print('Метрики: OK')
@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+
+from filters.model_snapshot import (MANIFEST_NAME,
+                                    export_snapshot,
+                                    is_commit_sha,
+                                    verify_snapshot,
+                                    write_manifest)
+
+MODEL_NAME = 'SkolkovoInstitute/russian_toxicity_classifier'
+REVISION = '0123456789abcdef0123456789abcdef01234567'
+
+
+def make_snapshot(directory: Path) -> None:
+    (directory / 'config.json').write_text('{"architectures": []}')
+    (directory / 'model.safetensors').write_bytes(b'\x00weights' * 1000)
+    (directory / 'tokenizer').mkdir(exist_ok=True)
+    (directory / 'tokenizer' / 'vocab.txt').write_text('[PAD]\n[UNK]\n')
+    write_manifest(directory, MODEL_NAME, REVISION)
+
+
+def test_verify_snapshot() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        make_snapshot(directory)
+
+        manifest = verify_snapshot(directory, MODEL_NAME)
+        assert manifest is not None
+        assert manifest.revision == REVISION
+        assert set(manifest.files) == {
+            'config.json', 'model.safetensors', 'tokenizer/vocab.txt'}
+
+        # Снапшот другой модели не подходит
+        assert verify_snapshot(directory, 'other/model') is None
+
+
+def test_verify_snapshot_detects_changes() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+
+        # Нет манифеста — нет снапшота
+        assert verify_snapshot(directory) is None
+
+        make_snapshot(directory)
+        (directory / 'model.safetensors').write_bytes(b'\x00broken')
+        assert verify_snapshot(directory) is None
+
+        make_snapshot(directory)
+        (directory / 'tokenizer' / 'vocab.txt').unlink()
+        assert verify_snapshot(directory) is None
+
+        make_snapshot(directory)
+        (directory / 'extra.bin').write_bytes(b'?')
+        assert verify_snapshot(directory) is None
+
+        (directory / MANIFEST_NAME).write_text('not json')
+        assert verify_snapshot(directory) is None
+
+
+def test_revision_must_be_commit() -> None:
+    assert is_commit_sha(REVISION)
+    for revision in ('main', 'v1.0', REVISION[:7], REVISION.upper(), None):
+        assert not is_commit_sha(revision)
+        try:
+            export_snapshot(MODEL_NAME, revision)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{revision!r}: no ValueError')
+
+
+if __name__ == "__main__":
+    test_verify_snapshot()
+    test_verify_snapshot_detects_changes()
+    test_revision_must_be_commit()
+    print('Снапшот модели: OK')
@@ -0,0 +1,54 @@
+from filters.filters import ProfanityFilter
+from filters.prefilter import PreClassifier
+from tests_cases import TestCases
+
+LATIN_PROFANE = ('fuck you this course is total shit',
+                 'ty suka blyat eto kurs govno polnyi')
+
+
+def test_profane_cases_not_clean() -> None:
+    # Предфильтр не мягче полной проверки: тексты, отсеянные как чистые,
+    # полная проверка тоже пропускает (например, '(_)ка' — признаки кода)
+    pre_classifier = PreClassifier()
+    profanity_filter = ProfanityFilter(
+        executor=ProfanityFilter.EXECUTOR_INLINE)
+    for text, is_profane in TestCases.test_cases:
+        if not is_profane or pre_classifier.classify(text) is None:
+            continue
+        assert not profanity_filter._check_profanity(text), text
+
+
+def test_latin_and_translit_not_clean() -> None:
+    pre_classifier = PreClassifier()
+    for text in LATIN_PROFANE:
+        assert pre_classifier.classify(text) is None, text
+    assert pre_classifier.classify(
+        '<pre><code>x</code></pre> сука') is None
+
+
+def test_tiers() -> None:
+    pre_classifier = PreClassifier()
+    assert pre_classifier.classify('!!! ???') == 'empty'
+    assert pre_classifier.classify('print(1)') == 'code'
+    assert pre_classifier.classify('12345') == 'charset'
+    assert pre_classifier.classify('ааааа') == 'charset'
+    assert pre_classifier.classify('Спасибо за курс') is None
+
+    pre_classifier.remember_clean('Спасибо за курс')
+    assert pre_classifier.classify('Спасибо за курс') == 'cache'
+    assert pre_classifier.stats['passed'] == 1
+
+    pre_classifier = PreClassifier(cache_size=2)
+    for text in ('один', 'два', 'три'):
+        pre_classifier.remember_clean(text)
+    # Самый старый текст вытеснен
+    assert pre_classifier.cached_count == 2
+    assert pre_classifier.classify('один') is None
+    assert pre_classifier.classify('три') == 'cache'
+
+
+if __name__ == "__main__":
+    test_profane_cases_not_clean()
+    test_latin_and_translit_not_clean()
+    test_tiers()
+    print('Предфильтр: OK')
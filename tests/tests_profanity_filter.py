@@ -0,0 +1,65 @@
+import asyncio
+
+from filters.filters import ProfanityFilter
+from tests_cases import TestCases
+
+
+def make_filter() -> ProfanityFilter:
+    return ProfanityFilter(executor=ProfanityFilter.EXECUTOR_INLINE)
+
+
+def test_prefilter_fast_path() -> None:
+    profanity_filter = make_filter()
+    verdict = asyncio.run(profanity_filter.check('print(1)'))
+    assert verdict.rule == 'prefilter.code'
+    assert profanity_filter.check_sync('12345').rule == 'prefilter.charset'
+
+    # Чистый текст после полной проверки берётся из кэша предфильтра
+    assert profanity_filter.check_sync('Спасибо за курс').rule == 'clean'
+    assert profanity_filter.check_sync(
+        'Спасибо за курс').rule == 'prefilter.cache'
+
+
+def test_batch_matches_full_check() -> None:
+    profanity_filter = make_filter()
+    texts = [text for text, _ in TestCases.test_cases]
+    verdicts = asyncio.run(profanity_filter.check_many(texts))
+    for text, verdict in zip(texts, verdicts):
+        full = profanity_filter._check_profanity(text)
+        assert verdict.is_profane == full.is_profane, text
+        if verdict.rule.startswith('prefilter.'):
+            assert not full, text
+
+
+def test_verdict_strength() -> None:
+    profanity_filter = make_filter()
+    expected = {
+        'сука': 'bad_word.exact',
+        'бляяя': 'bad_word.base_pattern',
+        'мудаки': 'bad_word.pattern',
+        'г0ндон': 'bad_word.form',
+        'х у й': 'better_profanity',
+        'бл*ядь': 'additional_patterns',
+        'бл9дь': 'levenshtein'}
+    for text, rule in expected.items():
+        verdict = profanity_filter.check_sync(text)
+        assert verdict.rule == rule, (text, verdict)
+        assert verdict.strength == ProfanityFilter.RULE_STRENGTH[rule]
+        assert verdict
+
+    # Вердикт профанный ровно тогда, когда у правила есть сила
+    for text, _ in TestCases.test_cases:
+        verdict = profanity_filter.check_sync(text)
+        assert verdict.is_profane == bool(verdict) == (
+            verdict.strength is not None) == (
+            verdict.rule in ProfanityFilter.RULE_STRENGTH), (text, verdict)
+
+    clean = profanity_filter.check_sync('Спасибо за курс')
+    assert not clean and clean.strength is None and clean.token is None
+
+
+if __name__ == "__main__":
+    test_prefilter_fast_path()
+    test_batch_matches_full_check()
+    test_verdict_strength()
+    print('ProfanityFilter: OK')
@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from redis.asyncio import BlockingConnectionPool
+from redis.exceptions import (ConnectionError as RedisConnectionError,
+                              TimeoutError as RedisTimeoutError)
+
+from config_data.config import RedisPool
+from main import close_redis, create_redis, setup_redis
+from redis_db import TEST_REDIS_URL, skip_without_redis
+
+
+def make_config(fsm_db: int, data_db: int) -> SimpleNamespace:
+    url = urlparse(TEST_REDIS_URL)
+    return SimpleNamespace(
+        redis_host=url.hostname or 'localhost',
+        redis_password=url.password or '',
+        redis_pool=RedisPool(
+            fsm_db=fsm_db,
+            data_db=data_db,
+            max_connections=7,
+            socket_timeout=2.5,
+            connect_timeout=1.5,
+            health_check_interval=15,
+            retries=4))
+
+
+def test_create_redis() -> None:
+    config = make_config(fsm_db=0, data_db=3)
+    redis = create_redis(config, db=3, decode_responses=True)
+    pool = redis.connection_pool
+    assert isinstance(pool, BlockingConnectionPool)
+    assert pool.max_connections == 7
+    # Ожидание свободного соединения при исчерпании пула
+    assert pool.timeout == 2.5
+
+    kwargs = pool.connection_kwargs
+    assert kwargs['db'] == 3
+    assert kwargs['decode_responses'] is True
+    assert kwargs['socket_timeout'] == 2.5
+    assert kwargs['socket_connect_timeout'] == 1.5
+    assert kwargs['health_check_interval'] == 15
+    assert kwargs['retry'].get_retries() == 4
+    assert {RedisConnectionError, RedisTimeoutError,
+            OSError} <= set(kwargs['retry_on_error'])
+
+    # Клиент владеет пулом: aclose() закрывает и его
+    assert redis.auto_close_connection_pool
+    asyncio.run(redis.aclose())
+
+
+class RecordingClient:
+    def __init__(self):
+        self.closed = 0
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+
+def test_close_redis() -> None:
+    shared = RecordingClient()
+    asyncio.run(close_redis(shared, shared))
+    assert shared.closed == 1
+
+    fsm, data = RecordingClient(), RecordingClient()
+    asyncio.run(close_redis(fsm, data))
+    assert fsm.closed == data.closed == 1
+
+
+async def _test_setup_redis() -> None:
+    db = int(urlparse(TEST_REDIS_URL).path.lstrip('/') or 0)
+    try:
+        redis_fsm, redis_data = await setup_redis(make_config(db, db))
+    except (RedisConnectionError, OSError):
+        # setup_redis подключается сам, по адресу из конфига
+        skip_without_redis('нужен настоящий сервер')
+    # FSM и данные в одной БД — общий клиент и пул
+    assert redis_fsm is redis_data
+    await close_redis(redis_fsm, redis_data)
+
+    redis_fsm, redis_data = await setup_redis(make_config(db, 0))
+    assert redis_fsm is not redis_data
+    assert redis_fsm.connection_pool.connection_kwargs['db'] == db
+    assert redis_data.connection_pool.connection_kwargs['db'] == 0
+    # aiogram RedisStorage хранит bytes, данные бота — str
+    assert not redis_fsm.connection_pool.connection_kwargs['decode_responses']
+    assert redis_data.connection_pool.connection_kwargs['decode_responses']
+    await close_redis(redis_fsm, redis_data)
+
+
+def test_setup_redis() -> None:
+    asyncio.run(_test_setup_redis())
+
+
+if __name__ == "__main__":
+    test_create_redis()
+    test_close_redis()
+    test_setup_redis()
+    print('Клиенты Redis: OK')
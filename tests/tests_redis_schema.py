@@ -0,0 +1,84 @@
+import asyncio
+
+from utils import redis_schema
+from utils.redis_schema import (MIGRATION_LOCK_KEY,
+                                SCHEMA_VERSION,
+                                get_schema_version,
+                                migrate)
+from utils.redis_service import RedisService, unpack_notif
+from redis_db import open_test_redis
+
+
+async def seed_v1(redis) -> None:
+    await redis.set('101:time_last_comment', '2024-01-01T10:00:00Z')
+    await redis.set('notify_skip_course:101', '1', ex=300)
+    await redis.set('stepik_token', 'token', ex=300)
+    await redis.sadd(RedisService.USERS_LIST_SET, '5', '6')
+    await redis.hset(f'{RedisService.USER_TAG}:5', mapping={
+        'tg_id': '5', 'is_notif_solution': '0',
+        'is_notif_uninformative': '1'})
+    await redis.hset(f'{RedisService.USER_TAG}:6', mapping={'tg_id': '6'})
+
+
+async def _test_migrate_v1_to_v2() -> None:
+    async with open_test_redis() as redis:
+        await seed_v1(redis)
+
+        assert await migrate(redis, dry_run=True) == 1
+        assert await redis.exists('101:time_last_comment')
+
+        assert await migrate(redis) == SCHEMA_VERSION
+        assert await redis.hget(
+            f'{RedisService.COURSE_TAG}:101',
+            RedisService.COURSE_LAST_COMMENT_TIME) == '2024-01-01T10:00:00Z'
+        assert not await redis.exists('101:time_last_comment')
+        # Переименование сохраняет TTL
+        assert 0 < await redis.ttl(
+            f'{RedisService.SKIP_NOTIFIED_TAG}:101') <= 300
+        assert await redis.get('bot:stepik_token') == 'token'
+        user = await redis.hgetall(f'{RedisService.USER_TAG}:5')
+        assert 'is_notif_solution' not in user
+        assert unpack_notif(user[RedisService.NOTIF_FIELD]) == {
+            'is_notif_solution': False, 'is_notif_uninformative': True}
+        # У пользователя без флагов ничего не меняется
+        assert await redis.hgetall(f'{RedisService.USER_TAG}:6') == {
+            'tg_id': '6'}
+
+        # Повторный запуск ничего не делает
+        assert await migrate(redis) == SCHEMA_VERSION
+
+
+async def _test_concurrent_migrate() -> None:
+    async with open_test_redis() as redis:
+        await seed_v1(redis)
+        redis_schema.MIGRATION_POLL_INTERVAL = 0.05
+
+        # Реплики стартуют одновременно: одна мигрирует, остальные ждут
+        versions = await asyncio.gather(*(migrate(redis) for _ in range(3)))
+        assert versions == [SCHEMA_VERSION] * 3
+        assert not await redis.exists(MIGRATION_LOCK_KEY)
+
+        # Чужая блокировка без окончания миграции — ошибка по таймауту
+        await redis.delete(redis_schema.SCHEMA_VERSION_KEY)
+        await redis.set(MIGRATION_LOCK_KEY, '1', ex=60)
+        try:
+            await migrate(redis, wait_timeout=0.2)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('no RuntimeError')
+        assert await get_schema_version(redis) == 1
+
+
+def test_migrate_v1_to_v2() -> None:
+    asyncio.run(_test_migrate_v1_to_v2())
+
+
+def test_concurrent_migrate() -> None:
+    asyncio.run(_test_concurrent_migrate())
+
+
+if __name__ == "__main__":
+    test_migrate_v1_to_v2()
+    test_concurrent_migrate()
+    print('Миграции схемы Redis: OK')
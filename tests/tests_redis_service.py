@@ -0,0 +1,161 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from redis.asyncio import Redis
+
+from utils.redis_service import (NOTIF_BITS, NOTIF_DEFAULT, RedisService,
+                                 pack_notif, unpack_notif)
+from redis_db import open_test_redis
+
+
+async def wait_for(predicate: Callable[[], bool],
+                   timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timeout'
+        await asyncio.sleep(0.01)
+
+
+@asynccontextmanager
+async def listening(service: RedisService) -> AsyncIterator[RedisService]:
+    """Сервис с активной подпиской на инвалидацию (кэш включён)."""
+    task = asyncio.create_task(service.run_cache_invalidation())
+    try:
+        await wait_for(lambda: service._cache_enabled)
+        yield service
+    finally:
+        # Отмену, пришедшую одновременно с ответом, asyncio.wait_for в
+        # Python < 3.12 может проглотить — отменяем, пока задача не завершится
+        while not task.done():
+            task.cancel()
+            await asyncio.wait({task}, timeout=0.1)
+
+
+async def _test_cache_invalidation(redis: Redis) -> None:
+    writer = RedisService(redis=redis, stepik_client=None)
+    reader = RedisService(redis=redis, stepik_client=None)
+    # До подписок: иначе инвалидация от этой записи могла бы прийти уже
+    # после того, как читатель закэширует значение
+    await writer.update_msgs_settings(remove_toxic_flag=False)
+    async with listening(writer), listening(reader):
+        assert (await reader.get_msgs_settings())['remove_toxic'] is False
+
+        # Запись в обход сервиса не видна: значение из локального кэша
+        await redis.hset(RedisService.MSGS_SETTINGS_TAG, 'remove_toxic', '1')
+        assert (await reader.get_msgs_settings())['remove_toxic'] is False
+
+        # Запись через другую реплику сбрасывает кэш читателя
+        await writer.update_msgs_settings(remove_toxic_flag=True)
+        await wait_for(lambda: 'msgs_settings' not in reader._cache)
+        assert (await reader.get_msgs_settings())['remove_toxic'] is True
+
+        await reader.add_user(1)
+        assert await reader.get_tg_users_ids() == [1]
+        assert await writer.get_tg_users_ids() == [1]
+        await writer.add_user(2)
+        await wait_for(lambda: 'users' not in reader._cache)
+        assert sorted(await reader.get_tg_users_ids()) == [1, 2]
+
+    # Без подписки кэш выключен и очищен: чтения идут в Redis
+    assert not reader._cache_enabled and not reader._cache
+    await redis.hset(RedisService.MSGS_SETTINGS_TAG, 'remove_toxic', '0')
+    assert (await reader.get_msgs_settings())['remove_toxic'] is False
+    assert not reader._cache
+
+
+async def _check_user_cases(service: RedisService) -> None:
+    assert not await service.check_user(10)
+    await service.add_user(10)
+    assert await service.check_user(10)
+    assert await service.check_user('10')
+    assert not await service.check_user(11)
+    await service.remove_user(10)
+    assert not await service.check_user(10)
+
+
+async def _test_check_user(redis: Redis) -> None:
+    service = RedisService(redis=redis, stepik_client=None)
+    # Кэш выключен — SISMEMBER
+    await _check_user_cases(service)
+    # Кэш включён — поиск в закэшированном множестве пользователей
+    async with listening(service):
+        await _check_user_cases(service)
+        assert 'users' in service._cache
+
+
+async def _test_notif_writes(redis: Redis) -> None:
+    service = RedisService(redis=redis, stepik_client=None)
+    user_key = f'{RedisService.USER_TAG}:5'
+
+    # Пользователя нет: Lua-скрипт заводит его и меняет только свой бит
+    assert await service.update_notif_flag(5, is_notif_solution=False)
+    assert await redis.sismember(RedisService.USERS_LIST_SET, '5')
+    assert await redis.hget(user_key, RedisService.TG_ID) == '5'
+    assert await service.get_user_notif(5) == {
+        'is_notif_solution': False, 'is_notif_uninformative': True}
+
+    assert await service.update_notif_flag(5, is_notif_uninformative=False)
+    assert await service.update_notif_flag(5, is_notif_solution=True)
+    assert await service.get_user_notif(5) == {
+        'is_notif_solution': True, 'is_notif_uninformative': False}
+    # Флаги не переданы — ничего не меняется
+    assert not await service.update_notif_flag(5)
+    assert int(await redis.hget(user_key, RedisService.NOTIF_FIELD)) == (
+        NOTIF_BITS['is_notif_solution'])
+
+    # add_user — хэш и множество одной транзакцией, флаги по умолчанию
+    await service.add_user(6)
+    assert await redis.hgetall(f'{RedisService.USER_TAG}:6') == {
+        RedisService.TG_ID: '6', RedisService.NOTIF_FIELD: str(NOTIF_DEFAULT)}
+    await service.remove_user(6)
+    assert not await redis.exists(f'{RedisService.USER_TAG}:6')
+    assert not await redis.sismember(RedisService.USERS_LIST_SET, '6')
+
+    # Состояние курсов пишется и читается одним round trip
+    await service.update_courses_state({
+        1: {'poll_rate': '0.5'}, 2: {'last_comment_time': '2024-01-01'}})
+    states = await service.get_courses_state([1, 2, 3])
+    assert states[1]['poll_rate'] == '0.5'
+    assert states[2]['last_comment_time'] == '2024-01-01'
+    assert set(states[3].values()) == {None}
+
+
+def test_pack_notif() -> None:
+    for solution in (False, True):
+        for uninformative in (False, True):
+            flags = {'is_notif_solution': solution,
+                     'is_notif_uninformative': uninformative}
+            assert unpack_notif(pack_notif(flags)) == flags
+            assert unpack_notif(str(pack_notif(flags))) == flags
+    assert unpack_notif(None) == unpack_notif(NOTIF_DEFAULT)
+    assert all(unpack_notif(None).values())
+
+
+def _run(test) -> None:
+    async def run() -> None:
+        async with open_test_redis() as redis:
+            await test(redis)
+
+    asyncio.run(run())
+
+
+def test_cache_invalidation() -> None:
+    _run(_test_cache_invalidation)
+
+
+def test_check_user() -> None:
+    _run(_test_check_user)
+
+
+def test_notif_writes() -> None:
+    _run(_test_notif_writes)
+
+
+if __name__ == "__main__":
+    test_pack_notif()
+    test_cache_invalidation()
+    test_check_user()
+    test_notif_writes()
+    print('RedisService: OK')
@@ -0,0 +1,54 @@
+import asyncio
+
+from fake_servers import FakeStepik
+from utils.metrics import metrics
+from utils.stepik import StepikAPIClient
+from redis_db import open_test_redis
+
+COMMENTS_ENDPOINT = 'GET /api/comments'
+MISS_COUNTER = ('stepik_api_not_modified_total', (('source', 'miss'),))
+
+
+async def _test_conditional_get() -> None:
+    async with open_test_redis() as redis:
+        stepik = FakeStepik()
+        url = await stepik.start()
+        try:
+            client = StepikAPIClient('fake', 'fake', redis, base_url=url)
+            first = await client.get_comments(1)
+            assert first['comments']
+            assert stepik.not_modified[COMMENTS_ENDPOINT] == 0
+
+            # 304: разобранное тело из памяти, без разбора JSON
+            assert await client.get_comments(1) is first
+            assert stepik.not_modified[COMMENTS_ENDPOINT] == 1
+
+            # Другая реплика: тело из Redis
+            other = StepikAPIClient('fake', 'fake', redis, base_url=url)
+            assert await other.get_comments(1) == first
+            assert stepik.not_modified[COMMENTS_ENDPOINT] == 2
+
+            # Тело пропало между запросом и ответом — обычный GET вместо
+            # ошибки, кэш заполняется заново
+            fresh = StepikAPIClient('fake', 'fake', redis, base_url=url)
+            cache_key = fresh._http_cache_key(
+                f'{url}/api/comments',
+                {'page_size': 100, 'course': 1, 'sort': 'time',
+                 'order': 'desc'})
+            assert await redis.hdel(cache_key, 'body') == 1
+            misses = metrics.snapshot().counters.get(MISS_COUNTER, 0)
+            assert await fresh.get_comments(1) == first
+            assert (metrics.snapshot().counters.get(MISS_COUNTER, 0) ==
+                    misses + 1)
+            assert await redis.hget(cache_key, 'body')
+        finally:
+            await stepik.stop()
+
+
+def test_conditional_get() -> None:
+    asyncio.run(_test_conditional_get())
+
+
+if __name__ == "__main__":
+    test_conditional_get()
+    print('Условные запросы к Stepik: OK')
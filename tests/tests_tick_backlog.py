@@ -0,0 +1,151 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from filters.filters import ProfanityVerdict
+from tasks.tasks import StepikTasks
+from utils.coordination import shard_of
+from utils.redis_service import RedisService
+from redis_db import open_test_redis
+
+COURSE_ID = 101
+
+
+class FailingProfanityFilter:
+    async def check_many(self, texts: list[str]) -> list[ProfanityVerdict]:
+        raise RuntimeError('tick crashed')
+
+
+class CleanProfanityFilter:
+    async def check_many(self, texts: list[str]) -> list[ProfanityVerdict]:
+        return [ProfanityVerdict(is_profane=False, rule='clean') for _ in
+            texts]
+
+
+@dataclass
+class StubCoordinator:
+    owned_shards: frozenset[int]
+    shard_count: int = 4
+
+    def owned_courses(self, course_ids: list[int]) -> list[int]:
+        return [course_id for course_id in course_ids if
+            shard_of(course_id, self.shard_count) in self.owned_shards]
+
+
+@dataclass
+class RecordingTasks(StepikTasks):
+    processed: list[int] = field(default_factory=list)
+
+    async def _process_comment(self, comment, comment_text, profanity_verdict,
+                               toxicity_filter, all_users) -> None:
+        self.processed.append(comment['id'])
+
+
+@dataclass
+class PoisonTasks(RecordingTasks):
+    poison_id: int = 2
+
+    async def _process_comment(self, comment, comment_text, profanity_verdict,
+                               toxicity_filter, all_users) -> None:
+        if comment['id'] == self.poison_id:
+            # Как get_comment_context на удалённом комментарии
+            raise TypeError("'NoneType' object is not subscriptable")
+        await super()._process_comment(comment, comment_text,
+                                       profanity_verdict, toxicity_filter,
+                                       all_users)
+
+
+def comment(comment_id: int, course_id: int = COURSE_ID) -> dict:
+    return {'id': comment_id, 'course_id': course_id, 'text': 'текст',
+            'time': '2024-01-01T10:00:00Z', 'course_title': 'Курс'}
+
+
+async def make_tasks(redis, coordinator=None,
+                     tasks_class=RecordingTasks) -> RecordingTasks:
+    redis_service = RedisService(redis=redis, stepik_client=None)
+    await redis.sadd(RedisService.STEPIK_IDS_SET, COURSE_ID)
+    # Курс опрошен недавно: в тике только отложенные комментарии
+    await redis_service.update_courses_state({COURSE_ID: {
+        'poll_rate': '0', 'poll_last_at': f'{time.time():.0f}',
+        'poll_next_at': f'{time.time() + 600:.0f}'}})
+    return tasks_class(bot=None, stepik_client=None,
+                       redis_service=redis_service, coordinator=coordinator)
+
+
+async def _test_backlog_survives_crash() -> None:
+    async with open_test_redis() as redis:
+        tasks = await make_tasks(redis)
+        await tasks.redis_service.checkpoint_tick_backlog(
+            {}, {None: [comment(1), comment(2), comment(3)]})
+
+        try:
+            await tasks._check_comments(FailingProfanityFilter(), None)
+        except RuntimeError:
+            pass
+        # Тик упал — отложенные комментарии на месте
+        backlog = await tasks.redis_service.get_tick_backlog([None])
+        assert [entry['id'] for entry in backlog[None]] == [1, 2, 3]
+
+        # Бюджет исчерпан сразу — всё снова отложено, ничего не потеряно
+        await tasks._check_comments(CleanProfanityFilter(), None, deadline=0)
+        assert tasks.processed == []
+        backlog = await tasks.redis_service.get_tick_backlog([None])
+        assert [entry['id'] for entry in backlog[None]] == [1, 2, 3]
+
+        await tasks._check_comments(CleanProfanityFilter(), None)
+        assert tasks.processed == [1, 2, 3]
+        assert await tasks.redis_service.get_tick_backlog([None]) == {}
+
+
+async def _test_backlog_per_shard() -> None:
+    async with open_test_redis() as redis:
+        own_course = COURSE_ID
+        own_shard = shard_of(own_course, 4)
+        other_course = next(course_id for course_id in range(1, 1000) if
+            shard_of(course_id, 4) != own_shard)
+        coordinator = StubCoordinator(owned_shards=frozenset({own_shard}))
+        tasks = await make_tasks(redis, coordinator)
+
+        await tasks._checkpoint_backlog(
+            {}, [comment(1, own_course), comment(2, other_course)])
+        await tasks._check_comments(CleanProfanityFilter(), None)
+
+        # Комментарий чужого шарда остаётся его владельцу
+        assert tasks.processed == [1]
+        other_shard = shard_of(other_course, 4)
+        backlog = await tasks.redis_service.get_tick_backlog(
+            [own_shard, other_shard])
+        assert list(backlog) == [other_shard]
+        assert backlog[other_shard][0]['id'] == 2
+
+
+async def _test_poison_comment_skipped() -> None:
+    async with open_test_redis() as redis:
+        tasks = await make_tasks(redis, tasks_class=PoisonTasks)
+        await tasks.redis_service.checkpoint_tick_backlog(
+            {}, {None: [comment(1), comment(2), comment(3)]})
+
+        # Ошибка на одном комментарии не останавливает остальные
+        await tasks._check_comments(CleanProfanityFilter(), None)
+        assert tasks.processed == [1, 3]
+        # и не возвращает его в отложенные
+        assert await tasks.redis_service.get_tick_backlog([None]) == {}
+
+
+def test_backlog_survives_crash() -> None:
+    asyncio.run(_test_backlog_survives_crash())
+
+
+def test_backlog_per_shard() -> None:
+    asyncio.run(_test_backlog_per_shard())
+
+
+def test_poison_comment_skipped() -> None:
+    asyncio.run(_test_poison_comment_skipped())
+
+
+if __name__ == "__main__":
+    test_backlog_survives_crash()
+    test_backlog_per_shard()
+    test_poison_comment_skipped()
+    print('Перенос работы между тиками: OK')
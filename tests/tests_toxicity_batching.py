@@ -0,0 +1,67 @@
+from filters.toxicity_classifiers import HEAD_SHARE, _classify, _truncate
+
+
+class WordTokenizer:
+    """Токенизатор-заглушка: токен — слово, [CLS] и [SEP] служебные."""
+
+    def __call__(self, text: str, add_special_tokens: bool = True) -> dict:
+        return {'input_ids': text.split()}
+
+    @staticmethod
+    def num_special_tokens_to_add() -> int:
+        return 2
+
+    @staticmethod
+    def decode(token_ids: list[str]) -> str:
+        return ' '.join(token_ids)
+
+
+class RecordingPipeline:
+    """Pipeline-заглушка: запоминает входы, метка зависит от текста."""
+
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str], **kwargs) -> list[dict]:
+        self.calls.append(list(texts))
+        return [{'label': 'toxic' if 'дурак' in text else 'neutral',
+                 'score': len(text.split())} for text in texts]
+
+
+def test_truncate_head_tail() -> None:
+    classifier = RecordingPipeline()
+    words = [f'w{i}' for i in range(100)]
+
+    short = ' '.join(words[:10])
+    assert _truncate(classifier, short, max_tokens=32) == (short, 10)
+
+    text, length = _truncate(classifier, ' '.join(words), max_tokens=32)
+    budget = 32 - 2
+    head = int(budget * HEAD_SHARE)
+    assert length == budget
+    assert text.split() == words[:head] + words[-(budget - head):]
+
+
+def test_classify_sorts_by_length_and_restores_order() -> None:
+    classifier = RecordingPipeline()
+    texts = ['очень длинный комментарий ' * 50 + 'дурак',
+             'ок',
+             'ты дурак',
+             'спасибо за курс']
+
+    results = _classify(classifier, texts, max_tokens=16, batch_size=2)
+
+    # Модель получила тексты по возрастанию длины, длинный — обрезанным
+    assert [len(text.split()) for text in classifier.calls[0]] == [1, 2, 3,
+                                                                    14]
+    # Результаты — в исходном порядке; хвост длинного текста сохранён
+    assert [result['label'] for result in results] == [
+        'toxic', 'neutral', 'toxic', 'neutral']
+    assert [result['score'] for result in results] == [14, 1, 2, 3]
+
+
+if __name__ == "__main__":
+    test_truncate_head_tail()
+    test_classify_sorts_by_length_and_restores_order()
+    print('Батчи модели токсичности: OK')
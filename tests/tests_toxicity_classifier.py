@@ -0,0 +1,160 @@
+import asyncio
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import torch
+
+import filters.toxicity_classifiers as toxicity_classifiers
+from filters.toxicity_classifiers import (WARMUP_TEXTS,
+                                          RussianToxicityClassifier,
+                                          _configure_torch, _warm_up)
+from tests_toxicity_batching import RecordingPipeline
+from utils.metrics import metrics
+
+MODELS = ['first/model', 'second/model']
+
+
+class InlinePool(Executor):
+    """Пул-заглушка: выполняет задачу сразу в текущем потоке."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.shutdowns = 0
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self.shutdowns += 1
+
+
+class BrokenPool(InlinePool):
+    """Пул, воркер которого умер."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        self.submitted += 1
+        raise BrokenProcessPool('worker died')
+
+
+def make_classifier(**kwargs) -> RussianToxicityClassifier:
+    # Несуществующий каталог снапшота: кандидаты — только MODELS
+    return RussianToxicityClassifier(
+        MODELS, snapshot_dir='/nonexistent/snapshot', **kwargs)
+
+
+def patch_loader(loader):
+    original = toxicity_classifiers._load_pipeline
+    toxicity_classifiers._load_pipeline = loader
+    return original
+
+
+def test_warm_up_and_threads() -> None:
+    pipeline = RecordingPipeline()
+    assert _warm_up(pipeline) >= 0
+    assert len(pipeline.calls) == len(WARMUP_TEXTS)
+
+    threads = torch.get_num_threads()
+    try:
+        _configure_torch(num_threads=1, interop_threads=None)
+        assert torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(threads)
+
+
+async def _test_initialize_fallback() -> None:
+    loaded: list[str] = []
+
+    def loader(task, model_name, num_threads=None, interop_threads=None):
+        loaded.append(model_name)
+        if model_name == MODELS[0]:
+            raise OSError('not found')
+        return RecordingPipeline()
+
+    original = patch_loader(loader)
+    try:
+        classifier = make_classifier()
+        assert not classifier.is_ready
+        await classifier.initialize()
+        assert loaded == MODELS
+        assert classifier.is_ready and not classifier.is_failed
+        assert classifier.loaded_model_name == MODELS[1]
+        result = await classifier.predict('ты дурак')
+        assert result['is_toxic']
+
+        def broken(*args, **kwargs):
+            raise OSError('not found')
+
+        toxicity_classifiers._load_pipeline = broken
+        failed = make_classifier()
+        try:
+            await failed.initialize()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('no RuntimeError')
+        assert failed.is_failed and not failed.is_ready
+    finally:
+        toxicity_classifiers._load_pipeline = original
+
+
+def test_initialize_fallback() -> None:
+    asyncio.run(_test_initialize_fallback())
+
+
+async def _test_process_pool_restart() -> None:
+    classifier = make_classifier(executor='process', workers=2)
+    broken = BrokenPool()
+    fresh = InlinePool()
+    starts: list[str] = []
+
+    async def start_pool(model_name: str) -> None:
+        starts.append(model_name)
+        await asyncio.sleep(0)
+        classifier._pool = fresh
+
+    classifier._start_pool = start_pool
+    classifier._pool = broken
+    classifier.loaded_model_name = MODELS[0]
+    toxicity_classifiers._worker_pipeline = RecordingPipeline()
+    restarts = metrics.snapshot().counters.get(
+        ('toxicity_worker_restarts_total', ()), 0)
+    try:
+        # Два запроса на умершем пуле: пул перезапускается один раз, оба
+        # запроса повторяются на новом
+        results = await asyncio.gather(
+            classifier.predict('ты дурак'), classifier.predict('спасибо'))
+    finally:
+        toxicity_classifiers._worker_pipeline = None
+
+    assert [result['is_toxic'] for result in results] == [True, False]
+    assert starts == [MODELS[0]]
+    assert broken.shutdowns == 1 and fresh.submitted == 2
+    assert metrics.snapshot().counters[
+        ('toxicity_worker_restarts_total', ())] == restarts + 1
+
+    await classifier.close()
+    assert fresh.shutdowns == 1 and classifier._pool is None
+
+
+def test_process_pool_restart() -> None:
+    asyncio.run(_test_process_pool_restart())
+
+
+def test_unknown_executor() -> None:
+    try:
+        make_classifier(executor='gpu')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('no ValueError')
+
+
+if __name__ == "__main__":
+    test_warm_up_and_threads()
+    test_initialize_fallback()
+    test_process_pool_restart()
+    test_unknown_executor()
+    print('Классификатор токсичности: OK')
@@ -0,0 +1,75 @@
+import asyncio
+
+from tasks.tasks import StepikTasks
+from utils.redis_service import RedisService
+from redis_db import open_test_redis
+
+
+class RecordingBot:
+    """Bot-заглушка: запоминает отправленные сообщения."""
+
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        self.sent.append((chat_id, text))
+
+
+class RecordingStepik:
+    """StepikAPIClient-заглушка: запоминает удалённые комментарии."""
+
+    def __init__(self):
+        self.deleted: list[int] = []
+
+    async def delete_comment(self, comment_id: int) -> bool:
+        self.deleted.append(comment_id)
+        return True
+
+
+class FailedClassifier:
+    is_ready = False
+    is_failed = True
+
+
+class LoadingClassifier:
+    is_ready = False
+    is_failed = False
+
+
+async def _test_pending_with_failed_model() -> None:
+    async with open_test_redis() as redis:
+        stepik = RecordingStepik()
+        redis_service = RedisService(redis=redis, stepik_client=stepik)
+        await redis_service.update_msgs_settings(remove_toxic_flag=True)
+        bot = RecordingBot()
+        tasks = StepikTasks(bot=bot, stepik_client=stepik,
+                            redis_service=redis_service)
+        await redis_service.push_pending_toxicity(
+            {'comment_id': 7, 'text': 'ты дурак', 'link': 'https://x',
+             'course_title': 'Курс'})
+
+        # Модель ещё грузится — очередь ждёт
+        await tasks._confirm_pending(LoadingClassifier(), {1})
+        assert not bot.sent and not stepik.deleted
+
+        # Модель не загрузилась — решение ProfanityFilter окончательное
+        await tasks._confirm_pending(FailedClassifier(), {1})
+        assert stepik.deleted == [7]
+        assert len(bot.sent) == 1 and 'Модель недоступна' in bot.sent[0][1]
+        assert await redis_service.pop_pending_toxicity() == []
+
+
+def test_pending_with_failed_model() -> None:
+    asyncio.run(_test_pending_with_failed_model())
+
+
+def test_failed_model_skips_queue() -> None:
+    assert StepikTasks._model_unavailable(None)
+    assert StepikTasks._model_unavailable(FailedClassifier())
+    assert not StepikTasks._model_unavailable(LoadingClassifier())
+
+
+if __name__ == "__main__":
+    test_pending_with_failed_model()
+    test_failed_model_skips_queue()
+    print('Отложенная проверка моделью: OK')
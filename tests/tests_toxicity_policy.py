@@ -0,0 +1,57 @@
+from filters.filters import ProfanityFilter
+from tasks.tasks import (DEFAULT_TOXICITY_POLICY, MIN_TEXT_LEN_FOR_MODEL,
+                         POLICY_FLAG, POLICY_MODEL, StepikTasks)
+
+
+def make_tasks(**kwargs) -> StepikTasks:
+    return StepikTasks(stepik_client=None, redis_service=None, bot=None,
+                       **kwargs)
+
+
+def test_default_policy() -> None:
+    profanity_filter = ProfanityFilter(
+        executor=ProfanityFilter.EXECUTOR_INLINE)
+    tasks = make_tasks()
+    text = 'текст комментария длиннее порога'
+
+    # Сильное правило — помечаем без модели, среднее и слабое — в модель
+    strong = profanity_filter.check_sync('сука')
+    medium = profanity_filter.check_sync('мудаки')
+    weak = profanity_filter.check_sync('бл9дь')
+    assert strong.strength == ProfanityFilter.STRONG
+    assert medium.strength == ProfanityFilter.MEDIUM
+    assert weak.strength == ProfanityFilter.WEAK
+    assert not tasks._needs_model(strong, text)
+    assert tasks._needs_model(medium, text)
+    assert tasks._needs_model(weak, text)
+
+    # Короткие тексты модель не подтверждает
+    short = 'мудаки'
+    assert len(short) < MIN_TEXT_LEN_FOR_MODEL
+    assert not tasks._needs_model(profanity_filter.check_sync(short), short)
+
+
+def test_custom_policy() -> None:
+    profanity_filter = ProfanityFilter(
+        executor=ProfanityFilter.EXECUTOR_INLINE)
+    text = 'текст комментария длиннее порога'
+    strong = profanity_filter.check_sync('сука')
+    medium = profanity_filter.check_sync('мудаки')
+
+    everything_to_model = make_tasks(toxicity_policy={
+        ProfanityFilter.STRONG: POLICY_MODEL})
+    assert everything_to_model._needs_model(strong, text)
+
+    never_model = make_tasks(toxicity_policy={
+        strength: POLICY_FLAG for strength in DEFAULT_TOXICITY_POLICY})
+    assert not never_model._needs_model(medium, text)
+
+    # Политики у каждого экземпляра свои
+    assert make_tasks().toxicity_policy == DEFAULT_TOXICITY_POLICY
+    assert make_tasks().toxicity_policy is not make_tasks().toxicity_policy
+
+
+if __name__ == "__main__":
+    test_default_policy()
+    test_custom_policy()
+    print('Политика подтверждения моделью: OK')
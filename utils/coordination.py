@@ -0,0 +1,225 @@
+"""
+Координация нескольких реплик бота через Redis.
+
+Курсы разбиты на SHARD_COUNT шардов (crc32 от ID курса). Каждая реплика
+раз в renew_interval отмечается в bot:instances (sorted set, score — время
+истечения по часам Redis) и по rendezvous-хэшированию (вариант
+консистентного хэширования: при уходе реплики переезжают только её шарды)
+вычисляет свои шарды. На них она берёт аренду bot:shard_lease:{shard} с
+TTL lease_ttl и продлевает её, чужие — отпускает. Тик обрабатывает только
+курсы своих шардов, поэтому реплики не опрашивают курсы дважды, а шарды
+упавшей реплики переходят к живым, как только истечёт её аренда.
+
+Дополнительно разыгрывается аренда лидера bot:leader: лидер — единственная
+реплика, которая опрашивает Telegram (getUpdates с двух реплик
+конфликтует).
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+
+from redis.asyncio import Redis
+
+from utils.metrics import metrics
+
+logger_coordination = logging.getLogger(__name__)
+
+INSTANCES_KEY = 'bot:instances'
+SHARD_LEASE_TAG = 'bot:shard_lease'
+LEADER_KEY = 'bot:leader'
+
+# Отметка реплики по часам Redis (а не реплик) и список живых реплик.
+# KEYS[1] — sorted set реплик; ARGV: id реплики, ttl (мс)
+HEARTBEAT_LUA = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+redis.call('ZADD', KEYS[1], now_ms + tonumber(ARGV[2]), ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms)
+return redis.call('ZRANGE', KEYS[1], 0, -1)
+"""
+
+# Берёт или продлевает аренды KEYS[1..ARGV[3]] и отпускает свои аренды
+# среди остальных ключей. ARGV: id реплики, ttl (мс), число арендуемых.
+# Возвращает 1/0 для каждого арендуемого ключа
+LEASES_LUA = """
+local held = {}
+local hold_count = tonumber(ARGV[3])
+for i = 1, #KEYS do
+    local owner = redis.call('GET', KEYS[i])
+    if i <= hold_count then
+        if not owner then
+            redis.call('SET', KEYS[i], ARGV[1], 'PX', ARGV[2])
+            held[i] = 1
+        elseif owner == ARGV[1] then
+            redis.call('PEXPIRE', KEYS[i], ARGV[2])
+            held[i] = 1
+        else
+            held[i] = 0
+        end
+    elseif owner == ARGV[1] then
+        redis.call('DEL', KEYS[i])
+    end
+end
+return held
+"""
+
+
+def default_instance_id() -> str:
+    """hostname:pid:случайный суффикс — уникален и читаем в логах."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+
+
+def shard_of(course_id: int, shard_count: int) -> int:
+    """Шард курса: стабилен между репликами и перезапусками."""
+    return zlib.crc32(str(course_id).encode()) % shard_count
+
+
+def shard_owner(shard: int, instances: list[str]) -> str:
+    """Rendezvous-хэширование: реплика с наибольшим весом для шарда."""
+    def weight(instance: str) -> int:
+        digest = hashlib.blake2b(f'{instance}:{shard}'.encode(),
+                                 digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+    
+    return max(instances, key=weight)
+
+
+@dataclass
+class Coordinator:
+    """
+    Аренды шардов курсов и лидерства для одной реплики.
+
+    Attributes:
+        redis (Redis): Клиент базы данных бота (decode_responses=True).
+        instance_id (str): Идентификатор реплики.
+        shard_count (int): Число шардов курсов (одинаковое у всех реплик).
+        lease_ttl (float): TTL аренд и отметки реплики, секунды. За это время
+            шарды упавшей реплики переходят к живым.
+        renew_interval (float): Период продления аренд, секунды.
+    """
+    redis: Redis
+    instance_id: str = field(default_factory=default_instance_id)
+    shard_count: int = 64
+    lease_ttl: float = 90.0
+    renew_interval: float = 20.0
+
+    owned_shards: frozenset[int] = field(
+        default=frozenset(), init=False)
+    _is_leader: bool = field(default=False, init=False, repr=False)
+    # Аренды действительны до этого момента (time.monotonic), если их не
+    # удастся продлить
+    _valid_until: float = field(default=0.0, init=False, repr=False)
+    _leader_changed: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False)
+
+    def __post_init__(self):
+        self._heartbeat_script = self.redis.register_script(HEARTBEAT_LUA)
+        self._leases_script = self.redis.register_script(LEASES_LUA)
+
+    @property
+    def is_valid(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader and self.is_valid
+
+    def owns(self, course_id: int) -> bool:
+        return (self.is_valid and
+                shard_of(course_id, self.shard_count) in self.owned_shards)
+
+    def owned_courses(self, course_ids: list[int]) -> list[int]:
+        """Курсы, которые в этом тике обрабатывает эта реплика."""
+        return [course_id for course_id in course_ids if self.owns(course_id)]
+
+    async def rebalance(self) -> None:
+        """
+        Отмечает реплику, пересчитывает её шарды, берёт/продлевает их аренды
+        и аренду лидера, отпускает аренды шардов, ушедших другим репликам.
+        """
+        ttl_ms = int(self.lease_ttl * 1000)
+        started = time.monotonic()
+        instances: list[str] = await self._heartbeat_script(
+            keys=[INSTANCES_KEY], args=[self.instance_id, ttl_ms])
+        if self.instance_id not in instances:
+            instances.append(self.instance_id)
+
+        assigned = [shard for shard in range(self.shard_count)
+                    if shard_owner(shard, instances) == self.instance_id]
+        released = [shard for shard in range(self.shard_count)
+                    if shard not in assigned]
+        keys = ([f'{SHARD_LEASE_TAG}:{shard}' for shard in assigned] +
+                [LEADER_KEY] +
+                [f'{SHARD_LEASE_TAG}:{shard}' for shard in released])
+        held: list[int] = await self._leases_script(
+            keys=keys, args=[self.instance_id, ttl_ms, len(assigned) + 1])
+
+        owned = frozenset(
+            shard for shard, is_held in zip(assigned, held) if is_held)
+        if owned != self.owned_shards:
+            logger_coordination.info(
+                f'{self.instance_id}: shards {sorted(owned)} of '
+                f'{self.shard_count}, instances: {len(instances)}')
+        self.owned_shards = owned
+        self._set_leader(bool(held[len(assigned)]))
+        # Запас на расхождение часов и задержку ответа
+        self._valid_until = started + self.lease_ttl * 0.9
+
+        metrics.set('coordination_instances', len(instances))
+        metrics.set('coordination_owned_shards', len(owned))
+        metrics.set('coordination_is_leader', int(self._is_leader))
+
+    def _set_leader(self, is_leader: bool) -> None:
+        if is_leader != self._is_leader:
+            logger_coordination.warning(
+                f'{self.instance_id}: leadership '
+                f'{"acquired" if is_leader else "lost"}')
+            self._is_leader = is_leader
+            self._leader_changed.set()
+
+    async def wait_leadership(self, is_leader: bool = True) -> None:
+        """Ждёт, пока реплика станет (или перестанет быть) лидером."""
+        while self.is_leader != is_leader:
+            self._leader_changed.clear()
+            try:
+                await asyncio.wait_for(self._leader_changed.wait(),
+                                       timeout=self.renew_interval)
+            except asyncio.TimeoutError:
+                # Лидерство могло истечь без продления
+                pass
+
+    async def run(self) -> None:
+        """Фоновая задача: периодическое продление аренд."""
+        while True:
+            try:
+                await self.rebalance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                metrics.inc('coordination_errors_total')
+                logger_coordination.error(f'Lease renewal failed: {err}')
+                if not self.is_valid:
+                    # Аренды истекли: курсы могли уйти другим репликам
+                    self.owned_shards = frozenset()
+                    self._set_leader(False)
+            await asyncio.sleep(self.renew_interval)
+
+    async def close(self) -> None:
+        """Отпускает аренды и снимает отметку — шарды переедут сразу."""
+        keys = [LEADER_KEY] + [f'{SHARD_LEASE_TAG}:{shard}' for shard in
+            range(self.shard_count)]
+        try:
+            await self._leases_script(keys=keys,
+                                      args=[self.instance_id, 1, 0])
+            await self.redis.zrem(INSTANCES_KEY, self.instance_id)
+        except Exception as err:
+            logger_coordination.warning(f'Lease release failed: {err}')
+        self.owned_shards = frozenset()
+        self._set_leader(False)
+        self._valid_until = 0.0
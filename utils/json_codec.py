@@ -0,0 +1,77 @@
+"""
+Подключаемый декодер JSON для ответов API.
+
+По умолчанию выбирается самый быстрый из установленных: orjson, msgspec,
+иначе stdlib json. Все декодеры принимают bytes и str (тело ответа
+разбирается без промежуточного декодирования в str) и при ошибке разбора
+бросают ValueError.
+"""
+import json
+import logging
+from typing import Any, Callable
+
+logger_json_codec = logging.getLogger(__name__)
+
+JsonLoads = Callable[[bytes | str], Any]
+
+DECODER_AUTO = 'auto'
+
+
+def _orjson_loads() -> JsonLoads:
+    import orjson
+
+    # orjson.JSONDecodeError — подкласс ValueError
+    return orjson.loads
+
+
+def _msgspec_loads() -> JsonLoads:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: bytes | str) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+
+    return loads
+
+
+def _stdlib_loads() -> JsonLoads:
+    # json.JSONDecodeError — подкласс ValueError
+    return json.loads
+
+
+# В порядке предпочтения для DECODER_AUTO
+DECODERS: dict[str, Callable[[], JsonLoads]] = {
+    'orjson': _orjson_loads,
+    'msgspec': _msgspec_loads,
+    'json': _stdlib_loads}
+
+
+def get_json_loads(name: str = DECODER_AUTO) -> JsonLoads:
+    """
+    Возвращает функцию разбора JSON.
+    Args:
+        name (str): 'orjson', 'msgspec', 'json' или 'auto' — первый
+            установленный по порядку DECODERS.
+    Returns:
+        JsonLoads: Функция bytes | str -> объект.
+    Raises:
+        ValueError: Неизвестное имя декодера.
+        ImportError: Явно выбранный декодер не установлен.
+    """
+    if name != DECODER_AUTO:
+        if name not in DECODERS:
+            raise ValueError(f'Unknown JSON decoder: {name}')
+        return DECODERS[name]()
+
+    for decoder_name, factory in DECODERS.items():
+        try:
+            loads = factory()
+        except ImportError:
+            continue
+        logger_json_codec.debug(f'JSON decoder: {decoder_name}')
+        return loads
+    return json.loads
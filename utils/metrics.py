@@ -0,0 +1,294 @@
+import functools
+import inspect
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+logger_metrics = logging.getLogger(__name__)
+
+# Границы бакетов гистограмм длительностей, секунды
+TIME_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 30.0, 60.0, 120.0)
+# Границы бакетов гистограмм количеств (комментариев за тик и т.п.)
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+Labels = tuple[tuple[str, str], ...]
+MetricKey = tuple[str, Labels]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def format_key(key: MetricKey) -> str:
+    """Имя метрики с метками: name{a=1,b=2}."""
+    name, labels = key
+    if not labels:
+        return name
+    return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}"
+
+
+@dataclass
+class Histogram:
+    """
+    Гистограмма с фиксированными бакетами (как в Prometheus).
+
+    Attributes:
+        buckets (tuple[float, ...]): Верхние границы бакетов (по возрастанию).
+        counts (list[int]): Наблюдения по бакетам; последний — выше всех
+            границ (+Inf).
+        total (float): Сумма наблюдений.
+        count (int): Число наблюдений.
+    """
+    buckets: tuple[float, ...] = TIME_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def copy(self) -> 'Histogram':
+        return Histogram(self.buckets, list(self.counts), self.total,
+                         self.count)
+
+    def diff(self, previous: 'Histogram | None') -> 'Histogram':
+        """Наблюдения, сделанные после снимка previous."""
+        if previous is None:
+            return self.copy()
+        return Histogram(
+            self.buckets,
+            [new - old for new, old in zip(self.counts, previous.counts)],
+            self.total - previous.total,
+            self.count - previous.count)
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля сверху: граница бакета, в который он попал."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+@dataclass
+class MetricsSnapshot:
+    counters: dict[MetricKey, float]
+    histograms: dict[MetricKey, Histogram]
+    gauges: dict[MetricKey, float] = field(default_factory=dict)
+
+
+class Timer:
+    """
+    Таймер, пишущий длительность в гистограмму реестра.
+    Работает как контекстный менеджер и как декоратор (sync и async).
+    """
+
+    def __init__(self, registry: 'MetricsRegistry', name: str,
+                 labels: dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self._starts: list[float] = []
+
+    def __enter__(self) -> 'Timer':
+        self._starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._starts.pop()
+        self.registry.observe(self.name, elapsed, **self.labels)
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self.registry.timer(self.name, **self.labels):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.registry.timer(self.name, **self.labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class MetricsRegistry:
+    """
+    Реестр счётчиков и гистограмм процесса.
+
+    Метрика определяется именем и набором меток; значения только растут,
+    поэтому сводка за тик считается как разность со снимком (snapshot),
+    сделанным в начале тика.
+
+    Метрики пишутся и из потоков пулов (ProfanityFilter, классификатор),
+    поэтому запись и снимок идут под блокировкой, а чтение — только через
+    снимок.
+    """
+
+    def __init__(self):
+        self.counters: dict[MetricKey, float] = {}
+        self.gauges: dict[MetricKey, float] = {}
+        self.histograms: dict[MetricKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Увеличивает счётчик name{labels} на value."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Устанавливает значение gauge name{labels}."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float,
+                buckets: tuple[float, ...] | None = None, **labels) -> None:
+        """
+        Добавляет наблюдение в гистограмму name{labels}.
+        buckets учитываются только при первом наблюдении метрики.
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(
+                    buckets or TIME_BUCKETS)
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels) -> Timer:
+        """Таймер в гистограмму name{labels}: with или декоратор."""
+        return Timer(self, name, labels)
+
+    def timed(self, name: str, **labels):
+        """
+        Декоратор: таймер в гистограмму name с меткой method=<имя функции>.
+        Удобен, чтобы одной строкой обвесить все методы сервиса.
+        """
+        def decorator(func):
+            return self.timer(name, method=func.__name__, **labels)(func)
+
+        return decorator
+
+    def snapshot(self) -> MetricsSnapshot:
+        with self._lock:
+            return MetricsSnapshot(
+                counters=dict(self.counters),
+                histograms={key: histogram.copy() for key, histogram in
+                    self.histograms.items()},
+                gauges=dict(self.gauges))
+
+    def format_summary(self, since: MetricsSnapshot | None = None) -> str:
+        """
+        Компактная сводка метрик (с момента снимка since, если он передан):
+        по строке на гистограмму и одна строка со счётчиками.
+        """
+        current = self.snapshot()
+        rows = []
+        for key, histogram in sorted(current.histograms.items()):
+            window = histogram.diff(since.histograms.get(key) if since else
+                                    None)
+            if not window.count:
+                continue
+            rows.append(
+                f'{format_key(key)}: n={window.count} '
+                f'sum={window.total:.3f} '
+                f'avg={window.total / window.count:.4f} '
+                f'p95<={window.quantile(0.95):g}')
+
+        counters = []
+        for key, value in sorted(current.counters.items()):
+            value -= since.counters.get(key, 0) if since else 0
+            if value:
+                counters.append(f'{format_key(key)}={value:g}')
+        if counters:
+            rows.append('counters: ' + ' '.join(counters))
+        return '\n'.join(rows) if rows else 'Метрик нет'
+
+
+def _escape_label(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _prom_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()
+                 ) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{key}="{_escape_label(value)}"' for key, value in pairs) + '}'
+
+
+def _prom_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return f'{value:g}' if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registry: MetricsRegistry, prefix: str = '') -> str:
+    """
+    Рендерит реестр в текстовом формате экспозиции Prometheus (0.0.4).
+    Args:
+        registry (MetricsRegistry): Реестр метрик.
+        prefix (str): Префикс имён метрик (например 'stepik_guard_').
+    Returns:
+        str: Текст для ответа на /metrics.
+    """
+    lines: list[str] = []
+    current = registry.snapshot()
+
+    def grouped(series: dict):
+        by_name: dict[str, list] = {}
+        for (name, labels), value in sorted(series.items()):
+            by_name.setdefault(prefix + name, []).append((labels, value))
+        return by_name.items()
+
+    for name, series in grouped(current.counters):
+        lines.append(f'# TYPE {name} counter')
+        lines += [f'{name}{_prom_labels(labels)} {_prom_value(value)}'
+                  for labels, value in series]
+
+    for name, series in grouped(current.gauges):
+        lines.append(f'# TYPE {name} gauge')
+        lines += [f'{name}{_prom_labels(labels)} {_prom_value(value)}'
+                  for labels, value in series]
+
+    for name, series in grouped(current.histograms):
+        lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, bucket_count in zip(
+                    histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += bucket_count
+                le = (('le', _prom_value(float(bound))),)
+                lines.append(
+                    f'{name}_bucket{_prom_labels(labels, le)} {cumulative}')
+            lines.append(f'{name}_sum{_prom_labels(labels)} '
+                         f'{_prom_value(histogram.total)}')
+            lines.append(f'{name}_count{_prom_labels(labels)} '
+                         f'{histogram.count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# Общий реестр процесса
+metrics = MetricsRegistry()
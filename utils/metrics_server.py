@@ -0,0 +1,46 @@
+import logging
+
+from aiohttp import web
+
+from utils.metrics import MetricsRegistry, metrics, render_prometheus
+
+logger_metrics_server = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PREFIX = 'stepik_guard_'
+
+
+def build_metrics_app(registry: MetricsRegistry = metrics,
+                      prefix: str = METRICS_PREFIX) -> web.Application:
+    """
+    aiohttp-приложение с эндпоинтами /metrics (формат Prometheus) и
+    /healthz. Не требует сторонних библиотек и доступа в сеть.
+    """
+    async def metrics_handler(request: web.Request) -> web.Response:
+        body = render_prometheus(registry, prefix=prefix)
+        return web.Response(body=body.encode(),
+                            headers={'Content-Type': CONTENT_TYPE})
+
+    async def health_handler(request: web.Request) -> web.Response:
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics_handler)
+    app.router.add_get('/healthz', health_handler)
+    return app
+
+
+async def start_metrics_server(host: str, port: int,
+                               registry: MetricsRegistry = metrics
+                               ) -> web.AppRunner:
+    """
+    Запускает сервер метрик в текущем event loop.
+    Returns:
+        web.AppRunner: Раннер; для остановки вызвать await runner.cleanup().
+    """
+    runner = web.AppRunner(build_metrics_app(registry), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger_metrics_server.info(
+        f'=== METRICS SERVER STARTED ON http://{host}:{port}/metrics ===')
+    return runner
@@ -0,0 +1,223 @@
+"""
+Версия схемы данных бота в Redis и миграции между версиями.
+
+Схема v1 (исходная):
+    bot:user:{id}                  хэш, флаги is_notif_* строками '1'/'0'
+    {course_id}:time_last_comment  строка, водяной знак курса
+    notify_skip_course:{id}        строка с TTL
+    stepik_token                   строка с TTL
+Схема v2:
+    bot:user:{id}                  хэш, флаги упакованы в поле notif
+    bot:course:{id}                хэш курса, поля last_comment_time и
+                                   poll_* (расписание опроса)
+    bot:notify_skip:{id}           строка с TTL
+    bot:stepik_token               строка с TTL
+Все ключи v2 начинаются с bot:, поэтому данные бота находятся одним
+SCAN MATCH bot:*.
+
+Миграции идемпотентны и выполняются под блокировкой, поэтому их можно
+запускать при каждом старте бота (main.py) и вручную. Остальные процессы
+ждут, пока миграция, начатая одним из них, закончится:
+    python -m utils.redis_schema [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from utils.redis_service import NOTIF_BITS, RedisService, pack_notif
+from utils.stepik import STEPIK_TOKEN_KEY
+
+logger_schema = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+SCHEMA_VERSION_KEY = 'bot:schema_version'
+MIGRATION_LOCK_KEY = 'bot:schema_migration_lock'
+MIGRATION_LOCK_TTL = 600
+# Сколько ждать миграцию, начатую другим процессом (реплики стартуют
+# одновременно), и как часто проверять её окончание, секунды
+MIGRATION_WAIT_TIMEOUT = MIGRATION_LOCK_TTL + 60
+MIGRATION_POLL_INTERVAL = 1.0
+SCAN_BATCH = 500
+
+Migration = Callable[[Redis, bool], Awaitable[Counter]]
+
+
+async def _scan_keys(redis: Redis, match: str) -> list[str]:
+    return [key async for key in redis.scan_iter(match=match,
+                                                  count=SCAN_BATCH)]
+
+
+async def _rename_keys(redis: Redis, renames: list[tuple[str, str]],
+                       dry_run: bool) -> int:
+    """RENAME сохраняет TTL; ключ мог истечь между SCAN и RENAME."""
+    if dry_run or not renames:
+        return len(renames)
+    pipe = redis.pipeline(transaction=False)
+    for old_key, new_key in renames:
+        await pipe.rename(old_key, new_key)
+    results = await pipe.execute(raise_on_error=False)
+    return sum(result is True for result in results)
+
+
+async def migrate_v2(redis: Redis, dry_run: bool) -> Counter:
+    """v1 -> v2: хэши курсов, упакованные флаги, префикс bot: у ключей."""
+    stats: Counter = Counter()
+
+    # Водяные знаки курсов -> bot:course:{id}
+    watermark_keys = [
+        key for key in await _scan_keys(redis, '*:time_last_comment')
+        if key.split(':', 1)[0].isdigit()]
+    for start in range(0, len(watermark_keys), SCAN_BATCH):
+        batch = watermark_keys[start:start + SCAN_BATCH]
+        values = await redis.mget(batch)
+        stats['watermarks'] += len(batch)
+        if dry_run:
+            continue
+        pipe = redis.pipeline(transaction=True)
+        for key, value in zip(batch, values):
+            if value is not None:
+                await pipe.hset(
+                    f'{RedisService.COURSE_TAG}:{key.split(":", 1)[0]}',
+                    RedisService.COURSE_LAST_COMMENT_TIME, value)
+            await pipe.delete(key)
+        await pipe.execute()
+
+    # Ключи с TTL: переименование сохраняет оставшееся время жизни
+    renames = [
+        (key, f'{RedisService.SKIP_NOTIFIED_TAG}:{key.rsplit(":", 1)[1]}')
+        for key in await _scan_keys(redis, 'notify_skip_course:*')]
+    if await redis.exists('stepik_token'):
+        renames.append(('stepik_token', STEPIK_TOKEN_KEY))
+    stats['renamed'] += await _rename_keys(redis, renames, dry_run)
+
+    # Флаги уведомлений '1'/'0' -> одно поле notif
+    old_fields = list(NOTIF_BITS)
+    users = [user async for user in redis.sscan_iter(
+        RedisService.USERS_LIST_SET, count=SCAN_BATCH)]
+    for start in range(0, len(users), SCAN_BATCH):
+        batch = users[start:start + SCAN_BATCH]
+        pipe = redis.pipeline(transaction=False)
+        for user in batch:
+            await pipe.hmget(f'{RedisService.USER_TAG}:{user}', old_fields)
+        rows = await pipe.execute()
+
+        pipe = redis.pipeline(transaction=True)
+        for user, values in zip(batch, rows):
+            if all(value is None for value in values):
+                continue
+            stats['users'] += 1
+            user_key = f'{RedisService.USER_TAG}:{user}'
+            flags = {name: value != '0' for name, value in
+                zip(old_fields, values) if value is not None}
+            await pipe.hset(user_key, RedisService.NOTIF_FIELD,
+                            pack_notif(flags))
+            await pipe.hdel(user_key, *old_fields)
+        if not dry_run:
+            await pipe.execute()
+
+    return stats
+
+
+# Целевая версия -> миграция с предыдущей версии
+MIGRATIONS: dict[int, Migration] = {
+    2: migrate_v2}
+
+
+async def get_schema_version(redis: Redis) -> int:
+    """Версия схемы данных; без отметки считается исходная v1."""
+    return int(await redis.get(SCHEMA_VERSION_KEY) or 1)
+
+
+async def _check_version(redis: Redis) -> int:
+    version = await get_schema_version(redis)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f'Redis schema v{version} is newer than supported '
+            f'v{SCHEMA_VERSION}')
+    return version
+
+
+async def migrate(redis: Redis, dry_run: bool = False,
+                  wait_timeout: float = MIGRATION_WAIT_TIMEOUT) -> int:
+    """
+    Доводит данные до SCHEMA_VERSION. Если миграцию уже выполняет другой
+    процесс, ждёт её окончания.
+    Args:
+        redis (Redis): Клиент базы данных бота (decode_responses=True).
+        dry_run (bool): Только посчитать, что будет изменено.
+        wait_timeout (float): Сколько ждать чужую миграцию, секунды.
+    Returns:
+        int: Версия схемы после миграции.
+    Raises:
+        RuntimeError: Чужая миграция не закончилась за wait_timeout или
+            данные новее, чем знает этот код.
+    """
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        version = await _check_version(redis)
+        if version == SCHEMA_VERSION:
+            return version
+        if await redis.set(MIGRATION_LOCK_KEY, '1', nx=True,
+                           ex=MIGRATION_LOCK_TTL):
+            break
+        if time.monotonic() >= deadline:
+            raise RuntimeError(
+                f'Redis schema migration by another process did not finish '
+                f'in {wait_timeout:.0f} s')
+        logger_schema.info(
+            'Waiting for Redis schema migration by another process')
+        await asyncio.sleep(MIGRATION_POLL_INTERVAL)
+
+    try:
+        # Чужая миграция могла закончиться между проверкой и блокировкой
+        version = await _check_version(redis)
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            stats = await MIGRATIONS[target](redis, dry_run)
+            logger_schema.info(
+                f'Redis schema v{target - 1} -> v{target}'
+                f'{" (dry run)" if dry_run else ""}: {dict(stats)}')
+            if dry_run:
+                return version
+            await redis.set(SCHEMA_VERSION_KEY, target)
+            version = target
+    finally:
+        await redis.delete(MIGRATION_LOCK_KEY)
+    return version
+
+
+async def _main(dry_run: bool) -> None:
+    from config_data.config import load_config
+
+    config = load_config()
+    # БД данных бота — та же, что у бота (REDIS_DATA_DB)
+    redis = Redis(host=config.redis_host, port=6379,
+                  db=config.redis_pool.data_db,
+                  decode_responses=True,
+                  password=config.redis_password or None,
+                  socket_timeout=config.redis_pool.socket_timeout,
+                  socket_connect_timeout=config.redis_pool.connect_timeout)
+    try:
+        before = await get_schema_version(redis)
+        after = await migrate(redis, dry_run=dry_run)
+        print(f'Redis schema: v{before} -> v{after}')
+    finally:
+        await redis.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Миграция данных бота в Redis до текущей схемы')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='только показать, что будет изменено')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
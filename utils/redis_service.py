@@ -1,12 +1,66 @@
+import asyncio
+import json
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
 
 from redis.asyncio import Redis
 
+from utils.metrics import metrics
 from utils.stepik import StepikAPIClient
 
 logger = logging.getLogger(__name__)
 
+# Гистограмма длительностей методов RedisService (метка method)
+REDIS_METRIC = 'redis_service_seconds'
+
+# Флаги уведомлений пользователя упакованы в одно число (поле notif хэша
+# пользователя): флаг -> бит
+NOTIF_BITS: dict[str, int] = {
+    'is_notif_solution': 1,
+    'is_notif_uninformative': 2}
+NOTIF_DEFAULT = sum(NOTIF_BITS.values())
+
+# Поля хэша курса bot:course:{id}: водяной знак и расписание опроса
+COURSE_STATE_FIELDS = ('last_comment_time',
+                       'poll_rate',
+                       'poll_last_at',
+                       'poll_next_at')
+
+# Атомарно заводит пользователя, если его нет, и меняет биты флагов.
+# KEYS: хэш пользователя, множество пользователей.
+# ARGV: tg_id, поле флагов, флаги по умолчанию, далее пары (бит, 0|1).
+# Возвращает 1, если пользователь был создан
+UPDATE_NOTIF_LUA = """
+local created = redis.call('HSETNX', KEYS[1], 'tg_id', ARGV[1])
+redis.call('SADD', KEYS[2], ARGV[1])
+local flags = tonumber(redis.call('HGET', KEYS[1], ARGV[2]) or ARGV[3])
+for i = 4, #ARGV, 2 do
+    local bit = tonumber(ARGV[i])
+    local is_set = math.floor(flags / bit) % 2 == 1
+    if ARGV[i + 1] == '1' and not is_set then
+        flags = flags + bit
+    elseif ARGV[i + 1] == '0' and is_set then
+        flags = flags - bit
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[2], flags)
+return created
+"""
+
+
+def pack_notif(flags: dict[str, bool]) -> int:
+    """Упаковывает флаги уведомлений (отсутствующие — включены) в число."""
+    return sum(bit for name, bit in NOTIF_BITS.items()
+               if flags.get(name, True))
+
+
+def unpack_notif(value: int | str | None) -> dict[str, bool]:
+    """Распаковывает поле notif; None — все уведомления включены."""
+    packed = NOTIF_DEFAULT if value is None else int(value)
+    return {name: bool(packed & bit) for name, bit in NOTIF_BITS.items()}
+
 
 @dataclass
 class RedisService:
@@ -37,10 +91,15 @@ class RedisService:
         get_tg_users_ids(self): Returns a list of all users in the Redis database.
         get_users_info(self): Returns a string containing information about all users in the Redis database.
         get_owners_info(self): Returns a string containing information about all owners in the Redis database.
+        run_cache_invalidation(self): Background task keeping the local read cache consistent across replicas.
         check_stepik_course_id(self, course_id: int): Checks if a Stepik course ID exists in the Redis database.
         add_stepik_course_id(self, course_id: int): Adds a Stepik course ID to the Redis database.
         remove_stepik_course_id(self, course_id: int): Removes a Stepik course ID from the Redis database.
         get_stepik_course_ids(self): Returns a list of all Stepik course IDs in the Redis database.
+        get_courses_state(self, course_ids: list[int]): Returns the watermark and polling schedule of each course.
+        update_courses_state(self, states: dict[int, dict[str, str]]): Writes fields of several course hashes.
+        claim_skip_notification(self, course_id: int, ttl: int): Marks that owners were notified about a skipped course.
+        claim_owner_alert(self, kind: str, ttl: int): Marks that owners were alerted about kind, across replicas.
         update_notification_flag(self, tg_user_id: int, is_notif_solution: bool = None, is_notif_uninformative: bool = None): Updates the notification flags for a user in the Redis database.
         get_notif_flag(self, tg_user_id: int): Returns the notification flags for a user in the Redis database.
     """
@@ -52,6 +111,7 @@ class RedisService:
     
     IS_NOTIF_SOLUTION: str = 'is_notif_solution'
     IS_NOTIF_UNINFORMATIVE: str = 'is_notif_uninformative'
+    NOTIF_FIELD: str = 'notif'
     
     USER_TAG: str = 'bot:user'
     USERS_LIST_SET: str = 'bot:users'
@@ -62,8 +122,114 @@ class RedisService:
     STEPIK_COURSE_ID: str = 'stepik_course_id'
     STEPIK_IDS_SET: str = 'bot:stepik_course_ids'
     
+    # Хэш курса: водяной знак (время последнего обработанного комментария)
+    # и метаданные. Флаг "уже уведомили о пропуске курса" — отдельный ключ,
+    # т.к. ему нужен собственный TTL
+    COURSE_TAG: str = 'bot:course'
+    COURSE_LAST_COMMENT_TIME: str = 'last_comment_time'
+    SKIP_NOTIFIED_TAG: str = 'bot:notify_skip'
+    
     MSGS_SETTINGS_TAG: str = 'bot:msgs_settings'
     
+    # Комментарии, ожидающие подтверждения моделью токсичности
+    TOXICITY_PENDING_LIST: str = 'bot:toxicity_pending'
+    TOXICITY_PENDING_MAX: int = 1000
+    
+    # Комментарии, не обработанные тиком за его бюджет времени; по ключу
+    # bot:tick_backlog:{shard} на шард, чтобы их обрабатывал владелец шарда
+    TICK_BACKLOG_LIST: str = 'bot:tick_backlog'
+    TICK_BACKLOG_MAX: int = 1000
+    # Антиспам уведомлений владельцев (по виду уведомления)
+    OWNER_ALERT_TAG: str = 'bot:owner_alert'
+    
+    # Локальный кэш горячих чтений (пользователи, флаги уведомлений,
+    # настройки сообщений). Писатели сбрасывают ключи у себя и
+    # публикуют их в CACHE_CHANNEL, остальные реплики сбрасывают их по
+    # подписке. CACHE_TTL ограничивает устаревание, если сообщение потеряно
+    CACHE_CHANNEL: str = 'bot:cache_invalidate'
+    CACHE_TTL: float = 60.0
+    CACHE_RECONNECT_DELAY: float = 5.0
+    CACHE_POLL_TIMEOUT: float = 1.0
+    
+    _cache: dict[str, tuple[float, Any]] = field(
+        default_factory=dict, init=False, repr=False)
+    _cache_generation: int = field(default=0, init=False, repr=False)
+    # Кэш работает только при активной подписке на инвалидацию: без неё
+    # другая реплика могла бы поменять данные незаметно для нас
+    _cache_enabled: bool = field(default=False, init=False, repr=False)
+    
+    def __post_init__(self):
+        self._update_notif_script = self.redis.register_script(
+            UPDATE_NOTIF_LUA)
+    
+    async def _cached(self, key: str,
+                      loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Read-through: значение из локального кэша или из loader().
+        Результат loader не кэшируется, если за время загрузки пришла
+        инвалидация (иначе в кэш попало бы уже устаревшее значение).
+        """
+        if self._cache_enabled:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                metrics.inc('redis_cache_total', result='hit')
+                return entry[1]
+        
+        generation = self._cache_generation
+        value = await loader()
+        metrics.inc('redis_cache_total', result='miss')
+        if self._cache_enabled and generation == self._cache_generation:
+            self._cache[key] = (time.monotonic() + self.CACHE_TTL, value)
+        return value
+    
+    def _drop_cached(self, keys: list[str] | None = None) -> None:
+        """Сбрасывает ключи локального кэша (все, если keys is None)."""
+        self._cache_generation += 1
+        if keys is None:
+            self._cache.clear()
+            return
+        for key in keys:
+            self._cache.pop(key, None)
+    
+    async def _invalidate(self, *keys: str) -> None:
+        """Сбрасывает ключи у себя и рассылает инвалидацию репликам."""
+        self._drop_cached(list(keys))
+        await self.redis.publish(self.CACHE_CHANNEL, json.dumps(keys))
+    
+    async def run_cache_invalidation(self) -> None:
+        """
+        Фоновая задача: подписка на CACHE_CHANNEL. Пока подписка активна,
+        кэш включён; при обрыве соединения кэш очищается и выключается до
+        переподключения.
+        """
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.CACHE_CHANNEL)
+                while True:
+                    # Чтение с коротким таймаутом, а не listen(): у клиента
+                    # задан socket_timeout, и блокирующее чтение на тихом
+                    # канале обрывало бы подписку
+                    message = await pubsub.get_message(
+                        timeout=self.CACHE_POLL_TIMEOUT)
+                    if message is None:
+                        continue
+                    if message['type'] == 'subscribe':
+                        self._cache_enabled = True
+                        logger.info('RedisService cache enabled')
+                    elif message['type'] == 'message':
+                        self._drop_cached(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                logger.warning(f'Cache invalidation listener failed: {err}')
+            finally:
+                self._cache_enabled = False
+                self._drop_cached()
+                await pubsub.aclose()
+            await asyncio.sleep(self.CACHE_RECONNECT_DELAY)
+    
+    @metrics.timed(REDIS_METRIC)
     async def add_user(self, tg_user_id: int):
         """
         Adds a user to the Redis database.
@@ -78,12 +244,13 @@ class RedisService:
             name=user_key,
             mapping={
                 self.TG_ID: tg_user_id,
-                self.IS_NOTIF_SOLUTION: '1',
-                self.IS_NOTIF_UNINFORMATIVE: '1'})
+                self.NOTIF_FIELD: NOTIF_DEFAULT})
         await pipe.sadd(self.USERS_LIST_SET, str(tg_user_id))
         await pipe.execute()
+        await self._invalidate('users', f'notif:{tg_user_id}')
         logger.info(f'User TG_ID:{tg_user_id} added to Redis')
     
+    @metrics.timed(REDIS_METRIC)
     async def update_user_username(self,
                                    tg_user_id: int,
                                    tg_nickname: str | None) -> None:
@@ -109,39 +276,55 @@ class RedisService:
             name=user_key,
             mapping={self.TG_USERNAME: tg_nickname, 'tg_link': tg_link})
     
+    @metrics.timed(REDIS_METRIC)
     async def remove_user(self, tg_user_id: int):
         """
         Removes a user from the Redis database.
         Args:
             tg_user_id (int): The unique identifier of the user to be removed.
         """
-        if not await self.check_user(tg_user_id):
-            return
-        
+        # DEL и SREM идемпотентны: предварительная проверка не нужна,
+        # удаление — одна транзакция за один round trip
         user_key = f'{self.USER_TAG}:{tg_user_id}'
-        await self.redis.delete(user_key)
-        await self.redis.srem(self.USERS_LIST_SET, str(tg_user_id))
+        pipe = self.redis.pipeline(transaction=True)
+        await pipe.delete(user_key)
+        await pipe.srem(self.USERS_LIST_SET, str(tg_user_id))
+        deleted, removed = await pipe.execute()
+        if deleted or removed:
+            await self._invalidate('users', f'notif:{tg_user_id}')
     
+    @metrics.timed(REDIS_METRIC)
     async def check_user(self, tg_user_id: int) -> bool:
         """
-        Checks if a user exists in the Redis database.
+        Checks if a user exists in the Redis database (the users set): a
+        lookup in the local cache when it is enabled, otherwise one SISMEMBER.
         Args:
             tg_user_id (int): The unique identifier of the user to be checked.
         Returns:
             bool: True if the user exists, False otherwise.
         """
-        return await self.redis.hexists(
-            name=f'{self.USER_TAG}:{tg_user_id}', key=self.TG_ID)
+        if self._cache_enabled:
+            return int(tg_user_id) in await self._users_set()
+        return bool(await self.redis.sismember(
+            self.USERS_LIST_SET, str(tg_user_id)))
     
+    @metrics.timed(REDIS_METRIC)
     async def get_tg_users_ids(self) -> list[int]:
         """
         Returns a list of all users in the Redis database.
         Returns:
             list[int]: A list of unique user identifiers.
         """
-        users = await self.redis.smembers(self.USERS_LIST_SET)
-        return [int(user) for user in users]
+        return list(await self._users_set())
     
+    async def _users_set(self) -> frozenset[int]:
+        async def load() -> frozenset[int]:
+            users = await self.redis.smembers(self.USERS_LIST_SET)
+            return frozenset(int(user) for user in users)
+        
+        return await self._cached('users', load)
+    
+    @metrics.timed(REDIS_METRIC)
     async def update_notif_flag(self,
                                 tg_user_id: int,
                                 is_notif_solution: bool = None,
@@ -160,39 +343,44 @@ class RedisService:
                                           is_notif_solution=True,
                                           is_notif_uninformative=False)
         """
-        if not await self.check_user(tg_user_id):
-            logger.warning(
-                f'User {tg_user_id} not found when updating notification flags')
-            await self.add_user(tg_user_id)
-        
-        # Check that at least one flag has been transferred
-        if all(f is None for f in [is_notif_solution, is_notif_uninformative]):
-            logger.warning('No flags provided for update')
-            return False
         user_key = f'{self.USER_TAG}:{tg_user_id}'
-        
         updates = {}
         
         # Updates only for the transferred flags
         if is_notif_solution is not None:
-            updates[self.IS_NOTIF_SOLUTION] = '1' if is_notif_solution else '0'
+            updates[self.IS_NOTIF_SOLUTION] = is_notif_solution
             logger.debug(
                 f'Updating {self.IS_NOTIF_SOLUTION} to {is_notif_solution}')
         
         if is_notif_uninformative is not None:
-            updates[
-                self.IS_NOTIF_UNINFORMATIVE] = '1' if is_notif_uninformative else '0'
+            updates[self.IS_NOTIF_UNINFORMATIVE] = is_notif_uninformative
             logger.debug(
                 f'Updating {self.IS_NOTIF_UNINFORMATIVE} to {is_notif_uninformative}')
         
-        # Update all flags
-        if updates:
-            await self.redis.hset(user_key, mapping=updates)
-            logger.info(
-                f'Updated notification flags for user {tg_user_id}: {updates}')
-            return True
-        return False
+        # Один Lua-скрипт: заводим пользователя, если его нет, и меняем
+        # только переданные биты упакованных флагов
+        args = [tg_user_id, self.NOTIF_FIELD, NOTIF_DEFAULT]
+        for name, value in updates.items():
+            args += [NOTIF_BITS[name], int(value)]
+        created = await self._update_notif_script(
+            keys=[user_key, self.USERS_LIST_SET], args=args)
+        
+        if created:
+            logger.warning(
+                f'User {tg_user_id} not found when updating notification flags')
+        if created or updates:
+            await self._invalidate('users', f'notif:{tg_user_id}')
+        
+        # Check that at least one flag has been transferred
+        if not updates:
+            logger.warning('No flags provided for update')
+            return False
+        
+        logger.info(
+            f'Updated notification flags for user {tg_user_id}: {updates}')
+        return True
     
+    @metrics.timed(REDIS_METRIC)
     async def get_user_notif(self, tg_user_id: int) -> dict[str, bool]:
         """
         Returns the notification flags for a user in the Redis database.
@@ -206,17 +394,16 @@ class RedisService:
                 f'User {tg_user_id} was not found when receiving notifications settings')
             return {'is_notif_solution': True, 'is_notif_uninformative': True}
         
-        user_key = f'{self.USER_TAG}:{tg_user_id}'
+        async def load() -> dict[str, bool]:
+            user_key = f'{self.USER_TAG}:{tg_user_id}'
+            
+            return unpack_notif(
+                await self.redis.hget(user_key, self.NOTIF_FIELD))
         
-        flags = await self.redis.hmget(
-            name=user_key, keys=[
-                self.IS_NOTIF_SOLUTION, self.IS_NOTIF_UNINFORMATIVE])
-        return {
-            'is_notif_solution': flags[0] == '1' if flags[
-                                                        0] is not None else True,
-            'is_notif_uninformative': flags[1] == '1' if flags[
-                                                             1] is not None else True}
+        # Копия: вызывающий код не должен портить закэшированный словарь
+        return dict(await self._cached(f'notif:{tg_user_id}', load))
     
+    @metrics.timed(REDIS_METRIC)
     async def get_users_info(self) -> str:
         """
         Returns a string containing information about all users in the Redis
@@ -256,6 +443,7 @@ class RedisService:
         
         return row_users
     
+    @metrics.timed(REDIS_METRIC)
     async def check_stepik_course_id(self, course_id: int) -> bool:
         """
         Checks if a Stepik course ID exists in the Redis database.
@@ -268,6 +456,7 @@ class RedisService:
             self.STEPIK_IDS_SET, str(course_id))
         return bool(result)
     
+    @metrics.timed(REDIS_METRIC)
     async def add_stepik_course_id(self, course_id: int) -> bool | str:
         """
         Adds a Stepik course ID to the Redis database.
@@ -316,10 +505,14 @@ class RedisService:
                 exc_info=True)
             return 'Ошибка добавления курса, обратитесь к разработчику.'
         
-        await self.redis.sadd(self.STEPIK_IDS_SET, str(course_id))
+        # Курс мог добавить другой владелец, пока шёл запрос к Stepik
+        if not await self.redis.sadd(self.STEPIK_IDS_SET, str(course_id)):
+            logger.info(f'Course ID:{course_id} already exists in Redis')
+            return 'Курс уже добавлен'
         logger.info(f'Course ID:{course_id} added to Redis')
         return 'added'
     
+    @metrics.timed(REDIS_METRIC)
     async def remove_stepik_course_id(self, course_id: int) -> bool:
         """
         Removes a Stepik course ID from the Redis database.
@@ -328,13 +521,13 @@ class RedisService:
         Returns:
             bool: True if the course ID was removed, False otherwise.
         """
-        if not await self.check_stepik_course_id(course_id):
+        if not await self.redis.srem(self.STEPIK_IDS_SET, str(course_id)):
             return False
         
-        await self.redis.srem(self.STEPIK_IDS_SET, str(course_id))
         logger.info(f'Course ID:{course_id} removed from Redis')
         return True
     
+    @metrics.timed(REDIS_METRIC)
     async def get_courses_ids(self) -> list[int]:
         """
         Returns a list of all Stepik course IDs in the Redis database.
@@ -344,6 +537,70 @@ class RedisService:
         return [int(course_id) for course_id in
             (await self.redis.smembers(self.STEPIK_IDS_SET))]
     
+    @metrics.timed(REDIS_METRIC)
+    async def get_courses_state(self,
+                                course_ids: list[int]
+                                ) -> dict[int, dict[str, str | None]]:
+        """
+        Returns the state of each course from its hash (one round trip for
+        all courses): the last processed comment time and the polling
+        schedule fields.
+        Args:
+            course_ids (list[int]): Stepik course IDs.
+        Returns:
+            dict[int, dict[str, str | None]]: Course ID -> COURSE_STATE_FIELDS
+                values (None for missing fields).
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for course_id in course_ids:
+            await pipe.hmget(f'{self.COURSE_TAG}:{course_id}',
+                             COURSE_STATE_FIELDS)
+        return {course_id: dict(zip(COURSE_STATE_FIELDS, values)) for
+            course_id, values in zip(course_ids, await pipe.execute())}
+    
+    @metrics.timed(REDIS_METRIC)
+    async def update_courses_state(self,
+                                   states: dict[int, dict[str, str]]) -> None:
+        """
+        Writes fields of several course hashes in one round trip.
+        Args:
+            states (dict[int, dict[str, str]]): Course ID -> fields to set.
+        """
+        if not states:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for course_id, mapping in states.items():
+            await pipe.hset(f'{self.COURSE_TAG}:{course_id}', mapping=mapping)
+        await pipe.execute()
+    
+    @metrics.timed(REDIS_METRIC)
+    async def claim_skip_notification(self, course_id: int, ttl: int) -> bool:
+        """
+        Marks that owners were notified about a skipped course (SET NX EX).
+        Args:
+            course_id (int): Stepik course ID.
+            ttl (int): How long to suppress repeated notifications, seconds.
+        Returns:
+            bool: True if the caller should notify, False if already notified.
+        """
+        return bool(await self.redis.set(
+            f'{self.SKIP_NOTIFIED_TAG}:{course_id}', '1', ex=ttl, nx=True))
+    
+    @metrics.timed(REDIS_METRIC)
+    async def claim_owner_alert(self, kind: str, ttl: int) -> bool:
+        """
+        Marks that owners were alerted about kind (SET NX EX), so that
+        replicas do not repeat the alert within ttl.
+        Args:
+            kind (str): Alert kind.
+            ttl (int): How long to suppress repeated alerts, seconds.
+        Returns:
+            bool: True if the caller should alert, False if already alerted.
+        """
+        return bool(await self.redis.set(
+            f'{self.OWNER_ALERT_TAG}:{kind}', '1', ex=ttl, nx=True))
+    
+    @metrics.timed(REDIS_METRIC)
     async def add_owner(self, tg_user_id: int, tg_nickname: str) -> None:
         """
         Adds an owner to the Redis database.
@@ -375,6 +632,7 @@ class RedisService:
         await pipe.sadd(self.OWNERS_LIST_SET, str(tg_user_id))
         await pipe.execute()
     
+    @metrics.timed(REDIS_METRIC)
     async def get_owners_info(self) -> str:
         """
         Returns a string containing information about all owners in the Redis
@@ -417,22 +675,101 @@ class RedisService:
         
         return '\n'.join(rows)
     
+    @metrics.timed(REDIS_METRIC)
     async def update_msgs_settings(self,
                                    remove_toxic_flag: bool) -> None:
         settings = {'remove_toxic': ('0', '1')[remove_toxic_flag]}
         
         await self.redis.hset(
             name=self.MSGS_SETTINGS_TAG, mapping=settings)
+        await self._invalidate('msgs_settings')
     
+    @metrics.timed(REDIS_METRIC)
     async def get_msgs_settings(self) -> dict[str, bool]:
-        msgs_settings = await self.redis.hget(self.MSGS_SETTINGS_TAG,
-                                              'remove_toxic')
-        if not msgs_settings:
-            await self.update_msgs_settings(remove_toxic_flag=False)
-            msgs_settings = await self.redis.hget(self.MSGS_SETTINGS_TAG,
-                                         'remove_toxic')
-        return {'remove_toxic': True if msgs_settings == '1' else False}
+        async def load() -> dict[str, bool]:
+            # Значение по умолчанию и чтение — одна транзакция
+            pipe = self.redis.pipeline(transaction=True)
+            await pipe.hsetnx(self.MSGS_SETTINGS_TAG, 'remove_toxic', '0')
+            await pipe.hget(self.MSGS_SETTINGS_TAG, 'remove_toxic')
+            _, msgs_settings = await pipe.execute()
+            return {'remove_toxic': True if msgs_settings == '1' else False}
+        
+        return dict(await self._cached('msgs_settings', load))
 
+    @metrics.timed(REDIS_METRIC)
     async def get_remove_toxic_flag(self) -> bool:
         data = await self.get_msgs_settings()
         return data.get('remove_toxic', False)
+    
+    @metrics.timed(REDIS_METRIC)
+    async def push_pending_toxicity(self, entry: dict) -> None:
+        """
+        Ставит комментарий в очередь на подтверждение моделью токсичности.
+        Очередь ограничена TOXICITY_PENDING_MAX последними записями.
+        Args:
+            entry (dict): Данные комментария (сериализуются в JSON).
+        """
+        pipe = self.redis.pipeline(transaction=True)
+        await pipe.rpush(self.TOXICITY_PENDING_LIST,
+                         json.dumps(entry, ensure_ascii=False))
+        await pipe.ltrim(self.TOXICITY_PENDING_LIST,
+                         -self.TOXICITY_PENDING_MAX, -1)
+        await pipe.execute()
+    
+    @metrics.timed(REDIS_METRIC)
+    async def pop_pending_toxicity(self, count: int = 100) -> list[dict]:
+        """
+        Забирает из очереди до count комментариев (в порядке поступления).
+        Returns:
+            list[dict]: Записи, переданные в push_pending_toxicity.
+        """
+        entries = await self.redis.lpop(self.TOXICITY_PENDING_LIST, count)
+        return [json.loads(entry) for entry in entries or []]
+    
+    def _tick_backlog_key(self, shard: int | None) -> str:
+        return (self.TICK_BACKLOG_LIST if shard is None else
+                f'{self.TICK_BACKLOG_LIST}:{shard}')
+    
+    @metrics.timed(REDIS_METRIC)
+    async def get_tick_backlog(self, shards: list[int | None]
+                               ) -> dict[int | None, list[dict]]:
+        """
+        Читает отложенные комментарии шардов, не удаляя их: удаляет
+        checkpoint_tick_backlog, когда они обработаны.
+        Args:
+            shards (list[int | None]): Шарды (None — без шардирования).
+        Returns:
+            dict[int | None, list[dict]]: Шард -> комментарии в порядке
+                поступления (не больше TICK_BACKLOG_MAX).
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for shard in shards:
+            await pipe.lrange(self._tick_backlog_key(shard), 0,
+                              self.TICK_BACKLOG_MAX - 1)
+        return {shard: [json.loads(entry) for entry in entries] for
+            shard, entries in zip(shards, await pipe.execute()) if entries}
+    
+    @metrics.timed(REDIS_METRIC)
+    async def checkpoint_tick_backlog(
+        self, taken: dict[int | None, int],
+        remaining: dict[int | None, list[dict]]) -> None:
+        """
+        Одной транзакцией удаляет прочитанные get_tick_backlog записи и
+        откладывает необработанные комментарии.
+        Очередь шарда ограничена TICK_BACKLOG_MAX последними записями.
+        Args:
+            taken (dict[int | None, int]): Шард -> сколько записей прочитано.
+            remaining (dict[int | None, list[dict]]): Шард -> комментарии.
+        """
+        if not any(taken.values()) and not remaining:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        for shard, count in taken.items():
+            if count:
+                await pipe.ltrim(self._tick_backlog_key(shard), count, -1)
+        for shard, comments in remaining.items():
+            key = self._tick_backlog_key(shard)
+            await pipe.rpush(key, *[json.dumps(comment, ensure_ascii=False)
+                for comment in comments])
+            await pipe.ltrim(key, -self.TICK_BACKLOG_MAX, -1)
+        await pipe.execute()
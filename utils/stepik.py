@@ -1,22 +1,67 @@
 import asyncio
+import hashlib
 import logging
-from dataclasses import dataclass
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 import aiohttp
 from redis.asyncio import Redis
 
+from utils.json_codec import JsonLoads, get_json_loads
+from utils.metrics import metrics
+
 logger_stepik = logging.getLogger(__name__)
 
+# Кэш токена доступа Stepik API (с TTL)
+STEPIK_TOKEN_KEY = 'bot:stepik_token'
+
+# Условные GET: валидаторы (ETag/Last-Modified) и тело ответа по URL — хэш
+# bot:http_cache:{sha1 URL}, общий для реплик и перезапусков
+HTTP_CACHE_TAG = 'bot:http_cache'
+HTTP_CACHE_TTL = 24 * 3600
+# Сколько разобранных тел держать в памяти: на 304 они отдаются без
+# разбора JSON
+HTTP_CACHE_LOCAL_SIZE = 512
+HTTP_CACHE_VALIDATORS = ('etag', 'last_modified')
+# _reuse_cached: тела нет ни в памяти, ни в Redis
+_CACHE_MISS = object()
+
+_ENDPOINT_ID_RE = re.compile(r'/\d+')
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Метка эндпоинта для метрик: без query и с ID, заменёнными на {id},
+    чтобы число серий не росло с числом объектов.
+    'comments/123' -> 'comments/{id}', 'units?lesson=5' -> 'units'.
+    """
+    path = '/' + endpoint.split('?', 1)[0].strip('/')
+    return _ENDPOINT_ID_RE.sub('/{id}', path).lstrip('/')
+
+
+def _body_for_log(body: bytes) -> str:
+    return body.decode('utf-8', errors='replace') if body else '<no-body>'
+
 
 @dataclass
 class StepikAPIClient:
     client_id: str
     client_secret: str
     redis_client: Redis
+    # Адрес Stepik; переопределяется в бенчмарках на локальный фейковый сервер
+    base_url: str = 'https://stepik.org'
+    # Разбор тел ответов (orjson/msgspec, если установлены)
+    json_loads: JsonLoads = field(default_factory=get_json_loads)
+    
+    # Ключ кэша -> (валидатор, разобранное тело) для условных GET
+    _parsed_cache: OrderedDict[str, tuple[str, Any]] = field(
+        default_factory=OrderedDict, init=False, repr=False)
     
     async def reset_stepik_token(self) -> None:
-        await self.redis_client.delete('stepik_token')
+        await self.redis_client.delete(STEPIK_TOKEN_KEY)
         logger_stepik.info('Stepik_token is cleared')
     
     async def _get_access_token(self) -> str:
@@ -26,8 +71,8 @@ class StepikAPIClient:
         :raises: RuntimeError, если не удалось получить токен.
         """
         
-        cached_token = await self.redis_client.get('stepik_token')
-        url = 'https://stepik.org/oauth2/token/'
+        cached_token = await self.redis_client.get(STEPIK_TOKEN_KEY)
+        url = f'{self.base_url}/oauth2/token/'
         
         if cached_token:
             # logger_stepik.debug('Используется кэшированный токен из Redis.')
@@ -56,7 +101,7 @@ class StepikAPIClient:
                     try:
                         # Сохраняем токен в Redis с TTL
                         await self.redis_client.set(
-                            'stepik_token', access_token, ex=35000)
+                            STEPIK_TOKEN_KEY, access_token, ex=35000)
                         logger_stepik.info(
                             'Токен успешно получен и сохранён в Redis.')
                     except Exception as e:
@@ -81,7 +126,8 @@ class StepikAPIClient:
                                endpoint: str,
                                params: Optional[Dict[str, Any]] = None,
                                json_data: Optional[Dict[str, Any]] = None,
-                               expected_status_codes: List[int] = None) -> \
+                               expected_status_codes: List[int] = None,
+                               conditional: bool = False) -> \
         Optional[Dict[str, Any]]:
         """
         Базовый метод для выполнения API-запросов
@@ -91,6 +137,9 @@ class StepikAPIClient:
             params: Параметры запроса
             json_data: Данные для отправки в формате JSON
             expected_status_codes: Список ожидаемых HTTP статусов (по умолчанию [200])
+            conditional: Условный GET (If-None-Match/If-Modified-Since): на
+                304 возвращается закэшированное тело. Такой результат общий
+                для всех вызовов — его нельзя изменять
         Returns:
             Распарсенный JSON ответ или None, если ответ пустой
         Raises:
@@ -100,10 +149,23 @@ class StepikAPIClient:
         if expected_status_codes is None:
             expected_status_codes = [200]
         
-        url = f"https://stepik.org/api/{endpoint.lstrip('/')}"
+        url = f"{self.base_url}/api/{endpoint.lstrip('/')}"
         headers = {"Authorization": f"Bearer {await self._get_access_token()}"}
+        label = endpoint_label(endpoint)
+        
+        cache_key = stored = None
+        if conditional and method == 'GET':
+            cache_key = self._http_cache_key(url, params)
+            # Тело читается из Redis только на 304 без копии в памяти
+            stored = dict(zip(HTTP_CACHE_VALIDATORS, await (
+                self.redis_client.hmget(cache_key, HTTP_CACHE_VALIDATORS))))
+            if stored.get('etag'):
+                headers['If-None-Match'] = stored['etag']
+            if stored.get('last_modified'):
+                headers['If-Modified-Since'] = stored['last_modified']
         
         async with aiohttp.ClientSession() as session:
+            start = time.perf_counter()
             async with session.request(
                 method,
                 url,
@@ -111,10 +173,37 @@ class StepikAPIClient:
                 params=params,
                 json=json_data) as response:
                 
+                # Тело читается один раз байтами и разбирается без
+                # промежуточного str; в текст — только для логов ошибок
                 try:
-                    body_text = await response.text()
+                    body = await response.read()
                 except Exception:
-                    body_text = "<no-body>"
+                    body = b''
+                
+                metrics.observe(
+                    'stepik_api_request_seconds', time.perf_counter() - start,
+                    method=method, endpoint=label)
+                metrics.inc(
+                    'stepik_api_responses_total',
+                    method=method, endpoint=label, status=response.status)
+                
+                if response.status == 304 and stored and any(
+                    stored.values()):
+                    logger_stepik.debug(f"API not modified: {method} {url}")
+                    data = await self._reuse_cached(cache_key, stored)
+                    if data is not _CACHE_MISS:
+                        return data
+                    # Запись истекла между запросом и ответом: валидаторы
+                    # удалены, повтор — обычный GET, который обновит кэш
+                    logger_stepik.info(
+                        f"HTTP cache entry expired, refetching {url}")
+                    return await self.make_api_request(
+                        method,
+                        endpoint,
+                        params,
+                        json_data,
+                        expected_status_codes,
+                        conditional)
                 
                 # Логируем успешные запросы
                 if response.status in expected_status_codes:
@@ -122,18 +211,22 @@ class StepikAPIClient:
                         f"API request successful: {method} {url} - {response.status}")
                 else:
                     logger_stepik.error(
-                        f"API request failed: {response.status}. Body: {body_text}")
+                        f"API request failed: {response.status}. Body: {_body_for_log(body)}")
                     raise Exception(f"API request failed: {response.status}")
                 
                 # Обработка успешных ответов
                 if response.status in (200, 201):  # 200 OK и 201 Created
-                    if body_text and body_text != "<no-body>":
+                    if body:
                         try:
-                            return await response.json()
-                        except Exception as e:
+                            data = self.json_loads(body)
+                        except ValueError as e:
                             logger_stepik.error(
-                                f"Failed to parse JSON response: {e}. Body: {body_text}")
+                                f"Failed to parse JSON response: {e}. Body: {_body_for_log(body)}")
                             raise
+                        if cache_key:
+                            await self._store_cached(
+                                cache_key, response.headers, body, data)
+                        return data
                     return None
                 
                 # Обработка 204 No Content
@@ -143,7 +236,7 @@ class StepikAPIClient:
                 # Обработка 404 Not Found
                 if response.status == 404:
                     logger_stepik.info(
-                        f"Stepik API 404 on {method} {url}. Body: {body_text}")
+                        f"Stepik API 404 on {method} {url}. Body: {_body_for_log(body)}")
                     raise ValueError("not_found")
                 
                 # Обработка 429 Too Many Requests
@@ -157,12 +250,13 @@ class StepikAPIClient:
                         endpoint,
                         params,
                         json_data,
-                        expected_status_codes)
+                        expected_status_codes,
+                        conditional)
                 
                 # Обработка 500 Internal Server Error
                 if response.status >= 500:
                     logger_stepik.error(
-                        f"Server error on {method} {url}. Status: {response.status}. Body: {body_text}")
+                        f"Server error on {method} {url}. Status: {response.status}. Body: {_body_for_log(body)}")
                     raise Exception(f"Server error: {response.status}")
                 
                 # Для всех остальных кодов состояния
@@ -170,6 +264,64 @@ class StepikAPIClient:
                     f"Unexpected status code {response.status} on {method} {url}")
                 return None
     
+    @staticmethod
+    def _http_cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        query = '&'.join(f'{key}={value}' for key, value in
+            sorted((params or {}).items()))
+        digest = hashlib.sha1(f'{url}?{query}'.encode()).hexdigest()
+        return f'{HTTP_CACHE_TAG}:{digest}'
+    
+    def _remember_parsed(self, cache_key: str, validator: str,
+                         data: Any) -> None:
+        self._parsed_cache[cache_key] = (validator, data)
+        self._parsed_cache.move_to_end(cache_key)
+        while len(self._parsed_cache) > HTTP_CACHE_LOCAL_SIZE:
+            self._parsed_cache.popitem(last=False)
+    
+    async def _reuse_cached(self, cache_key: str,
+                            stored: dict[str, str | None]) -> Any:
+        """
+        Тело ответа 304: из памяти, если валидатор совпадает, иначе
+        разбирается сохранённое в Redis (другая реплика или перезапуск).
+        Если тела нет нигде, удаляет запись и возвращает _CACHE_MISS.
+        """
+        validator = stored['etag'] or stored['last_modified']
+        cached = self._parsed_cache.get(cache_key)
+        if cached and cached[0] == validator:
+            await self.redis_client.expire(cache_key, HTTP_CACHE_TTL)
+            metrics.inc('stepik_api_not_modified_total', source='memory')
+            self._parsed_cache.move_to_end(cache_key)
+            return cached[1]
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        await pipe.hget(cache_key, 'body')
+        await pipe.expire(cache_key, HTTP_CACHE_TTL)
+        body, _ = await pipe.execute()
+        if body is None:
+            await self.redis_client.delete(cache_key)
+            metrics.inc('stepik_api_not_modified_total', source='miss')
+            return _CACHE_MISS
+        metrics.inc('stepik_api_not_modified_total', source='redis')
+        data = self.json_loads(body)
+        self._remember_parsed(cache_key, validator, data)
+        return data
+    
+    async def _store_cached(self, cache_key: str, response_headers,
+                            body: bytes, data: Any) -> None:
+        """Сохраняет валидаторы и тело ответа, если сервер их прислал."""
+        validators = {'etag': response_headers.get('ETag', ''),
+                      'last_modified': response_headers.get('Last-Modified',
+                                                            '')}
+        if not any(validators.values()):
+            return
+        pipe = self.redis_client.pipeline(transaction=True)
+        await pipe.delete(cache_key)
+        await pipe.hset(cache_key, mapping={**validators, 'body': body})
+        await pipe.expire(cache_key, HTTP_CACHE_TTL)
+        await pipe.execute()
+        self._remember_parsed(
+            cache_key, validators['etag'] or validators['last_modified'], data)
+    
     async def get_user(self, user_id: int) -> Dict[str, Any] | None:
         """
         Get user data through a common client with retrays.
@@ -214,7 +366,8 @@ class StepikAPIClient:
         return False
     
     async def get_course(self, course_id: int):
-        course_data = await self.make_api_request('GET', f'courses/{course_id}')
+        course_data = await self.make_api_request('GET', f'courses/{course_id}',
+                                                  conditional=True)
         return course_data
     
     async def get_link_to_course(self, course_id) -> str | None:
@@ -400,7 +553,7 @@ class StepikAPIClient:
             "order": "desc"}
         
         comments = await self.make_api_request(
-            "GET", "comments", params=params)
+            "GET", "comments", params=params, conditional=True)
         
         return comments
     
@@ -443,7 +596,7 @@ class StepikAPIClient:
     async def delete_comment(self, comment_id: int) -> bool:
         """Удаление комментария через DELETE-запрос"""
         
-        url = f"https://stepik.org/api/comments/{comment_id}"
+        url = f"{self.base_url}/api/comments/{comment_id}"
         headers = {"Authorization": f"Bearer {await self._get_access_token()}"}
         
         async with aiohttp.ClientSession() as session:
@@ -27,8 +27,29 @@ async def get_username(_type_update: Message | CallbackQuery | ChatFullInfo) ->
     return 'Anonymous'
 
 
-async def clean_html_tags(raw_html: str) -> str:
+# Общий префикс '<' вынесен за альтернативу, чтобы поиск шёл по литералу.
+# Тег, начатый голым '<', поглощает блок кода целиком (атомарно), а не
+# обрывается на '>' внутри него — как прежняя реализация, которая сначала
+# подменяла блоки кода плейсхолдерами и лишь затем удаляла теги
+_CLEAN_HTML_RE = re.compile(
+    r'<(?:(pre><code>.*?</code></pre>)'
+    r'|(?:(?><pre><code>.*?</code></pre>|[^>]))+>)', re.DOTALL)
+
+
+def _clean_text_part(text: str) -> str:
+    """Раскрывает сущности, экранирует спецсимволы и схлопывает пробелы."""
+    text = html.unescape(text)
+    text = (text.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;'))
+    return ' '.join(text.split())
+
+
+def clean_html_tags(raw_html: str) -> str:
     """Удаляет HTML-теги из строки, сохраняя блоки кода.
+    
+    Строка разбирается за один проход: блоки <pre><code> сохраняются как
+    есть (с раскрытыми сущностями), остальные теги выбрасываются, а текст
+    между блоками кода экранируется и нормализуется по пробелам.
 
     Args:
         raw_html (str): Строка с HTML-тегами, возможно содержащая блоки кода.
@@ -39,59 +60,216 @@ async def clean_html_tags(raw_html: str) -> str:
     if not raw_html:
         return ""
     
-    # Словарь для временного хранения блоков кода
-    code_blocks = {}
-    
-    # Шаг 1: Находим и сохраняем все блоки кода
-    def save_code(match):
-        block_id = f"__CODE_BLOCK_{len(code_blocks)}__"
-        code_blocks[block_id] = match.group(0)  # Сохраняем с тегами <pre><code>
-        return block_id
-    
-    # Заменяем блоки кода на временные метки
-    pattern = re.compile(r'<pre><code>(.*?)</code></pre>', re.DOTALL)
-    temp_text = pattern.sub(save_code, raw_html)
-    
-    # Шаг 2: Удаляем все оставшиеся HTML-теги
-    clean_text = re.sub(r'<[^>]+>', '', temp_text)
-    
-    # Шаг 3: Восстанавливаем блоки кода с оригинальными тегами
-    for block_id, code_block in code_blocks.items():
-        clean_text = clean_text.replace(block_id, code_block)
+    parts: list[str] = []
+    text: list[str] = []
+    pos = 0
     
-    # Шаг 4: Обрабатываем HTML-сущности
-    clean_text = html.unescape(clean_text)
-    
-    # Шаг 5: Экранируем специальные символы в не-кодовых частях
-    parts = re.split(
-        r'(<pre><code>.*?</code></pre>)',
-        clean_text,
-        flags=re.DOTALL)
-    for i in range(len(parts)):
-        # Пропускаем блоки кода
-        if not parts[i].startswith('<pre><code>'):
-            parts[i] = (
-                parts[i].replace('&', '&amp;').replace('<', '&lt;').replace(
-                    '>',
-                    '&gt;').replace('"', '&quot;'))
-    
-    clean_text = ''.join(parts)
+    for match in _CLEAN_HTML_RE.finditer(raw_html):
+        text.append(raw_html[pos:match.start()])
+        pos = match.end()
+        
+        if code_block := match.group(1):
+            parts.append(_clean_text_part(''.join(text)))
+            parts.append(html.unescape(f'<{code_block}'))
+            text = []
     
-    # Шаг 6: Нормализуем пробелы в не-кодовых частях
-    parts = re.split(
-        r'(<pre><code>.*?</code></pre>)',
-        clean_text,
-        flags=re.DOTALL)
-    for i in range(
-        0,
-        len(parts),
-        2):  # Обрабатываем только нечетные части (не блоки кода)
-        if i < len(parts):
-            parts[i] = re.sub(r'\s+', ' ', parts[i]).strip()
+    text.append(raw_html[pos:])
+    parts.append(_clean_text_part(''.join(text)))
     
     return ''.join(parts)
 
 
+TG_MESSAGE_LIMIT = 4096
+
+_HTML_TOKEN_RE = re.compile(
+    r'<(?P<closing>/?)(?P<tag>[a-zA-Z][\w-]*)[^>]*>'
+    r'|&(?:#\d+|#[xX][0-9a-fA-F]+|\w+);'
+    r'|[^<&]+'
+    r'|[<&]')
+
+
+def _utf16_len(text: str) -> int:
+    """Длина строки в UTF-16 code units — так лимиты считает Telegram."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _visible_len(token: str) -> int:
+    if token.startswith('&') and token.endswith(';'):
+        return _utf16_len(html.unescape(token))
+    return _utf16_len(token)
+
+
+def html_text_length(text: str) -> int:
+    """Считает длину HTML-сообщения после разбора тегов и сущностей.
+
+    Args:
+        text (str): Текст в HTML-разметке Telegram.
+
+    Returns:
+        int: Длина видимого текста в UTF-16 code units.
+    """
+    length = 0
+    for match in _HTML_TOKEN_RE.finditer(text):
+        if not match.group('tag'):
+            length += _visible_len(match.group(0))
+    return length
+
+
+def _cut_text(text: str, room: int) -> tuple[str, str]:
+    """Отрезает от текста кусок, влезающий в room, предпочитая переносы."""
+    size = 0
+    end = 0
+    for end, char in enumerate(text):
+        size += _utf16_len(char)
+        if size > room:
+            break
+    else:
+        return text, ''
+
+    head = text[:end]
+    for separator in ('\n', ' '):
+        pos = head.rfind(separator)
+        if pos > len(head) // 2:
+            return text[:pos + 1], text[pos + 1:]
+    return head, text[end:]
+
+
+def split_html_message(text: str,
+                       limit: int = TG_MESSAGE_LIMIT) -> list[str]:
+    """Разбивает HTML-сообщение на части не длиннее limit.
+
+    Разрез делается только по тексту: открытые на месте разреза теги
+    закрываются в конце части и заново открываются в начале следующей,
+    сущности (&lt; и т.п.) не разрываются.
+
+    Args:
+        text (str): Текст в HTML-разметке Telegram.
+        limit (int): Максимальная длина видимого текста одной части.
+
+    Returns:
+        list[str]: Части сообщения, каждая с балансом тегов.
+    """
+    if html_text_length(text) <= limit:
+        return [text]
+
+    parts: list[str] = []
+    open_tags: list[tuple[str, str]] = []
+    current: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        closing = ''.join(f'</{tag}>' for tag, _ in reversed(open_tags))
+        parts.append(''.join(current) + closing)
+        current = [raw for _, raw in open_tags]
+        size = 0
+
+    for match in _HTML_TOKEN_RE.finditer(text):
+        token = match.group(0)
+
+        if tag := match.group('tag'):
+            current.append(token)
+            if not match.group('closing'):
+                open_tags.append((tag.lower(), token))
+            else:
+                for i in range(len(open_tags) - 1, -1, -1):
+                    if open_tags[i][0] == tag.lower():
+                        del open_tags[i]
+                        break
+            continue
+
+        token_len = _visible_len(token)
+        is_entity = token.startswith('&') and token.endswith(';')
+
+        while size + token_len > limit:
+            if is_entity:
+                if not size:
+                    break
+                flush()
+                continue
+
+            head, token = _cut_text(token, limit - size)
+            if not head:
+                if size:
+                    flush()
+                    token_len = _utf16_len(token)
+                    continue
+                head, token = token[:1], token[1:]
+            current.append(head)
+            size += _utf16_len(head)
+            flush()
+            token_len = _utf16_len(token)
+
+        if token:
+            current.append(token)
+            size += token_len
+
+    if size:
+        flush()
+
+    return parts
+
+
+def _truncate_with_link(text: str,
+                        link: str,
+                        limit: int,
+                        link_text: str) -> str:
+    tail = f'…\n<a href="{html.escape(link)}">{link_text}</a>'
+    head = split_html_message(text, limit - html_text_length(tail))[0]
+    return head + tail
+
+
+def truncate_html_message(text: str,
+                          link: str,
+                          limit: int = TG_MESSAGE_LIMIT,
+                          link_text: str = 'Читать полностью') -> str:
+    """Обрезает HTML-сообщение до limit, добавляя в конце ссылку.
+
+    Args:
+        text (str): Текст в HTML-разметке Telegram.
+        link (str): Ссылка на полный текст.
+        limit (int): Максимальная длина видимого текста.
+        link_text (str): Текст ссылки.
+
+    Returns:
+        str: Исходный текст, если он влезает, иначе обрезанный текст со
+            ссылкой.
+    """
+    if html_text_length(text) <= limit:
+        return text
+    return _truncate_with_link(text, link, limit, link_text)
+
+
+def fit_html_message(text: str,
+                     link: str | None = None,
+                     limit: int = TG_MESSAGE_LIMIT,
+                     max_parts: int = 3,
+                     link_text: str = 'Читать полностью') -> list[str]:
+    """Готовит HTML-сообщение к отправке так, чтобы Bot API его принял.
+
+    Длинный текст разбивается на части, а если частей больше max_parts и
+    есть ссылка, последняя часть обрезается со ссылкой на полный текст.
+    Длина проверяется до отправки, так что заведомо неудачных запросов
+    к Bot API не будет.
+
+    Args:
+        text (str): Текст в HTML-разметке Telegram.
+        link (str | None): Ссылка на полный текст.
+        limit (int): Максимальная длина видимого текста одной части.
+        max_parts (int): Максимальное число частей при наличии ссылки.
+        link_text (str): Текст ссылки.
+
+    Returns:
+        list[str]: Части сообщения, готовые к отправке.
+    """
+    parts = split_html_message(text, limit)
+    if len(parts) <= max_parts or not link:
+        return parts
+
+    last = _truncate_with_link(parts[max_parts - 1], link, limit, link_text)
+    return parts[:max_parts - 1] + [last]
+
+
 @dataclass
 class MessageProcessor:
     """